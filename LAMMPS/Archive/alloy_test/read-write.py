@@ -4,11 +4,17 @@ s
 
 '''
 
-from ase.io import read, write
+import os
+import sys
+
+from ase.io import write
 import numpy as np
 
-#read last configuration of trajmd.xyz
-atoms = read('trajmd.xyz', index=-1)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../Scripts"))
+from trajectory import readFrames, toAtoms
+
+#read last configuration of trajmd.xyz (seeks to it through the cached frame index)
+atoms = toAtoms(readFrames('trajmd.xyz', -1))
 
 #add cell information to the atoms object
 cell = np.array([[35.2, 0, 0], [0,35.2,0], [0,0,35.2]])
@@ -0,0 +1,212 @@
+'''
+
+run-benchmarks.py
+
+Input parameters:
+    -> --indices N..., --n-temperatures N..., --elements N..., --n-time N... (command line): campaign sizes; every
+        combination is one benchmark configuration (temperatures are spread evenly over 700-1100 K)
+    -> --systems N (command line): systems per campaign, each a repeat of the same truth
+    -> --noise X, --d0 X, --ea X (command line): MSD noise and ground truth (see synthetic_campaign.py)
+    -> --jobs N (command line): worker processes, as in the analysis scripts
+    -> --tol-ea X, --tol-d0 X (command line): largest accepted |Ea error| in eV and relative D0 error
+    -> --work-dir DIR (command line): where the synthetic campaigns are written (a temporary folder per configuration)
+    -> --out FILE (command line): results file, one JSON record appended per configuration
+
+Output:
+    -> Per configuration: time of each stage, parse throughput, recovered Method 1 and Method 2 Ea and D0, their
+        errors against the truth and a pass flag, to stdout and to the results file
+    -> The ratio of each stage time to the last record of the same configuration in the results file
+
+Notes:
+    -> Stages: generate (writing the files, not part of the analysis), parse (cold msd_cache.py cache), parse_warm
+        (same files, cache hits), fit (getRuntimeFits of the SD and PE), errors (block_average.py errors of D),
+        aggregate (the Arrhenius and element contribution analyses), plot (rendering every queued figure)
+    -> Each record keeps the git commit, Python and numpy versions, so a slow or wrong result can be traced to a change
+    -> Runs the analysis library functions directly, from a "Scripts" folder inside the campaign so that the plots
+        land in the campaign's "../Plots"
+
+'''
+
+import argparse
+import contextlib
+import datetime
+import importlib
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+scripts_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../Scripts")
+sys.path.append(scripts_dir)
+
+import msd_cache
+from block_average import getRuntimeSlopeSE
+from campaign import getSystemPE, getSystemSD, readCampaign
+from figures import renderFigures, setStyle
+from ols_fit import getLinearFit, getRuntimeFits
+from synthetic_campaign import k, writeCampaign
+
+arrhenius_script = importlib.import_module("arrhenius-histogram-plot")
+sd_script = importlib.import_module("sd-contribution-plot")
+
+def getGitCommit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=scripts_dir, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def getPrevious(filename, config):
+    previous = None
+    if os.path.exists(filename):
+        with open(filename, "r") as f:
+            for line in f:
+                record = json.loads(line)
+                if record["config"] == config:
+                    previous = record
+
+    return previous
+
+def getFolderBytes(folder):
+    return sum(entry.stat().st_size for entry in os.scandir(folder) if entry.is_file())
+
+def runBenchmark(root, truth, jobs, tol_ea, tol_d0):
+    stages = {}
+    campaign = readCampaign(os.path.join(root, "Scripts", "campaign.json"))
+    temperatures = campaign["temperatures"]
+    x = [1 / (k * t) for t in temperatures]
+
+    msd_cache.cache_dir = os.path.join(root, "cache")
+    n_bytes = sum(getFolderBytes(os.path.join(root, system["name"])) for system in campaign["systems"])
+
+    def timed(name, func):
+        start = time.perf_counter()
+        result = func()
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - start
+        return result
+
+    recovered = []
+    for system in campaign["systems"]:
+        sd, n_time = timed("parse", lambda: getSystemSD(campaign, system, jobs))
+        pe, pe_n_time = timed("parse", lambda: getSystemPE(campaign, system, jobs))
+        del sd, pe
+        sd, n_time = timed("parse_warm", lambda: getSystemSD(campaign, system, jobs))
+        pe, pe_n_time = timed("parse_warm", lambda: getSystemPE(campaign, system, jobs))
+
+        sd_total = np.sum(sd, axis=3)
+        d_total = timed("fit", lambda: getRuntimeFits(sd_total, n_time))
+        timed("fit", lambda: getRuntimeFits(pe, pe_n_time))
+        d_se = timed("errors", lambda: getRuntimeSlopeSE(sd_total, n_time))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, _, arrhenius_avg = timed("aggregate", lambda: arrhenius_script.analyzeArrhenius(system["name"], temperatures, d_total, "jackknife", 0, d_se))
+            timed("aggregate", lambda: sd_script.analyzeSDContribution(system["name"], temperatures, system["runtimes"], system["elements"], sd, n_time))
+
+        # Method 1: per-trajectory fits averaged, Method 2: fit of the averaged ln(D)
+        per_index, _ = getLinearFit(x, np.log(np.maximum(d_total[:, -1, :, 1], 1e-6)))
+        recovered.append({
+            "method1_ea": float(-np.mean(per_index[:, 1])),
+            "method1_d0": float(np.mean(np.exp(per_index[:, 0]))),
+            "method2_ea": float(arrhenius_avg[1]),
+            "method2_d0": float(np.exp(arrhenius_avg[0])),
+        })
+
+        del sd, sd_total, pe
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        timed("plot", lambda: renderFigures(jobs))
+
+    errors = {}
+    for method in ("method1", "method2"):
+        errors[f"{method}_ea"] = max(abs(r[f"{method}_ea"] - truth["ea"]) for r in recovered)
+        errors[f"{method}_d0"] = max(abs(r[f"{method}_d0"] / truth["d0"] - 1) for r in recovered)
+
+    passed = all(errors[f"{method}_ea"] <= tol_ea and errors[f"{method}_d0"] <= tol_d0 for method in ("method1", "method2"))
+
+    return {
+        "stages": stages,
+        "bytes": n_bytes,
+        "throughput": {"parse_mb_s": n_bytes / 1e6 / stages["parse"], "parse_warm_mb_s": n_bytes / 1e6 / stages["parse_warm"]},
+        "recovered": recovered,
+        "error": errors,
+        "pass": passed,
+    }
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--indices", type=int, nargs="+", default=[5], help="trajectory indices per system")
+    parser.add_argument("--n-temperatures", type=int, nargs="+", default=[5], help="temperatures per campaign")
+    parser.add_argument("--elements", type=int, nargs="+", default=[1, 3], help="elements per system")
+    parser.add_argument("--n-time", type=int, nargs="+", default=[2000, 20000], help="values per series (ps)")
+    parser.add_argument("--systems", type=int, default=1, help="systems per campaign")
+    parser.add_argument("--noise", type=float, default=1.0, help="MSD increment noise relative to the mean")
+    parser.add_argument("--d0", type=float, default=21.4066, help="true D0 [Å^2/ps]")
+    parser.add_argument("--ea", type=float, default=0.3031, help="true Ea [eV]")
+    parser.add_argument("--jobs", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--tol-ea", type=float, default=0.01, help="accepted |Ea error| [eV]")
+    parser.add_argument("--tol-d0", type=float, default=0.15, help="accepted relative D0 error")
+    parser.add_argument("--work-dir", default=None, help="folder for the synthetic campaigns")
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark-results.jsonl"), help="results file")
+    args = parser.parse_args()
+
+    out = os.path.abspath(args.out)
+    setStyle({'font.size': 14})
+    cwd = os.getcwd()
+
+    n_failed = 0
+    for n_index, n_temp, n_element, n_time in itertools.product(args.indices, args.n_temperatures, args.elements, args.n_time):
+        temperatures = [int(t) for t in np.linspace(700, 1100, n_temp)]
+        config = {
+            "n_index": n_index, "temperatures": temperatures, "n_element": n_element, "n_time": n_time,
+            "n_system": args.systems, "noise": args.noise, "d0": args.d0, "ea": args.ea, "jobs": args.jobs,
+        }
+
+        with tempfile.TemporaryDirectory(dir=args.work_dir) as root:
+            start = time.perf_counter()
+            truth = writeCampaign(root, n_index, temperatures, n_element, n_time, args.d0, args.ea, args.noise, args.systems)
+            generate = time.perf_counter() - start
+
+            os.chdir(os.path.join(root, "Scripts"))
+            try:
+                result = runBenchmark(root, truth, args.jobs, args.tol_ea, args.tol_d0)
+            finally:
+                os.chdir(cwd)
+
+        result["stages"] = {"generate": generate, **result["stages"]}
+        record = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git": getGitCommit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "config": config,
+            **result,
+        }
+
+        previous = getPrevious(out, config)
+        with open(out, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+        print(f"indices={n_index} temperatures={n_temp} elements={n_element} n_time={n_time}: {'pass' if record['pass'] else 'FAIL'}")
+        for stage, seconds in record["stages"].items():
+            ratio = ""
+            if previous is not None and previous["stages"].get(stage):
+                ratio = f" ({seconds / previous['stages'][stage]:.2f}x last)"
+            print(f"    {stage:<11} {seconds:9.4f} s{ratio}")
+        print(f"    parse       {record['throughput']['parse_mb_s']:9.1f} MB/s cold, {record['throughput']['parse_warm_mb_s']:.1f} MB/s warm")
+        print("    " + ", ".join(f"{name} error {value:.4g}" for name, value in record["error"].items()))
+
+        n_failed += not record["pass"]
+
+    print(f"Results appended to {out}")
+
+    return n_failed
+
+if __name__ == "__main__":
+    sys.exit(main())
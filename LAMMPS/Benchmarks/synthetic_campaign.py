@@ -0,0 +1,90 @@
+'''
+
+synthetic_campaign.py
+
+Synthetic LAMMPS campaigns with known Arrhenius parameters, written in the formats of the decks
+
+Input parameters:
+    -> root: campaign folder; gets "<system>/", "Plots/<system>/", "Scripts/" and "Scripts/campaign.json"
+    -> n_index, temperatures, n_element, n_time: size of the campaign (runtime label is n_time ps, 1 ps per value)
+    -> d0, ea: ground truth of the system total D, as defined by the analysis scripts (sum over elements of
+        n_atom * per-atom slope of MSD / (2 dim)); defaults are the ones of PyKMC/Scripts/diffusion-check.py
+    -> noise: standard deviation of the MSD increments relative to their mean
+    -> n_system: number of systems, each with the same truth (so every system is a repeat of the check)
+
+Output:
+    -> "<index>_msd_<element>_<runtime>ps_<temperature>.txt" and "<index>_pe_<runtime>ps_<temperature>.txt" files with
+        the "# Fix print output for fix ..." header line, one value per line
+    -> campaign.json for campaign.py, and the truth (d0, ea) returned to the caller
+
+Notes:
+    -> Each element gets a share of the total D (weights 1, 1/2, 1/3, ...), so the contributions differ per element
+    -> The increments of every MSD are independent normal draws, so the truth is exact up to the noise
+    -> Values are written with repr(), which the loaders read back to the same doubles
+
+'''
+
+import json
+import os
+
+import numpy as np
+
+k = 8.6173e-5
+element_names = ["Ni", "Fe", "Cr", "Co", "Mn", "Cu", "Al", "Pd"]
+
+def getElementAtoms(n_element, n_atom=2049):
+    counts = np.full(n_element, n_atom // n_element)
+    counts[0] += n_atom - np.sum(counts)
+
+    return {element_names[e]: int(counts[e]) for e in range(n_element)}
+
+def writeColumn(filename, header, values):
+    with open(filename, "w") as f:
+        f.write(header + "\n")
+        f.write("\n".join(map(repr, values.tolist())))
+        f.write("\n")
+
+def writeCampaign(root, n_index=5, temperatures=(700, 800, 900, 1000, 1100), n_element=1, n_time=2000,
+        d0=21.4066, ea=0.3031, noise=1.0, n_system=1, dim=3, seed=0):
+    rng = np.random.default_rng(seed)
+    n_atom = getElementAtoms(n_element)
+    elements = list(n_atom)
+    weights = 1 / np.arange(1, n_element + 1)
+    weights /= np.sum(weights)
+
+    os.makedirs(os.path.join(root, "Scripts"), exist_ok=True)
+
+    systems = []
+    for s in range(n_system):
+        name = f"Synthetic{s + 1}"
+        folder = os.path.join(root, name)
+        os.makedirs(folder, exist_ok=True)
+        os.makedirs(os.path.join(root, "Plots", name), exist_ok=True)
+
+        for idx in range(1, n_index + 1):
+            for temp in temperatures:
+                d_total = d0 * np.exp(-ea / (k * temp))
+
+                for e, elem in enumerate(elements):
+                    # per-atom MSD slope giving this element's share of the total D
+                    slope = 2 * dim * d_total * weights[e] / n_atom[elem]
+                    msd = np.cumsum(rng.normal(slope, noise * slope, n_time)) + 1e-5
+                    writeColumn(f"{folder}/{idx}_msd_{elem}_{n_time}ps_{temp}.txt", "# Fix print output for fix msdout", msd)
+
+                pe = -4.45 * sum(n_atom.values()) + rng.normal(0, 1, n_time)
+                writeColumn(f"{folder}/{idx}_pe_{n_time}ps_{temp}.txt", "# Fix print output for fix peout", pe)
+
+        systems.append({
+            "name": name,
+            "folder": f"../{name}",
+            "elements": elements,
+            "n_atom": n_atom,
+            "indices": list(range(1, n_index + 1)),
+            "runtimes": [n_time],
+        })
+
+    manifest = {"temperatures": list(temperatures), "dim": dim, "systems": systems}
+    with open(os.path.join(root, "Scripts", "campaign.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return {"d0": d0, "ea": ea}
@@ -1,54 +1,35 @@
 """
 
-Open a column-based list of activation energy (Ea) and rate constant (D0)
-values for certain systems, then plot the results using the Arrhenius
-expressions. Export the plots as png files when finished.
+Open the activation energy (Ea) and rate constant (D0) results of certain systems written by auto-ea.py,
+then plot the results using the Arrhenius expressions. Export the plots as png files when finished.
 
-"""
-
-import numpy as np
-import matplotlib.pyplot as plt
-
-systems = ["Ni", "NiFe", "NiFeCr"]
-nSys = len(systems)
-nRun = 25
-
-def importParams(sysId):
-
-    inf = "./system_d0_ea_" + systems[sysId] + ".txt"  # input file
+The number of runs is read from each results file.
 
-    with open(inf, 'r') as f:
+"""
 
-        nRun = int(f.readline())
+import os
+import sys
 
-        d0_ea = []
-        for line in range(nRun):
-            newline = f.readline().split()
-            d0 = newline[1]
-            ea = newline[2]
-            d0_ea.append([d0, ea])
+import matplotlib.pyplot as plt
 
-    f.close()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ea_results import getResultsFilename, readResults
 
-    return d0_ea
+systems = ["Ni", "NiFe", "NiFeCr"]
 
-def plot(d0_ea, sysId):
+def plot(results, sys_name):
 
     plt.figure()
 
-    plt.hist(d0_ea[:,1])    # Ea histogram
+    plt.hist(results['ea'])    # Ea histogram
+    plt.xlabel("Activation Energy [eV]")
+    plt.ylabel(f"Count ({results['n_run']} runs)")
 
-    plt.savefig('ea_hist-' + systems[sysId] + '.png')
+    plt.savefig('ea_hist-' + sys_name + '.png')
+    plt.close()
 
     return
 
-def exportIMG():
-    return
-
-system_params = np.empty((nSys, nRun, 2))
-
-for sysId in range(nSys):
-
-    system_params[sysId] = importParams(sysId)
+for sys_name in systems:
 
-    plot(system_params[sysId], sysId)
+    plot(readResults(getResultsFilename(".", sys_name)), sys_name)
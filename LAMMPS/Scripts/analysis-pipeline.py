@@ -0,0 +1,155 @@
+'''
+
+analysis-pipeline.py
+
+Input parameters:
+    -> --manifest FILE (command line): campaign manifest with the systems, indices, runtimes, elements, n_atom,
+        temperatures and dim (see campaign.py; defaults to campaign.json)
+    -> --arrhenius, --sd-contribution, --convergence, --pe (command line): analyses to run; all of them if none is given
+    -> --jobs N (command line): number of worker processes used to parse files and render plots
+    -> --redraw (command line): render every plot, including the ones whose data and style have not changed (see figures.py)
+    -> --tol X, --resample bootstrap|jackknife, --n-resample N, --d-se autocorr|block|spread (command line): passed on as
+        in the separate scripts
+    -> --stream (command line): run the Arrhenius and element contribution analyses one trajectory index at a time
+        (see streaming.py); memory then stays flat in the number of indices
+
+Input files:
+    -> Mean Squared Displacement files "<index>_msd_<element>_<runtime>ps_<temperature>.txt"
+    -> Potential Energy files "<index>_pe_<runtime>ps_<temperature>.txt" (--pe only)
+
+Output:
+    -> The plots and stdout of arrhenius-histogram-plot.py, sd-contribution-plot.py, diffusion-convergence-plot.py
+        and pe-fit-plot.py, for the selected analyses
+
+Notes:
+    -> Every file is read once per run: the SD and PE arrays of a system are loaded once and every selected analysis
+        works on them; the per-runtime fits of the total SD are shared by the Arrhenius and convergence analyses
+    -> The analyses themselves live in the separate scripts, which are imported here
+    -> The convergence and PE analyses need every series at once, so with --stream they still load the whole system
+
+'''
+
+import argparse
+import importlib
+
+import numpy as np
+
+from block_average import addDSEArgs, getRuntimeSlopeSE
+from campaign import addCampaignArgs, getCampaign, getSystemPE, getSystemSD
+from figures import addFigureArgs, queueFigure, renderFigures, setRedraw, setStyle
+from ols_fit import getRuntimeFits
+from parallel_jobs import addJobsArgs, getJobs
+from resample import addResampleArgs
+from streaming import addStreamArgs, streamSystem
+
+arrhenius_script = importlib.import_module("arrhenius-histogram-plot")
+convergence_script = importlib.import_module("diffusion-convergence-plot")
+pe_script = importlib.import_module("pe-fit-plot")
+sd_script = importlib.import_module("sd-contribution-plot")
+
+def addAnalysisArgs(parser):
+    parser.add_argument("--arrhenius", action="store_true", help="Arrhenius fits and plots")
+    parser.add_argument("--sd-contribution", action="store_true", help="SD ensembles and element contributions")
+    parser.add_argument("--convergence", action="store_true", help="diffusion convergence")
+    parser.add_argument("--pe", action="store_true", help="potential energy fits")
+
+def getAnalyses(args):
+    analyses = {name for name in ("arrhenius", "sd_contribution", "convergence", "pe") if getattr(args, name)}
+
+    return analyses or {"arrhenius", "sd_contribution", "convergence", "pe"}
+
+def analyzeSystemStream(campaign, system, analyses, resample_method=None, n_resample=None, jobs=1, d_se_method="spread"):
+    temperatures = campaign["temperatures"]
+
+    def onIndex(i, sd, n_time):
+        if i == 1 and "sd_contribution" in analyses:
+            print(f"Plotting {system['name']} SD ensemble...")
+            sd_script.plotSDEnsemble(system["name"], temperatures, sd, n_time, system["runtimes"], system["elements"])
+
+    d_se_method = None if d_se_method == "spread" or "arrhenius" not in analyses else d_se_method
+    stats, arrhenius, lnd_last = streamSystem(campaign, system, arrhenius_script.getArrheniusDependant(temperatures), jobs, onIndex, d_se_method)
+
+    if "sd_contribution" in analyses:
+        sd_script.plotContributions(system["name"], temperatures, stats["contributions"].mean[-1], system["elements"])
+
+    if "arrhenius" in analyses:
+        return arrhenius_script.analyzeArrheniusStream(system["name"], temperatures, stats, arrhenius, lnd_last, resample_method, n_resample)
+
+    return np.nan, np.nan, np.nan
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    addCampaignArgs(parser)
+    addAnalysisArgs(parser)
+    addJobsArgs(parser)
+    addFigureArgs(parser)
+    addResampleArgs(parser)
+    addDSEArgs(parser)
+    convergence_script.addTolArgs(parser)
+    addStreamArgs(parser)
+    args = parser.parse_args()
+
+    jobs = getJobs(args)
+    setRedraw(args.redraw)
+    analyses = getAnalyses(args)
+    stream = args.stream
+    campaign = getCampaign(args)
+    temperatures = campaign["temperatures"]
+    systems = campaign["systems"]
+
+    resample_method, n_resample = (args.resample, args.n_resample) if "arrhenius" in analyses else (None, None)
+    d_se_method = args.d_se
+    tol = args.tol
+
+    setStyle({'font.size': 14})
+
+    lnd_total_se  = np.empty((len(systems), len(temperatures)), dtype=float)
+    lnd_total_avg = np.empty((len(systems), len(temperatures)), dtype=float)
+    arrhenius_avg = np.empty((len(systems), 2), dtype=float)
+
+    for system_idx, system in enumerate(systems):
+        system_name = system["name"]
+        runtimes = system["runtimes"]
+
+        if stream and analyses & {"arrhenius", "sd_contribution"}:
+            lnd_total_avg[system_idx], lnd_total_se[system_idx], arrhenius_avg[system_idx] = analyzeSystemStream(campaign, system, analyses, resample_method, n_resample, jobs, d_se_method)
+
+        if "convergence" in analyses or (not stream and analyses & {"arrhenius", "sd_contribution"}):
+            # sd: (index, runtime, temperature, element, time), NaN padded past n_time[index, runtime, temperature]
+            sd, n_time = getSystemSD(campaign, system, jobs)
+
+            if "sd_contribution" in analyses and not stream:
+                sd_script.analyzeSDContribution(system_name, temperatures, runtimes, system["elements"], sd, n_time)
+
+            if analyses & {"arrhenius", "convergence"}:
+                sd_total = np.sum(sd, axis=3)
+                d_total = getRuntimeFits(sd_total, n_time)
+
+                if "arrhenius" in analyses and not stream:
+                    d_se = None if d_se_method == "spread" else getRuntimeSlopeSE(sd_total, n_time, d_se_method)
+                    lnd_total_avg[system_idx], lnd_total_se[system_idx], arrhenius_avg[system_idx] = arrhenius_script.analyzeArrhenius(system_name, temperatures, d_total, resample_method, n_resample, d_se)
+
+                if "convergence" in analyses:
+                    convergence_script.analyzeConvergence(system_name, temperatures, runtimes, sd_total, n_time, d_total, tol)
+
+                del sd_total
+
+            del sd
+
+        if "pe" in analyses:
+            pe, n_time = getSystemPE(campaign, system, jobs)
+            pe_script.analyzePE(system_name, temperatures, runtimes, pe, n_time)
+            del pe
+
+    if "arrhenius" in analyses:
+        print(f"Generating group Arrhenius plot.")
+        of = f"../Plots/arrhenius-group.png"
+        queueFigure(of, arrhenius_script.plotArrheniusAverageGroup, [system["name"] for system in systems], temperatures, lnd_total_avg, lnd_total_se, arrhenius_avg, of)
+
+    renderFigures(jobs)
+
+    return
+
+if __name__ == "__main__":
+    main()
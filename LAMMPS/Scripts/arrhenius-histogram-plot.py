@@ -3,13 +3,12 @@
 arrhenius-histogram-plot.py
 
 Input parameters:
-    -> System folders: The folder name where files are stored per system
-    -> Indices: Per-system list of indices for each system trajectory
-    -> Temperatures: Assumes that the same temperatures were tested for each system
-    -> Runtimes: Per-system list of runtimes in ps; should be ordered from shortest to longest
-    -> Elements: The individual elements included in each system; do not have to reflect system folder names
-    -> n_atoms: Number of atoms for each constituent element in a system; stored as a dictionary
-    -> dim: The number of dimensions of the system
+    -> --manifest FILE (command line): campaign manifest with the systems, indices, runtimes, elements, n_atom,
+        temperatures and dim (see campaign.py; defaults to campaign.json)
+    -> --jobs N (command line): number of worker processes used to parse files and render plots
+    -> --redraw (command line): render every plot, including the ones whose data and style have not changed (see figures.py)
+    -> --resample bootstrap|jackknife, --n-resample N (command line): resampling used for the Ea and ln(D0) confidence intervals
+    -> --d-se autocorr|block|spread (command line): error of every D behind the ln(D) error bars (see block_average.py)
 
 Input files:
     -> Mean Squared Displacement files are expected to have format "<index>_msd_<element>_<runtime>ps_<temperature>.txt"
@@ -20,6 +19,8 @@ Plots generated:
 
 Other Output:
     -> the Ea and ln(D0) values are echoed to stdout
+    -> bootstrap (or jackknife) standard errors and 95% confidence intervals of Ea and ln(D0), printed once as they
+        are the same for both methods (see resample.py)
 
 Notes:
     -> Two methods are used for getting Ea and D0 estimates, and are both echoed as output.
@@ -28,46 +29,33 @@ Notes:
 
     -> Values are only estimated with the longest runtime
 
+    -> The ln(D) error bars combine the error of every trajectory's D, corrected for the correlation of the SD series
+        (the OLS SE of a cumulative series is far too small); "spread" uses the scatter over trajectories instead
+
 '''
 
-import statsmodels.api as sm
+import argparse
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import colors
 
-system_folders = ["Ni", "NiFe", "NiFeCr"]
+from block_average import addDSEArgs, getLndSE, getRuntimeSlopeSE
+from campaign import addCampaignArgs, getCampaign, getSystemSD
+from figures import addFigureArgs, queueFigure, renderFigures, setRedraw, setStyle
+from ols_fit import getLinearFit, getRuntimeFits
+from parallel_jobs import addJobsArgs, getJobs
+from resample import addResampleArgs, getArrheniusUncertainty
 
 k = 8.6173E-5
-temperatures = [700, 800, 900, 1000, 1100]
-arrhenius_dependant = [1 / (k * t) for t in temperatures]
-dim = 3
-
-def getParameterFromFile(filename, n_atom_consituent):
-    with open(filename, "r") as f:
-        next(f) # skip header line
-        next(f) # skip tiny first value
-        initial_jump = float(f.readline())  # to normalize each reading
-        parameter = []
-        for line in f:
-            line = line.strip()
-            if line != '':
-                msd = float(line)
-                sd = (msd - initial_jump) / (2 * dim) * n_atom_consituent
-                parameter.append(sd)
-    return parameter
-
-def getFitFromParams(x, y):
-    x = sm.add_constant(x)
-    fit = sm.OLS(y, x).fit()
-    return fit.params
-
-def getFitFromArray(arr):
-    return getFitFromParams(np.arange(len(arr)), arr)
-
-def plotArrheniusHistogram(system_name, arrhenius, indices):
+
+def getArrheniusDependant(temperatures):
+    return [1 / (k * t) for t in temperatures]
+
+def plotArrheniusHistogram(arrhenius, of):
     fig, ax = plt.subplots(figsize=(8,6))
 
-    se = np.std(arrhenius[:, 1], ddof=1) / np.sqrt(len(indices))
+    se = np.std(arrhenius[:, 1], ddof=1) / np.sqrt(len(arrhenius))
 
     N, bins, patches = ax.hist(arrhenius[:, 1], label=f"S.E. = {se:.4f}")
 
@@ -82,16 +70,15 @@ def plotArrheniusHistogram(system_name, arrhenius, indices):
     ax.set_ylabel("Count", fontsize=14)
     plt.legend()
 
-    of = f"../Plots/{system_name}/arrhenius-histogram.png"
     fig.savefig(of)
     plt.close()
 
     return
 
-def plotArrheniusAverage(system_name, lnd_total_avg, arrhenius, lnd_se):
+def plotArrheniusAverage(temperatures, lnd_total_avg, arrhenius, lnd_se, of):
     fig, ax1 = plt.subplots()
 
-    x = np.array(arrhenius_dependant)
+    x = np.array(getArrheniusDependant(temperatures))
     y = np.array(lnd_total_avg)
 
     ax1.errorbar(x, y, yerr=lnd_se, fmt='bo', mec='k')
@@ -116,20 +103,19 @@ def plotArrheniusAverage(system_name, lnd_total_avg, arrhenius, lnd_se):
     ax2.set_xlabel("Temperature [K]")
     ax2.set_xticks(temperatures)
 
-    of = f"../Plots/{system_name}/arrhenius.png"
     fig.savefig(of)
     plt.close()
 
     return
 
-def plotArrheniusAverageGroup(lnd_total_avg, lnd_total_se, arrhenius_avg):
+def plotArrheniusAverageGroup(system_names, temperatures, lnd_total_avg, lnd_total_se, arrhenius_avg, of):
     fig, ax1 = plt.subplots(figsize=(8,6))
 
     colors = plt.cm.tab10.colors
 
-    x = np.array(arrhenius_dependant)
+    x = np.array(getArrheniusDependant(temperatures))
 
-    for s, system_name in enumerate(system_folders):
+    for s, system_name in enumerate(system_names):
         b, m = arrhenius_avg[s]
 
         ax1.errorbar(x, lnd_total_avg[s], yerr=lnd_total_se[s], fmt='o', color=colors[s % len(colors)], mec='k', label=f"{system_name} (Ea={m:.3f} eV)")
@@ -152,102 +138,121 @@ def plotArrheniusAverageGroup(lnd_total_avg, lnd_total_se, arrhenius_avg):
     ax2.set_xlabel("Temperature [K]")
     ax2.set_xticks(temperatures)
 
-    of = f"../Plots/arrhenius-group.png"
     fig.savefig(of)
     plt.close()
 
     return
 
-def main():
+def reportArrhenius(system_name, temperatures, method1, lnd_total_avg, lnd_total_se, arrhenius, lnd_last, resample_method, n_resample):
+    # method1: (Ea, SE, VAR, D0, SE, VAR) of the per-trajectory fits; arrhenius, lnd_last: per-trajectory fits and ln(D)
+    arrhenius_dependant = getArrheniusDependant(temperatures)
 
-    plt.rcParams.update({'font.size': 14})
+    ea, se_ea, var_ea, d0, se_d0, var_d0 = method1
+    print(f"(Method 1) {system_name} mean Arrhenius parameters: Ea = {ea:.4f} eV, SE = {se_ea:.4f}, VAR = {var_ea:.4f}, D0 = {d0:.4f}, SE = {se_d0:.4f}, VAR = {var_d0:.4f}")
 
-    lnd_total_se  = np.empty((len(system_folders), len(temperatures)), dtype=float)
-    lnd_total_avg = np.empty((len(system_folders), len(temperatures)), dtype=float)
-    arrhenius_avg = np.empty((len(system_folders), 2), dtype=float)
+    arrhenius_avg, _ = getLinearFit(np.array(arrhenius_dependant), lnd_total_avg)
+    arrhenius_avg[1] *= -1
 
-    for system_idx, system_name in enumerate(system_folders):
+    d0 = np.exp(arrhenius_avg[0])
+    ea = arrhenius_avg[1]
 
-        if system_name == "Ni":
-            elements = ["Ni"]
-            n_atom = {'Ni': 2049}
-            indices = np.arange(1, 6)
-            runtimes = [5000]
-        elif system_name == "NiFe":
-            elements = ["Ni", "Fe"]
-            n_atom = {'Ni': 756, 'Fe': 1293}
-            runtimes = [100000]
-            indices = np.arange(1, 6)
-        elif system_name == "NiFeCr":
-            elements = ["Ni", "Fe", "Cr"]
-            n_atom = {'Ni': 1511, 'Fe': 218, 'Cr': 320}
-            runtimes = [250000]
-            indices = np.arange(1, 6)
+    print(f"(Method 2) {system_name} mean Arrhenius parameters: Ea = {ea:.4f} eV, D0 = {d0:.4f}")
 
-        sd          = np.empty((len(indices), len(runtimes), len(temperatures), len(elements))  , dtype=object)
-        sd_total    = np.empty((len(indices), len(runtimes), len(temperatures))                 , dtype=object)
-        d_total     = np.empty((len(indices), len(runtimes), len(temperatures), 2)              , dtype=float)
-        lnd_total   = np.empty((len(indices), len(runtimes), len(temperatures))                 , dtype=float)
-        arrhenius   = np.empty((len(indices), 2)                                                , dtype=float)
-        d0          = np.empty((len(indices))                                                   , dtype=float)
+    uncertainty = getArrheniusUncertainty(arrhenius_dependant, lnd_last, resample_method, n_resample)
+    for name, (estimate, se, lo, hi) in uncertainty.items():
+        print(f"({resample_method}, Methods 1 and 2) {system_name} {name} = {estimate:.4f}, SE = {se:.4f}, 95% CI = [{lo:.4f}, {hi:.4f}]")
 
-        for i, idx in enumerate(indices):
-            for r, rtime in enumerate(runtimes):
-                for t, temp in enumerate(temperatures):
-                    for e, elem in enumerate(elements):
+    print(f"Plotting {system_name} Arrhenius histogram...")
+    of = f"../Plots/{system_name}/arrhenius-histogram.png"
+    queueFigure(of, plotArrheniusHistogram, arrhenius, of)
 
-                        f = f"../{system_name}/{idx}_msd_{elements[e]}_{rtime}ps_{temp}.txt"
-                        sd[i, r, t, e] = getParameterFromFile(f, n_atom[elem])
+    print(f"Generating {system_name} Arrhenius plots...")
+    of = f"../Plots/{system_name}/arrhenius.png"
+    queueFigure(of, plotArrheniusAverage, temperatures, lnd_total_avg, arrhenius_avg, lnd_total_se, of)
+
+    return lnd_total_avg, lnd_total_se, arrhenius_avg
+
+def analyzeArrhenius(system_name, temperatures, d_total, resample_method, n_resample, d_se=None):
+    # d_total: (index, runtime, temperature, 2) fits of the total SD, d_se: (index, runtime, temperature) errors of D;
+    # returns the Method 2 inputs and fit
+    arrhenius_dependant = getArrheniusDependant(temperatures)
+    n_index = d_total.shape[0]
+
+    lnd_total = np.log(np.where(d_total[..., 1] < 0, 1e-6, d_total[..., 1]))
 
-                    sd_total[i, r, t] = np.sum(np.stack(sd[i, r, t, :]), axis=0)
+    arrhenius, _ = getLinearFit(arrhenius_dependant, lnd_total[:, -1, :])
 
-                    d_total[i, r, t] = getFitFromArray(sd_total[i, r, t])
-                    if d_total[i, r, t, 1] < 0:
-                        d_total[i, r, t, 1] = 1e-6
+    arrhenius[:, 1] *= -1   # activation energy is always > 0
+    d0 = np.mean(np.exp(arrhenius[:, 0]))
+    se_d0 = np.std(arrhenius[:, 0], ddof=1) / np.sqrt(n_index)
+    var_d0 = np.var(arrhenius[:, 0], ddof=1)
 
-                    lnd_total[i, r, t] = np.log(d_total[i, r, t, 1])
+    ea = np.mean(arrhenius[:, 1])
+    se_ea = np.std(arrhenius[:, 1], ddof=1) / np.sqrt(n_index)
+    var_ea = np.var(arrhenius[:, 1], ddof=1)
 
-            arrhenius[i] = getFitFromParams(arrhenius_dependant, lnd_total[i, -1, :])
+    lnd_total_avg = np.mean(lnd_total[:, -1, :], axis=0)
+    if d_se is None:
+        lnd_total_se  = np.std(lnd_total[:, -1, :], axis=0, ddof=1) / np.sqrt(n_index)
+    else:
+        lnd_total_se  = getLndSE(d_total[:, -1, :, 1].T, d_se[:, -1].T)
 
-        arrhenius[:, 1] *= -1   # activation energy is always > 0
-        d0 = np.mean(np.exp(arrhenius[:, 0]))
-        se_d0 = np.std(arrhenius[:, 0], ddof=1) / np.sqrt(len(indices))
-        var_d0 = np.var(arrhenius[:, 0], ddof=1)
+    method1 = (ea, se_ea, var_ea, d0, se_d0, var_d0)
+    return reportArrhenius(system_name, temperatures, method1, lnd_total_avg, lnd_total_se, arrhenius, lnd_total[:, -1, :], resample_method, n_resample)
 
-        ea = np.mean(arrhenius[:, 1])
-        se_ea = np.std(arrhenius[:, 1], ddof=1) / np.sqrt(len(indices))
-        var_ea = np.var(arrhenius[:, 1], ddof=1)
+def analyzeArrheniusStream(system_name, temperatures, stats, arrhenius, lnd_last, resample_method, n_resample):
+    # same output as analyzeArrhenius from the running accumulators of streaming.py
+    method1 = (stats["ea"].mean, stats["ea"].getSE(), stats["ea"].getVar(), stats["d0"].mean, stats["ln_d0"].getSE(), stats["ln_d0"].getVar())
 
-        print(f"(Method 1) {system_name} mean Arrhenius parameters: Ea = {ea:.4f} eV, SE = {se_ea:.4f}, VAR = {var_ea:.4f}, D0 = {d0:.4f}, SE = {se_d0:.4f}, VAR = {var_d0:.4f}")
+    if "lnd_rel2" in stats:
+        lnd_total_se = np.sqrt(stats["lnd_rel2"].mean[-1] / stats["lnd_rel2"].n)
+    else:
+        lnd_total_se = stats["lnd"].getSE()[-1]
 
-        for t, temp in enumerate(temperatures):
-            lnd_mean = np.mean(lnd_total[:, -1, t])
-            lnd_se   = np.std(lnd_total[:, -1, t], ddof=1) / np.sqrt(len(indices))
+    return reportArrhenius(system_name, temperatures, method1, stats["lnd"].mean[-1], lnd_total_se, arrhenius, lnd_last, resample_method, n_resample)
 
-            lnd_total_avg[system_idx, t] = lnd_mean
-            lnd_total_se[system_idx, t]  = lnd_se
+def main():
+
+    parser = argparse.ArgumentParser()
+    addCampaignArgs(parser)
+    addJobsArgs(parser)
+    addFigureArgs(parser)
+    addResampleArgs(parser)
+    addDSEArgs(parser)
+    args = parser.parse_args()
 
-        x = np.array(arrhenius_dependant)
-        y = lnd_total_avg[system_idx]
+    jobs = getJobs(args)
+    setRedraw(args.redraw)
+    resample_method, n_resample = args.resample, args.n_resample
+    d_se_method = args.d_se
+    campaign = getCampaign(args)
+    temperatures = campaign["temperatures"]
+    systems = campaign["systems"]
 
-        arrhenius_avg[system_idx] = getFitFromParams(x, y)
-        arrhenius_avg[system_idx, 1] *= -1
+    setStyle({'font.size': 14})
 
-        d0 = np.exp(arrhenius_avg[system_idx, 0])
-        ea = arrhenius_avg[system_idx, 1]
+    lnd_total_se  = np.empty((len(systems), len(temperatures)), dtype=float)
+    lnd_total_avg = np.empty((len(systems), len(temperatures)), dtype=float)
+    arrhenius_avg = np.empty((len(systems), 2), dtype=float)
 
-        print(f"(Method 2) {system_name} mean Arrhenius parameters: Ea = {ea:.4f} eV, D0 = {d0:.4f}")
+    for system_idx, system in enumerate(systems):
 
-        print(f"Plotting {system_name} Arrhenius histogram...")
-        plotArrheniusHistogram(system_name, arrhenius, indices)
+        # sd: (index, runtime, temperature, element, time), NaN padded past n_time[index, runtime, temperature]
+        sd, n_time = getSystemSD(campaign, system, jobs)
+        sd_total = np.sum(sd, axis=3)
+        d_total = getRuntimeFits(sd_total, n_time)
+        d_se = None if d_se_method == "spread" else getRuntimeSlopeSE(sd_total, n_time, d_se_method)
 
-        print(f"Generating {system_name} Arrhenius plots...")
-        plotArrheniusAverage(system_name, lnd_total_avg[system_idx], arrhenius_avg[system_idx], lnd_total_se[system_idx])
+        lnd_total_avg[system_idx], lnd_total_se[system_idx], arrhenius_avg[system_idx] = analyzeArrhenius(system["name"], temperatures, d_total, resample_method, n_resample, d_se)
 
     print(f"Generating group Arrhenius plot.")
 
-    plotArrheniusAverageGroup(lnd_total_avg, lnd_total_se, arrhenius_avg)
+    of = f"../Plots/arrhenius-group.png"
+    queueFigure(of, plotArrheniusAverageGroup, [system["name"] for system in systems], temperatures, lnd_total_avg, lnd_total_se, arrhenius_avg, of)
+
+    renderFigures(jobs)
 
     return
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+'''
+
+campaign.py
+
+Campaign manifest shared by the LAMMPS analysis scripts
+
+Input parameters:
+    -> --manifest FILE (command line): JSON or TOML manifest; defaults to campaign.json next to this file
+
+Manifest layout:
+    -> temperatures: temperatures tested for every system
+    -> dim: the number of dimensions of the systems
+    -> systems: one entry per system with
+        name: used for the plot folder "../Plots/<name>"
+        folder: where the output files are stored (defaults to "../<name>")
+        elements: the individual elements in the system; do not have to reflect system names
+        n_atom: number of atoms for each constituent element, as a table
+        indices: list of trajectory indices
+        runtimes: list of runtimes in ps, ordered from shortest to longest
+        input, sizes: LAMMPS deck and box sizes, only used by run-campaign.py (see lammps_runner.py)
+
+'''
+
+import json
+import os
+
+import numpy as np
+
+from msd_loader import getPEArray, getSDArray
+
+default_manifest = os.path.join(os.path.dirname(os.path.abspath(__file__)), "campaign.json")
+
+def addCampaignArgs(parser):
+    parser.add_argument("--manifest", default=default_manifest, help="campaign manifest (JSON or TOML)")
+
+def readCampaign(filename):
+    if filename.endswith(".toml"):
+        import tomllib # Python 3.11+
+
+        with open(filename, "rb") as f:
+            campaign = tomllib.load(f)
+    else:
+        with open(filename, "r") as f:
+            campaign = json.load(f)
+
+    for key in ("temperatures", "systems"):
+        if key not in campaign:
+            raise ValueError(f"{filename}: missing '{key}'")
+
+    campaign.setdefault("dim", 3)
+
+    for system in campaign["systems"]:
+        for key in ("name", "elements", "n_atom", "indices", "runtimes"):
+            if key not in system:
+                raise ValueError(f"{filename}: system {system.get('name', '?')} is missing '{key}'")
+
+        missing = [elem for elem in system["elements"] if elem not in system["n_atom"]]
+        if missing:
+            raise ValueError(f"{filename}: system {system['name']} has no n_atom for {missing}")
+
+        system.setdefault("folder", f"../{system['name']}")
+        system["indices"] = np.array(system["indices"])
+
+    return campaign
+
+def getCampaign(args):
+    return readCampaign(args.manifest)
+
+def getSystemSD(campaign, system, jobs=1):
+    return getSDArray(system["folder"], system["indices"], system["runtimes"], campaign["temperatures"], system["elements"], system["n_atom"], campaign["dim"], jobs)
+
+def getSystemPE(campaign, system, jobs=1):
+    return getPEArray(system["folder"], system["indices"], system["runtimes"], campaign["temperatures"], jobs)
@@ -0,0 +1,156 @@
+'''
+
+decks.py
+
+Renders the LAMMPS input decks of a campaign from the system specs of the manifest
+
+Input parameters:
+    -> deck (manifest table, all optional): settings shared by every deck
+        potential: eam/alloy file (default FeNiCr_ArturV3.eam), lattice: fcc lattice parameter in Å (default 3.52),
+        every: output interval in steps (default 1000), timestep: in ps (default 0.001),
+        equilibration: NPT steps before the measured run (default 50000)
+    -> systems (manifest): besides the keys read by campaign.py every system takes
+        fractions: fraction of the whole box of every element after the first, e.g. {"Fe": 0.10, "Cr": 0.18}
+        seed: offset added to the trajectory index for the random seeds (default 0)
+        masses: atomic masses, for elements missing from the table below
+
+Output:
+    -> "<name>.in" per system, run as "lmp -in <name>.in -var size S -var temp T -var index I [-var runtime R] [-var out F]"
+    -> Every run writes a single file "./<out>/<index>_md_<runtime>ps_<temperature>.txt" through one fix print:
+        a "# step msd_<element>... pe" title line, then one row per output interval (read by msd_loader.py)
+
+Notes:
+    -> One output fix per run, with one ID, so outputs can no longer overwrite each other by a reused fix ID
+        (the per-element decks reused "msdout" and kept only the last element)
+    -> The runtime defaults to the longest runtime of the system and can be set per run with "-var runtime"
+    -> The output folder defaults to "<name>" and can be set per run with "-var out", so runs of several box sizes do
+        not write the same files (see lammps_runner.py)
+    -> "set type/fraction" acts on the atoms still of type 1, so the box fractions are converted to fractions of
+        what is left; the random assignment only matches them on average
+    -> The interstitial is inserted as type 1 after the types are set, as in the hand-written decks
+
+'''
+
+masses = {"Ni": 58.69, "Fe": 55.85, "Cr": 52.00, "Co": 58.93, "Mn": 54.94, "Cu": 63.55, "Al": 26.98, "Pd": 106.42}
+
+deck_defaults = {
+    "potential": "FeNiCr_ArturV3.eam",
+    "lattice": 3.52,
+    "every": 1000,
+    "timestep": 0.001,
+    "equilibration": 50000,
+}
+
+def getDeckSettings(campaign):
+    settings = dict(deck_defaults)
+    settings.update(campaign.get("deck", {}))
+
+    return settings
+
+def getRemainingFractions(elements, fractions):
+    # box fractions -> fractions of the type 1 atoms left when each "set type/fraction" runs
+    remaining = 1.0
+    result = []
+    for elem in elements[1:]:
+        result.append(fractions[elem] / remaining)
+        remaining -= fractions[elem]
+
+    if remaining <= 0:
+        raise ValueError(f"Fractions {fractions} leave no {elements[0]}")
+
+    return result
+
+def renderDeck(system, settings):
+    name = system["name"]
+    elements = system["elements"]
+    fractions = system.get("fractions", {})
+    seed = system.get("seed", 0)
+    element_masses = {**masses, **system.get("masses", {})}
+
+    missing = [elem for elem in elements[1:] if elem not in fractions]
+    if missing:
+        raise ValueError(f"System {name} has no fraction for {missing}")
+    missing = [elem for elem in elements if elem not in element_masses]
+    if missing:
+        raise ValueError(f"System {name} has no mass for {missing}")
+
+    runtime = max(system["runtimes"])
+    steps = f"$(floor(v_runtime/{settings['timestep']}+0.5):%.0f)"
+
+    lines = [
+        f"# {name}: generated by decks.py",
+        "",
+        "variable        T equal ${temp}",
+        "variable        I equal ${index}",
+        f"variable        seed equal ${{index}}+{seed}",
+        f"variable        every equal {settings['every']}",
+        f"variable        runtime index {runtime}    # ps, override with -var runtime",
+        f"variable        out index {name}    # output folder, override with -var out",
+        "",
+        "dimension       3",
+        "",
+        "units           metal",
+        "boundary        p p p",
+        "atom_style      atomic",
+        "neighbor        2 bin",
+        "",
+        f"lattice         fcc {settings['lattice']}",
+        "",
+        "variable        S equal ${size}",
+        "variable        Smid equal (${size}/2)",
+        "variable        Smod equal (${size}/2+0.5)",
+        "",
+        "region          box block 0 ${S} 0 ${S} 0 ${S}",
+        f"create_box      {len(elements)} box",
+        "",
+    ]
+    lines += [f"mass            {t + 1} {element_masses[elem]:.2f}" for t, elem in enumerate(elements)]
+    lines += [
+        "",
+        "pair_style      eam/alloy",
+        f"pair_coeff      * * {settings['potential']} {' '.join(elements)}",
+        "",
+        "create_atoms    1 box",
+        "",
+    ]
+    for t, fraction in enumerate(getRemainingFractions(elements, fractions)):
+        percent = 100 * fractions[elements[t + 1]]
+        lines.append(f"set             type 1 type/fraction {t + 2} {fraction:.6f} $(v_seed+{100 * t}:%.0f)   # {percent:g}% {elements[t + 1]}")
+    if len(elements) > 1:
+        lines.append("")
+
+    lines += [f"group           {elem} type {t + 1}" for t, elem in enumerate(elements)]
+    lines += [
+        "",
+        "create_atoms    1 single  ${Smid} ${Smod} ${Smid}",
+        "",
+        "velocity        all create $T ${seed}",
+        "",
+        "fix             1 all npt temp $T $T 5 iso 0 0 10",
+        "",
+        "thermo          1000",
+        "",
+        f"timestep        {settings['timestep']}",
+        "",
+        f"run             {settings['equilibration']}",
+        "",
+    ]
+    for elem in elements:
+        lines += [
+            f"compute         msd_{elem} {elem} msd",
+            f"variable        msd_{elem}_ equal c_msd_{elem}[4]",
+        ]
+
+    values = " ".join(["${step_}"] + [f"${{msd_{elem}_}}" for elem in elements] + ["${pe_}"])
+    title = " ".join(["# step"] + [f"msd_{elem}" for elem in elements] + ["pe"])
+    lines += [
+        "variable        step_ equal step",
+        "variable        pe_ equal pe",
+        f"fix             out all print ${{every}} \"{values}\" file ./${{out}}/$I_md_${{runtime}}ps_$T.txt screen no title \"{title}\"",
+        "",
+        f"thermo_style    custom step temp pe c_msd_{elements[0]}[4]",
+        "",
+        f"run             {steps}",
+    ]
+
+    return "\n".join(lines) + "\n"
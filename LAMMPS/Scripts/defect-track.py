@@ -0,0 +1,88 @@
+'''
+
+defect-track.py
+
+Input parameters:
+    -> trajectory (command line): dump or xyz trajectory of a run with point defects (e.g. the single SIA of the Ni
+        decks, or the SIA and vacancy of cube_sia_monovacancy_pair_Ni)
+    -> --index, --runtime, --temperature (command line): used to name the output files like the fix print output
+    -> --out-dir (command line): folder the defect MSD files are written to, usually the system folder "../<system>"
+    -> --max-lag F (command line): fraction of the trajectory length written out; long lags have few time origins
+    -> --lattice A (command line): FCC lattice parameter of the deck in Å (e.g. 3.52); inferred from the density if not given
+    -> --box LO HI (command line): cubic box bounds in Å for xyz files without a cell (e.g. -14.08 14.08 for in.cube)
+
+Input files:
+    -> Any trajectory readable by trajectory.py, with every atom written in every frame
+
+Output:
+    -> "<index>_defects_<runtime>ps_<temperature>.txt": timestep and unwrapped position of every defect per frame
+    -> "<index>_msd_SIA_<runtime>ps_<temperature>.txt" and "<index>_msd_Vac_<runtime>ps_<temperature>.txt":
+        time-origin averaged MSD of the defects, in the layout of the fix print output
+
+Notes:
+    -> Defects are found by Wigner-Seitz occupancy of the reference lattice, see defects.py
+    -> The MSD files can be read by msd_loader.py and used by the Arrhenius scripts with "SIA" (or "Vac") as the only
+        element and 1 atom, e.g. a campaign.json system with "elements": ["SIA"] and "n_atom": {"SIA": 1}
+    -> The lag 1 value is subtracted by the loaders, as for the atom MSD files
+
+'''
+
+import argparse
+import os
+
+import numpy as np
+
+from defects import trackDefects
+from fft_msd import getAtomMSD, writeMSDFile
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("trajectory", help="dump or xyz trajectory")
+    parser.add_argument("--index", type=int, required=True, help="trajectory index used in the output names")
+    parser.add_argument("--runtime", type=int, required=True, help="runtime in ps used in the output names")
+    parser.add_argument("--temperature", type=int, required=True, help="temperature used in the output names")
+    parser.add_argument("--out-dir", default=".", help="folder for the output files")
+    parser.add_argument("--max-lag", type=float, default=0.5, help="fraction of the trajectory length written out")
+    parser.add_argument("--lattice", type=float, default=None, help="FCC lattice parameter in Å")
+    parser.add_argument("--box", type=float, nargs=2, default=None, metavar=("LO", "HI"), help="cubic box bounds in Å")
+    args = parser.parse_args()
+
+    cell, origin = None, None
+    if args.box is not None:
+        cell = np.eye(3) * (args.box[1] - args.box[0])
+        origin = np.full(3, args.box[0])
+
+    tracks = trackDefects(args.trajectory, args.lattice, cell, origin)
+    n_frame = len(tracks['timestep'])
+    n_vac, n_sia = tracks['vacancy'].shape[1], tracks['interstitial'].shape[1]
+
+    print(f"{n_frame} frames, {n_sia} interstitial(s), {n_vac} vacancy(ies)")
+    if tracks['unresolved']:
+        print(f"Warning: {tracks['unresolved']} frames had a different number of defects and kept the previous positions")
+
+    of = os.path.join(args.out_dir, f"{args.index}_defects_{args.runtime}ps_{args.temperature}.txt")
+    print(f"Writing {of}...")
+    columns = [f"{kind}{d}_{x}" for kind, n in (("sia", n_sia), ("vac", n_vac)) for d in range(n) for x in "xyz"]
+    table = np.column_stack((
+        tracks['timestep'],
+        tracks['interstitial'].reshape(n_frame, -1),
+        tracks['vacancy'].reshape(n_frame, -1),
+    ))
+    np.savetxt(of, table, fmt="%.6f", header="timestep " + " ".join(columns))
+
+    for name, kind in (("SIA", 'interstitial'), ("Vac", 'vacancy')):
+        if tracks[kind].shape[1] == 0:
+            continue
+
+        msd = np.mean(getAtomMSD(tracks[kind]), axis=1)
+        n_lag = max(int(n_frame * args.max_lag), 3)
+        of = os.path.join(args.out_dir, f"{args.index}_msd_{name}_{args.runtime}ps_{args.temperature}.txt")
+
+        print(f"Writing {of} ({n_lag} lags)...")
+        writeMSDFile(of, msd[:n_lag])
+
+    return
+
+if __name__ == "__main__":
+    main()
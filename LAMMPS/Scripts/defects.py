@@ -0,0 +1,139 @@
+'''
+
+defects.py
+
+Wigner-Seitz analysis of point defects (self-interstitials and vacancies) in an FCC crystal
+
+Input files:
+    -> Any trajectory readable by trajectory.py; the reference lattice is the FCC lattice of the decks
+        ("lattice fcc a", box starting at a lattice point), scaled with the box so NPT runs are handled
+
+Output:
+    -> Per frame: sites of the vacancies (empty Wigner-Seitz cells) and interstitials (extra atoms in a cell)
+    -> Unwrapped trajectories of every defect, matched from frame to frame
+
+Notes:
+    -> The Wigner-Seitz cell of an FCC site is the set of points closest to it, so assigning atoms to cells is a
+        nearest lattice point search; FCC sites are the points of a cubic grid of spacing a/2 with an even coordinate
+        sum (the D3 lattice), whose nearest point is found in closed form: round every coordinate, and if the sum is
+        odd re-round the coordinate that was furthest from an integer the other way. This is exact, needs no tree or
+        neighbor list and is a handful of array operations per frame
+    -> Occupancy is one bincount over the sites; a site holding k atoms has k - 1 interstitials (a split dumbbell
+        shares its site), an empty site is a vacancy
+    -> Defects are matched to the nearest defect of the same kind in the previous frame (minimum image) and their
+        positions unwrapped; frames where the number of defects differs from the first frame (e.g. a thermal
+        excursion seen as an extra Frenkel pair) keep the previous positions and are counted as unresolved
+    -> Only the defect positions are kept, so memory does not depend on the number of atoms
+
+'''
+
+import numpy as np
+
+from trajectory import iterFrames
+
+def getLatticeCells(cell, n_atom, lattice=None):
+    # number of FCC unit cells along each box vector
+    lengths = np.linalg.norm(cell, axis=1)
+    if lattice is None:
+        lattice = (abs(np.linalg.det(cell)) * 4 / n_atom)**(1 / 3)
+
+    return np.maximum(np.rint(lengths / lattice).astype(int), 1)
+
+def getNearestSites(frac, n_cells):
+    # nearest FCC site to every fractional position, as integer coordinates in units of a/2, wrapped into the box
+    grid = 2 * n_cells
+    v = frac * grid
+    site = np.rint(v)
+    error = v - site
+
+    odd = (np.sum(site, axis=1) % 2) != 0
+    rows = np.flatnonzero(odd)
+    worst = np.argmax(np.abs(error[rows]), axis=1)
+    site[rows, worst] += np.where(error[rows, worst] >= 0, 1, -1)
+
+    return (site.astype(np.int64) % grid)
+
+def getValidSites(n_cells):
+    grid = 2 * n_cells
+    coords = np.array(np.meshgrid(*[np.arange(g) for g in grid], indexing='ij')).reshape(3, -1).T
+
+    return np.ravel_multi_index(coords[np.sum(coords, axis=1) % 2 == 0].T, grid)
+
+def findDefects(frame, n_cells, valid_sites, cell=None, origin=None):
+    # -> vacancy and interstitial positions (Å) of one frame
+    cell = frame['cell'] if cell is None else cell
+    origin = frame['origin'] if origin is None else origin
+    grid = 2 * n_cells
+
+    frac = (frame['positions'] - origin) @ np.linalg.inv(cell)
+    frac -= np.floor(frac)
+
+    site_ids = np.ravel_multi_index(getNearestSites(frac, n_cells).T, grid)
+    occupancy = np.bincount(site_ids, minlength=np.prod(grid))[valid_sites]
+
+    vacancies = valid_sites[occupancy == 0]
+    interstitials = np.repeat(valid_sites, np.maximum(occupancy - 1, 0))
+
+    def toPositions(ids):
+        return (np.array(np.unravel_index(ids, grid)).T / grid) @ cell + origin
+
+    return toPositions(vacancies), toPositions(interstitials)
+
+def getMinimumImage(d, cell):
+    frac = d @ np.linalg.inv(cell)
+    return (frac - np.rint(frac)) @ cell
+
+def matchDefects(previous, current, cell):
+    # order of current that follows each previous defect; greedy on the closest pairs first
+    d = getMinimumImage(current[None, :, :] - previous[:, None, :], cell)
+    dist = np.linalg.norm(d, axis=2)
+
+    order = np.full(len(previous), -1)
+    taken = np.zeros(len(current), dtype=bool)
+    for flat in np.argsort(dist, axis=None):
+        p, c = np.unravel_index(flat, dist.shape)
+        if order[p] < 0 and not taken[c]:
+            order[p] = c
+            taken[c] = True
+
+    return order
+
+def trackDefects(filename, lattice=None, cell=None, origin=None):
+    # -> {'timestep', 'vacancy', 'interstitial', 'unresolved'}: unwrapped positions (n_frame, n_defect, 3) per kind
+    timesteps = []
+    tracks = {'vacancy': [], 'interstitial': []}
+    last = {}
+    unresolved = 0
+
+    for f, frame in enumerate(iterFrames(filename)):
+        frame_cell = frame['cell'] if cell is None else cell
+        if frame_cell is None:
+            raise ValueError(f"{filename} has no cell for frame {f}; pass the box")
+
+        if f == 0:
+            n_cells = getLatticeCells(frame_cell, len(frame['positions']), lattice)
+            valid_sites = getValidSites(n_cells)
+
+        vacancies, interstitials = findDefects(frame, n_cells, valid_sites, frame_cell, origin)
+        found = {'vacancy': vacancies, 'interstitial': interstitials}
+
+        if f == 0:
+            for kind in tracks:
+                last[kind] = (found[kind], found[kind])    # (wrapped, unwrapped)
+        elif any(len(found[kind]) != len(last[kind][0]) for kind in tracks):
+            unresolved += 1
+        else:
+            for kind in tracks:
+                wrapped, unwrapped = last[kind]
+                current = found[kind][matchDefects(wrapped, found[kind], frame_cell)]
+                last[kind] = (current, unwrapped + getMinimumImage(current - wrapped, frame_cell))
+
+        timesteps.append(frame['timestep'])
+        for kind in tracks:
+            tracks[kind].append(last[kind][1])
+
+    result = {kind: np.array(tracks[kind]).reshape(len(timesteps), -1, 3) for kind in tracks}
+    result['timestep'] = np.array(timesteps)
+    result['unresolved'] = unresolved
+
+    return result
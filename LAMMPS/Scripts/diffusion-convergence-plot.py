@@ -3,119 +3,129 @@
 diffusion-convergence-plot.py
 
 Input parameters:
-    -> System folders: The folder name where files are stored per system
-    -> Indices: Per-system list of indices for each system trajectory
-    -> Temperatures: Assumes that the same temperatures were tested for each system
-    -> Runtimes: Per-system list of runtimes in ps
-    -> Elements: The individual elements included in each system; do not have to reflect system folder names
-    -> n_atoms: Number of atoms for each constituent element in a system; stored as a dictionary
-    -> dim: The number of dimensions of the system
+    -> --manifest FILE (command line): campaign manifest with the systems, indices, runtimes, elements, n_atom,
+        temperatures and dim (see campaign.py; defaults to campaign.json)
+    -> --jobs N (command line): number of worker processes used to parse files and render plots
+    -> --redraw (command line): render every plot, including the ones whose data and style have not changed (see figures.py)
+    -> --tol X (command line): relative tolerance used to report the runtime at which D has converged
 
 Input files:
     -> Mean Squared Displacement files are expected to have format "<index>_msd_<element>_<runtime>ps_<temperature>.txt"
 
 Plots generated:
     -> Diffusion Convergence: Per-system diffusion coefficient vs. total simulation runtime
-        individual fit for each temperature
+        full curve per temperature from the longest runtime, D refit for every truncation length
+        markers for the separate runs of each runtime, individual fit for each temperature
+
+Other Output:
+    -> Per temperature, the runtime after which the D curve stays within --tol of its final value
+
+Notes:
+    -> The full curve comes from cumulative sums (getPrefixFits in ols_fit.py): one O(n) pass for every trajectory,
+        instead of one run and one refit per runtime
 
 '''
 
-import statsmodels.api as sm
+import argparse
+
 import numpy as np
 import matplotlib.pyplot as plt
 
-system_folders = ["Ni", "NiFe", "NiFeCr"]
-temperatures = [700, 800, 900, 1000, 1100]
-
-dim = 3
-
-def getParameterFromFile(filename, n_atom_consituent):
-    with open(filename, "r") as f:
-        next(f) # skip header line
-        next(f) # skip tiny first value
-        initial_jump = float(f.readline())  # to normalize each reading
-        parameter = []
-        for line in f:
-            line = line.strip()
-            if line != '':
-                msd = float(line)
-                sd = (msd - initial_jump) / (2 * dim) * n_atom_consituent
-                parameter.append(sd)
-    return parameter
-
-def getFitParams(x, y):
-    x = sm.add_constant(x)
-    fit = sm.OLS(y, x).fit()
-    return fit.params
-
-def getFitFromArray(arr):
-    return getFitParams(np.arange(len(arr)), arr)
-
-def plotDiffusionConvergence(system_name, runtimes, d_total_avg_per_rtime):
+from campaign import addCampaignArgs, getCampaign, getSystemSD
+from figures import addFigureArgs, queueFigure, renderFigures, setRedraw
+from ols_fit import getPrefixFits, getRuntimeFits
+from parallel_jobs import addJobsArgs, getJobs
+
+def getConvergedRuntime(d_curve, runtime_axis, tol):
+    # first runtime after which every point of the curve stays within tol of the final D (its last defined value)
+    n = d_curve.shape[-1]
+    last = n - 1 - np.argmax(~np.isnan(d_curve[..., ::-1]), axis=-1)
+    final = np.take_along_axis(d_curve, last[..., None], axis=-1)
+    with np.errstate(invalid='ignore'):
+        outside = ~(np.abs(d_curve - final) <= tol * np.abs(final)) & (np.arange(n) <= last[..., None])
+
+    last_outside = d_curve.shape[-1] - 1 - np.argmax(outside[..., ::-1], axis=-1)
+    converged = np.where(np.any(outside, axis=-1), np.minimum(last_outside + 1, d_curve.shape[-1] - 1), 0)
+
+    return runtime_axis[converged]
+
+def plotDiffusionConvergence(temperatures, runtimes, d_total_avg_per_rtime, runtime_axis, d_curve_avg, of):
     fig, ax = plt.subplots(figsize=(8,6))
 
-    x = runtimes
+    # the curve has one point per ps; a few thousand points per line are plenty to draw it
+    stride = max(len(runtime_axis) // 5000, 1)
 
     for t, temp in enumerate(temperatures):
-        y = d_total_avg_per_rtime[:, t, 1]
+        x = runtime_axis[1::stride]
+        y = d_curve_avg[t, 1::stride]
+        x, y = x[~np.isnan(y)], y[~np.isnan(y)]
 
-        ax.plot(x, y)
+        line, = ax.plot(x, y)
+        ax.plot(runtimes, d_total_avg_per_rtime[:, t, 1], 'o', color=line.get_color(), mec='k')
         ax.text(x[-1], y[-1], f"T={temp}", va='top', ha='center', fontsize=8)
 
     ax.set_xlabel("Runtime [ps]")
-    ax.set_ylabel("Difusion Coefficient $[Å^2 ps^{-1}]$")
+    ax.set_ylabel("Diffusion Coefficient $[Å^2 ps^{-1}]$")
     ax.grid()
 
-    of = f"../Plots/{system_name}/diffusion-convergence.png"
     fig.savefig(of)
     plt.close()
 
     return
 
-def main():
+def addTolArgs(parser):
+    parser.add_argument("--tol", type=float, default=0.05, help="relative tolerance on D for the converged runtime")
 
-    for system_idx, system_name in enumerate(system_folders):
+def analyzeConvergence(system_name, temperatures, runtimes, sd_total, n_time, d_total, tol):
+    # sd_total: (index, runtime, temperature, time) summed over elements; d_total: its fits per runtime
+    d_total_avg_per_rtime = np.mean(d_total, axis=0)
 
-        if system_name == "Ni":
-            elements = ["Ni"]
-            n_atom = {'Ni': 2049}
-            indices = np.arange(1, 6)
-            runtimes = [5000]
-        elif system_name == "NiFe":
-            elements = ["Ni", "Fe"]
-            n_atom = {'Ni': 756, 'Fe': 1293}
-            runtimes = [100000]
-            indices = np.arange(1, 6)
-        elif system_name == "NiFeCr":
-            elements = ["Ni", "Fe", "Cr"]
-            n_atom = {'Ni': 1511, 'Fe': 218, 'Cr': 320}
-            runtimes = [250000]
-            indices = np.arange(1, 6)
+    # D for every truncation length of the longest runtime, one point per output line; a run cut short has no points
+    # past its end, so the curve is averaged over the runs that reach each length
+    n_max = np.max(n_time[:, -1])
+    runtime_axis = np.arange(1, n_max + 1) * runtimes[-1] / n_max
+    d_curve = getPrefixFits(sd_total[:, -1, :, :n_max])[..., 1]
+    n_run = np.sum(~np.isnan(d_curve), axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d_curve_avg = np.where(n_run > 0, np.nansum(d_curve, axis=0) / n_run, np.nan)
 
-        sd                              = np.empty((len(indices), len(runtimes), len(temperatures), len(elements))     , dtype=object)
-        sd_total                        = np.empty((len(indices), len(runtimes), len(temperatures))                    , dtype=object)
-        d_total                         = np.empty((len(indices), len(runtimes), len(temperatures), 2)                 , dtype=float)
-        d_total_avg_per_rtime           = np.empty((len(runtimes), len(temperatures), 2)                               , dtype=float)
+    converged_runtime = getConvergedRuntime(d_curve_avg, runtime_axis, tol)
+    for t, temp in enumerate(temperatures):
+        print(f"{system_name} T={temp}: D within {tol:.0%} of its final value after {converged_runtime[t]:.0f} ps")
+
+    print(f"Plotting {system_name} diffusion convergence...")
+
+    of = f"../Plots/{system_name}/diffusion-convergence.png"
+    queueFigure(of, plotDiffusionConvergence, temperatures, runtimes, d_total_avg_per_rtime, runtime_axis, d_curve_avg, of)
+
+    return
+
+def main():
 
-        for i, idx in enumerate(indices):
-            for r, rtime in enumerate(runtimes):
-                for t, temp in enumerate(temperatures):
-                    for e, elem in enumerate(elements):
-                        f = f"../{system_name}/{idx}_msd_{elements[e]}_{rtime}ps_{temp}.txt"
-                        sd[i, r, t, e] = getParameterFromFile(f, n_atom[elem])
+    parser = argparse.ArgumentParser()
+    addCampaignArgs(parser)
+    addJobsArgs(parser)
+    addFigureArgs(parser)
+    addTolArgs(parser)
+    args = parser.parse_args()
 
-                    sd_total[i, r, t] = np.sum(np.stack(sd[i, r, t, :]), axis=0)
+    jobs = getJobs(args)
+    setRedraw(args.redraw)
+    tol = args.tol
+    campaign = getCampaign(args)
 
-                    d_total[i, r, t] = getFitFromArray(sd_total[i, r, t])
+    for system in campaign["systems"]:
 
-        for r, rtime in enumerate(runtimes):
-            for t, temp in enumerate(temperatures):
-                d_total_avg_per_rtime[r, t] =  np.mean(d_total[:, r, t, :], axis=0)
+        # sd: (index, runtime, temperature, element, time), NaN padded past n_time[index, runtime, temperature]
+        sd, n_time = getSystemSD(campaign, system, jobs)
+        sd_total = np.sum(sd, axis=3)
+        d_total = getRuntimeFits(sd_total, n_time)
 
-        print(f"Plotting {system_name} diffusion convergence...")
+        analyzeConvergence(system["name"], campaign["temperatures"], system["runtimes"], sd_total, n_time, d_total, tol)
 
-        plotDiffusionConvergence(system_name, runtimes, d_total_avg_per_rtime)
+    renderFigures(jobs)
 
     return
 
-main()
+if __name__ == "__main__":
+    main()
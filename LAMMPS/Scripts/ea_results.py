@@ -0,0 +1,124 @@
+'''
+
+ea_results.py
+
+Batched Ea and D0 extraction for every run of a system, and the binary results file it is stored in
+
+Input files:
+    -> "fix ave/time" MSD files "<index>_msd_<temperature>.txt" (two header lines, then "step msd" rows), as written by
+        the older decks for the whole group
+
+Output:
+    -> "system_d0_ea_<system>.npz": one uncompressed .npz per system, with
+        columns, one value per run: index, ln_d0, d0, ea, se_ea
+        per run and temperature: d (slope of the MSD times n_atom, as in the first auto-ea.py), ln_d
+        per run and temperature: n_time, the number of points its D was fit over
+        metadata: format, system, n_run, n_atom, temperatures
+
+Notes:
+    -> All runs and temperatures of a system are stacked and fit in one pass of ols_fit.py (MSD vs. time, then
+        ln(D) vs. 1/kT), instead of one statsmodels model per file
+    -> The folder is listed once per system; runs missing a temperature are skipped with a warning
+    -> Every series is fit over its own length: series are NaN padded to the longest file and series of equal length
+        are fit together (getRuntimeFits in ols_fit.py), so a run cut short does not shorten the others
+    -> Ea is stored as a positive energy (the old text files kept the slope, -Ea)
+    -> readResults opens the file without unpickling; every column is a plain array, so plots only index it
+
+'''
+
+import os
+import re
+
+import numpy as np
+
+from msd_cache import cached
+from ols_fit import getLinearFit, getRuntimeFits
+
+k = 8.6173E-5
+results_format = 2
+
+def parseAveTime(filename, n_header=2):
+    with open(filename, "r") as f:
+        for h in range(n_header):
+            next(f)
+        values = f.read().split()
+
+    return np.array(values, dtype=np.float64).reshape(-1, 2)[:, 1]
+
+def getRuns(system_folder, temperatures):
+    # indices of the runs with a file for every temperature, from one listing of the folder
+    found = {}
+    for name in os.listdir(system_folder):
+        match = re.fullmatch(r"(\d+)_msd_(\d+)\.txt", name)
+        if match:
+            found.setdefault(int(match.group(1)), set()).add(int(match.group(2)))
+
+    indices = []
+    for idx in sorted(found):
+        missing = sorted({int(t) for t in temperatures} - found[idx])
+        if missing:
+            print(f"Warning: {system_folder} run {idx} has no file for {missing} K, skipped")
+        else:
+            indices.append(idx)
+
+    return np.array(indices, dtype=int)
+
+def getSystemMSD(system_folder, indices, temperatures):
+    # -> (run, temperature, time) NaN padded past n_time[run, temperature], n_time
+    columns = [[cached(parseAveTime, f"{system_folder}/{idx}_msd_{temp}.txt") for temp in temperatures] for idx in indices]
+    n_time = np.array([[len(column) for column in row] for row in columns], dtype=int)
+
+    msd = np.full(n_time.shape + (np.max(n_time),), np.nan)
+    for i, row in enumerate(columns):
+        for t, column in enumerate(row):
+            msd[i, t, :n_time[i, t]] = column
+
+    return msd, n_time
+
+def extractSystem(system_folder, temperatures, n_atom):
+    temperatures = np.asarray(temperatures, dtype=float)
+    indices = getRuns(system_folder, temperatures.astype(int))
+    if len(indices) == 0:
+        raise ValueError(f"No complete runs in {system_folder}")
+
+    msd, n_time = getSystemMSD(system_folder, indices, temperatures.astype(int))
+
+    params = getRuntimeFits(msd, n_time)
+    d = params[..., 1] * n_atom
+    ln_d = np.log(d)
+
+    arrhenius, arrhenius_se = getLinearFit(1 / (k * temperatures), ln_d)
+
+    return {
+        'index': indices,
+        'ln_d0': arrhenius[:, 0],
+        'd0': np.exp(arrhenius[:, 0]),
+        'ea': -arrhenius[:, 1],
+        'se_ea': arrhenius_se[:, 1],
+        'd': d,
+        'ln_d': ln_d,
+        'n_time': n_time,
+    }
+
+def getResultsFilename(folder, system_name):
+    return os.path.join(folder, f"system_d0_ea_{system_name}.npz")
+
+def writeResults(filename, system_name, results, temperatures, n_atom):
+    np.savez(
+        filename,
+        format=np.array(results_format),
+        system=np.array(system_name),
+        n_run=np.array(len(results['index'])),
+        n_atom=np.array(n_atom),
+        temperatures=np.asarray(temperatures, dtype=float),
+        **results,
+    )
+
+def readResults(filename):
+    with np.load(filename, allow_pickle=False) as data:
+        results = {name: data[name] for name in data.files}
+
+    if results['format'] != results_format:
+        raise ValueError(f"{filename} has results format {results['format']}, expected {results_format}")
+
+    return results
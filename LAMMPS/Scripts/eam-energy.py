@@ -0,0 +1,68 @@
+'''
+
+eam-energy.py
+
+Input parameters:
+    -> trajectory (command line): dump, xyz or extended xyz file readable by trajectory.py (e.g. dump.alloy, a KMC
+        initconfig.xyz); needs a cell, from the dump box or an extended xyz Lattice entry
+    -> --potential (command line): setfl file used with pair_style eam/alloy
+    -> --frame N (command line): frame to evaluate, negative from the end (default: the last one)
+    -> --types (command line): element of each dump atom type in order, like the pair_coeff line (e.g. Ni Fe Cr)
+    -> --out (command line): file for the per-atom energies and forces
+
+Output:
+    -> Total energy, energy per atom, mean energy per element and largest force, to stdout
+    -> Optional per-atom table: index, element, energy [eV], fx fy fz [eV/Å]
+
+Notes:
+    -> No LAMMPS needed; the spline tables of the potential are cached after the first use (see eam.py)
+
+'''
+
+import argparse
+
+import numpy as np
+
+from eam import getEnergyForces, getTypes, loadPotential
+from trajectory import readFrames
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("trajectory", help="dump or xyz file")
+    parser.add_argument("--potential", required=True, help="setfl (eam/alloy) potential file")
+    parser.add_argument("--frame", type=int, default=-1, help="frame to evaluate")
+    parser.add_argument("--types", nargs="+", default=None, help="element of each dump atom type, in order")
+    parser.add_argument("--out", default=None, help="file for per-atom energies and forces")
+    args = parser.parse_args()
+
+    potential = loadPotential(args.potential)
+    frame = readFrames(args.trajectory, args.frame)
+
+    if frame['cell'] is None:
+        raise ValueError(f"{args.trajectory} has no cell for frame {args.frame}")
+
+    type_map = None
+    if args.types is not None:
+        type_map = {str(t + 1): elem for t, elem in enumerate(args.types)}
+
+    types = getTypes(potential, frame['species'], type_map)
+    energy, forces = getEnergyForces(potential, frame['positions'], types, frame['cell'])
+
+    print(f"Total energy: {np.sum(energy):.6f} eV ({np.mean(energy):.6f} eV/atom, {len(energy)} atoms)")
+    for e, elem in enumerate(potential['elements']):
+        if np.any(types == e):
+            print(f"    {elem}: {np.mean(energy[types == e]):.6f} eV/atom ({np.count_nonzero(types == e)} atoms)")
+    print(f"Largest force: {np.max(np.linalg.norm(forces, axis=1)):.6e} eV/Å")
+
+    if args.out is not None:
+        elements = np.array(potential['elements'])[types]
+        with open(args.out, "w") as f:
+            f.write("# index element energy(eV) fx fy fz (eV/Å)\n")
+            for a in range(len(energy)):
+                f.write(f"{a} {elements[a]} {energy[a]:.10f} {forces[a, 0]:.10e} {forces[a, 1]:.10e} {forces[a, 2]:.10e}\n")
+
+    return
+
+if __name__ == "__main__":
+    main()
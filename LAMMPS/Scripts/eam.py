@@ -0,0 +1,235 @@
+'''
+
+eam.py
+
+EAM/alloy (setfl) potentials: cached spline tables and a vectorized energy and force evaluator
+
+Input files:
+    -> setfl potential files as used with "pair_style eam/alloy" (e.g. FeNiCr_ArturV3.eam, Ni_v6_2.0_LKBeland2016.eam):
+        3 comment lines, the elements, "Nrho drho Nr dr cutoff", then per element F(rho) and rho(r), then r*phi(r)
+        for every element pair
+
+Output:
+    -> Per-atom energies [eV] and forces [eV/Å] of a configuration, e.g. a dumped frame or a KMC state
+
+Notes:
+    -> Tables are turned into the cubic spline coefficients of LAMMPS pair_eam (same interpolation, same
+        extrapolation of F past the last rho), so energies match "compute pe/atom" of a LAMMPS run with the same file
+    -> The coefficients are computed once per file and kept in the msd_cache.py cache (packed into one array),
+        so later loads map them instead of parsing tens of thousands of lines
+    -> Neighbors come from a cell list over the periodic cell (orthogonal or triclinic, minimum image), built with
+        array operations only; the cell must be at least twice the cutoff wide in every direction
+    -> Every spline lookup is done for all pairs (or atoms) at once
+
+'''
+
+import numpy as np
+
+from msd_cache import cached
+
+def readSetfl(filename):
+    with open(filename, "r") as f:
+        for i in range(3):
+            f.readline()    # comments
+
+        elements = f.readline().split()[1:]
+        header = f.readline().split()
+        nrho, drho, nr, dr, cutoff = int(header[0]), float(header[1]), int(header[2]), float(header[3]), float(header[4])
+
+        values = np.array(f.read().split(), dtype=object)
+
+    n_el = len(elements)
+    frho = np.empty((n_el, nrho))
+    rhor = np.empty((n_el, nr))
+    z2r = np.empty((n_el, n_el, nr))
+    masses = np.empty((n_el))
+
+    # each element block starts with "Z mass a lattice", the lattice name is not a number
+    pos = 0
+    for e in range(n_el):
+        masses[e] = float(values[pos + 1])
+        pos += 4
+        frho[e] = values[pos:pos + nrho].astype(float)
+        pos += nrho
+        rhor[e] = values[pos:pos + nr].astype(float)
+        pos += nr
+
+    for i in range(n_el):
+        for j in range(i + 1):
+            z2r[i, j] = z2r[j, i] = values[pos:pos + nr].astype(float)
+            pos += nr
+
+    return {
+        'elements': elements,
+        'nrho': nrho, 'drho': drho, 'nr': nr, 'dr': dr, 'cutoff': cutoff,
+        'masses': masses, 'frho': frho, 'rhor': rhor, 'z2r': z2r,
+    }
+
+def getSplineTable(f, delta):
+    # LAMMPS PairEAM::interpolate for every table along the last axis -> (..., n, 7) coefficients
+    n = f.shape[-1]
+    spline = np.zeros(f.shape + (7,))
+    spline[..., 6] = f
+
+    d = spline[..., 5]
+    d[..., 0] = f[..., 1] - f[..., 0]
+    d[..., 1] = 0.5 * (f[..., 2] - f[..., 0])
+    d[..., n - 2] = 0.5 * (f[..., n - 1] - f[..., n - 3])
+    d[..., n - 1] = f[..., n - 1] - f[..., n - 2]
+    d[..., 2:n - 2] = ((f[..., 0:n - 4] - f[..., 4:n]) + 8.0 * (f[..., 3:n - 1] - f[..., 1:n - 3])) / 12.0
+
+    spline[..., :-1, 4] = 3.0 * (f[..., 1:] - f[..., :-1]) - 2.0 * d[..., :-1] - d[..., 1:]
+    spline[..., :-1, 3] = d[..., :-1] + d[..., 1:] - 2.0 * (f[..., 1:] - f[..., :-1])
+
+    spline[..., 2] = spline[..., 5] / delta
+    spline[..., 1] = 2.0 * spline[..., 4] / delta
+    spline[..., 0] = 3.0 * spline[..., 3] / delta
+
+    return spline
+
+def parseSplines(filename):
+    # header (n_el, nrho, drho, nr, dr, cutoff, masses) followed by the F, rho and r*phi coefficient tables
+    setfl = readSetfl(filename)
+    n_el = len(setfl['elements'])
+
+    header = np.array([n_el, setfl['nrho'], setfl['drho'], setfl['nr'], setfl['dr'], setfl['cutoff']])
+
+    return np.concatenate((
+        header,
+        setfl['masses'],
+        getSplineTable(setfl['frho'], setfl['drho']).ravel(),
+        getSplineTable(setfl['rhor'], setfl['dr']).ravel(),
+        getSplineTable(setfl['z2r'], setfl['dr']).ravel(),
+    ))
+
+def loadPotential(filename):
+    packed = cached(parseSplines, filename)
+
+    n_el, nrho, drho, nr, dr, cutoff = packed[:6]
+    n_el, nrho, nr = int(n_el), int(nrho), int(nr)
+
+    with open(filename, "r") as f:
+        elements = [f.readline() for i in range(4)][3].split()[1:]
+
+    pos = 6 + n_el
+    sizes = {'frho': (n_el, nrho, 7), 'rhor': (n_el, nr, 7), 'z2r': (n_el, n_el, nr, 7)}
+    tables = {}
+    for name, shape in sizes.items():
+        size = int(np.prod(shape))
+        tables[name] = packed[pos:pos + size].reshape(shape)
+        pos += size
+
+    return {
+        'elements': elements,
+        'nrho': nrho, 'drho': drho, 'nr': nr, 'dr': dr, 'cutoff': cutoff,
+        'rhomax': (nrho - 1) * drho,
+        'masses': packed[6:6 + n_el],
+        **tables,
+    }
+
+def evaluateSpline(coeff, p):
+    # coeff: (..., 7) rows picked for each point, p: position within the interval -> value, derivative
+    value = ((coeff[..., 3] * p + coeff[..., 4]) * p + coeff[..., 5]) * p + coeff[..., 6]
+    derivative = (coeff[..., 0] * p + coeff[..., 1]) * p + coeff[..., 2]
+
+    return value, derivative
+
+def getSplineIndex(x, delta, n):
+    p = x / delta + 1.0
+    m = np.clip(p.astype(np.int64), 1, n - 1)
+    p = np.minimum(p - m, 1.0)
+
+    return m - 1, p    # 0-based row of the table
+
+def getTypes(potential, species, type_map=None):
+    # element index of every atom; type_map translates dump types ("1", "2", ...) to element names
+    if type_map is not None:
+        species = [type_map.get(s, s) for s in species]
+
+    lookup = {elem: e for e, elem in enumerate(potential['elements'])}
+    missing = sorted(set(species) - set(lookup))
+    if missing:
+        raise ValueError(f"No potential for species {missing}; the potential has {potential['elements']}")
+
+    return np.array([lookup[s] for s in species], dtype=np.int64)
+
+def getNeighbors(positions, cell, cutoff):
+    # full neighbor list (i, j, r_j - r_i, |r_j - r_i|) within cutoff, periodic in all three directions
+    inv_cell = np.linalg.inv(cell)
+    frac = positions @ inv_cell
+    frac -= np.floor(frac)
+
+    # perpendicular widths of the cell
+    widths = 1 / np.linalg.norm(inv_cell, axis=0)
+    if np.any(widths < 2 * cutoff):
+        raise ValueError(f"Cell widths {widths} must be at least twice the cutoff ({cutoff})")
+
+    n_cell = np.maximum((widths / cutoff).astype(int), 1)
+    cell_idx = np.minimum((frac * n_cell).astype(int), n_cell - 1)
+    cell_id = np.ravel_multi_index(cell_idx.T, n_cell)
+
+    order = np.argsort(cell_id, kind='stable')
+    counts = np.bincount(cell_id, minlength=np.prod(n_cell))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # neighboring cells without repeats when there are fewer than 3 cells along a direction
+    shifts = [np.unique(np.array([-1, 0, 1]) % n) for n in n_cell]
+    offsets = np.array(np.meshgrid(*shifts, indexing='ij')).reshape(3, -1).T
+
+    i_list, j_list = [], []
+    atoms = np.arange(len(positions))
+    for offset in offsets:
+        neighbor_cell = np.ravel_multi_index(((cell_idx + offset) % n_cell).T, n_cell)
+        n_j = counts[neighbor_cell]
+
+        i = np.repeat(atoms, n_j)
+        first = np.repeat(starts[neighbor_cell] - np.concatenate(([0], np.cumsum(n_j)[:-1])), n_j)
+        j = order[first + np.arange(len(i))]
+
+        i_list.append(i)
+        j_list.append(j)
+
+    i = np.concatenate(i_list)
+    j = np.concatenate(j_list)
+    keep = i != j
+    i, j = i[keep], j[keep]
+
+    delta = (frac[j] - frac[i])
+    delta -= np.round(delta)
+    d = delta @ cell
+    r = np.linalg.norm(d, axis=1)
+
+    within = r < cutoff
+
+    return i[within], j[within], d[within], r[within]
+
+def getEnergyForces(potential, positions, types, cell):
+    # per-atom energies (embedding + half of the pair terms) and forces for one periodic configuration
+    n_atom = len(positions)
+    i, j, d, r = getNeighbors(positions, cell, potential['cutoff'])
+    ti, tj = types[i], types[j]
+
+    m, p = getSplineIndex(r, potential['dr'], potential['nr'])
+
+    # density at i from j uses the density function of j's element
+    rho_j, drho_j = evaluateSpline(potential['rhor'][tj, m], p)
+    _, drho_i = evaluateSpline(potential['rhor'][ti, m], p)
+    rho = np.bincount(i, rho_j, minlength=n_atom)
+
+    mf, pf = getSplineIndex(rho, potential['drho'], potential['nrho'])
+    embed, fp = evaluateSpline(potential['frho'][types, mf], pf)
+    beyond = rho > potential['rhomax']
+    embed[beyond] += fp[beyond] * (rho[beyond] - potential['rhomax'])
+
+    z2, z2p = evaluateSpline(potential['z2r'][ti, tj, m], p)
+    phi = z2 / r
+    phip = z2p / r - phi / r
+
+    energy = embed + 0.5 * np.bincount(i, phi, minlength=n_atom)
+
+    # dE/dr of the pair, the full list holds every pair twice so each atom only collects its own side
+    psip = fp[i] * drho_j + fp[j] * drho_i + phip
+    pair_force = (psip / r)[:, None] * d
+    forces = np.stack([np.bincount(i, pair_force[:, k], minlength=n_atom) for k in range(3)], axis=1)
+
+    return energy, forces
@@ -0,0 +1,121 @@
+'''
+
+fake-lmp.py
+
+Stand-in for the LAMMPS executable, to run a campaign locally without LAMMPS (see run-campaign.py)
+
+Input parameters:
+    -> -in FILE, -var NAME VALUE, -log FILE, -screen X: the LAMMPS arguments passed by lammps_runner.py
+    -> --delay S: seconds to sleep before writing the output, so a run can be killed while jobs are running
+    -> --exit-code N: exit code of every run; a non-zero code writes nothing, to test the retries
+    -> --fail-once: fail the first attempt of every job (exit code 1) and succeed on the retry
+
+Input files:
+    -> A deck rendered by decks.py: its "variable ... index/equal" defaults, timestep and the "fix ... print" line
+        with the output file and its "# step msd_<element>... pe" title
+
+Output:
+    -> The run file named by the deck, e.g. "./<out>/<index>_md_<runtime>ps_<temperature>.txt", with one row per
+        output interval: a linear MSD per element with an Arrhenius D (Ea = 0.3 eV) plus noise, and a noisy PE
+    -> The -log file, with one line naming the run file
+
+Notes:
+    -> Run from the campaign working folder, as LAMMPS would be, e.g. from Scripts:
+        python make-decks.py
+        python run-campaign.py --lmp "python Scripts/fake-lmp.py --delay 1" --launcher "" --total-ranks 4
+    -> The output only depends on the index and temperature, so the analysis scripts can be run on it
+
+'''
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+k = 8.6173E-5
+
+def readDeck(filename, variables):
+    # -> (values of the deck variables, command line first; timestep; output file; title)
+    values = {}
+    timestep = None
+    output = None
+
+    with open(filename, "r") as f:
+        for line in f:
+            words = line.split("#")[0].split()
+            if len(words) >= 4 and words[0] == "variable" and words[2] in ("index", "equal"):
+                values[words[1]] = words[3]
+            elif len(words) >= 2 and words[0] == "timestep":
+                timestep = float(words[1])
+            elif len(words) >= 4 and words[0] == "fix" and words[3] == "print":
+                output = re.search(r'file\s+(\S+).*title\s+"([^"]*)"', line)
+
+    if output is None:
+        raise ValueError(f"{filename} has no fix print with a file and a title")
+
+    values.update(variables)
+
+    def substitute(text):
+        # ${name} and $x, as LAMMPS does
+        text = re.sub(r"\$\{(\w+)\}", lambda m: values.get(m.group(1), m.group(0)), text)
+        return re.sub(r"\$(\w)", lambda m: values.get(m.group(1), m.group(0)), text)
+
+    # the deck's I and T are "equal ${index}" and "equal ${temp}"
+    for name in list(values):
+        values[name] = substitute(values[name])
+
+    return values, timestep, substitute(output.group(1)), output.group(2)
+
+def writeRun(filename, title, index, temperature, n_row, every):
+    rng = np.random.default_rng([int(index), int(temperature)])
+    columns = title.split()[1:]    # "# step msd_<element>... pe"
+
+    d = 20 * np.exp(-0.3 / (k * temperature))   # Å^2/ps per atom
+    t = np.arange(n_row, dtype=float)
+
+    data = {"step": t * every, "pe": -4.45 * 2049 + 5 * rng.standard_normal(n_row)}
+    for c in columns:
+        if c.startswith("msd_"):
+            data[c] = 6 * d * t * (1 + 0.05 * rng.standard_normal()) + 0.01 * rng.random(n_row)
+
+    fmt = ["%d" if c == "step" else "%.17g" for c in columns]
+    np.savetxt(filename, np.column_stack([data[c] for c in columns]), fmt=fmt, header=title[1:].lstrip(), comments="# ")
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-in", dest="input", required=True, help="input deck")
+    parser.add_argument("-var", nargs=2, action="append", default=[], metavar=("NAME", "VALUE"), help="deck variable")
+    parser.add_argument("-log", default="log.lammps", help="log file")
+    parser.add_argument("-screen", default=None, help="ignored")
+    parser.add_argument("--delay", type=float, default=0, help="seconds to sleep before writing the output")
+    parser.add_argument("--exit-code", type=int, default=0, help="exit code of every run")
+    parser.add_argument("--fail-once", action="store_true", help="fail the first attempt of every job")
+    args = parser.parse_args()
+
+    values, timestep, output, title = readDeck(args.input, dict(args.var))
+
+    time.sleep(args.delay)
+
+    # the runner gives every job its own log, so an existing log means this is a retry
+    if args.fail_once and not os.path.exists(args.log):
+        with open(args.log, "w") as f:
+            f.write("fake-lmp: first attempt failed\n")
+        sys.exit(1)
+    if args.exit_code != 0:
+        sys.exit(args.exit_code)
+
+    every = int(values["every"])
+    n_row = int(round(float(values["runtime"]) / (timestep * every))) + 1
+    writeRun(output, title, values["I"], float(values["T"]), n_row, every)
+
+    with open(args.log, "w") as f:
+        f.write(f"fake-lmp: wrote {output}\n")
+
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+'''
+
+fft_msd.py
+
+Per-element, time-origin averaged mean squared displacement from dumped trajectories
+
+Input files:
+    -> Any trajectory readable by trajectory.py (LAMMPS dump, xyz, extended xyz)
+
+Output:
+    -> Per-element MSD for every lag, averaged over all time origins and over the atoms of each element
+
+Notes:
+    -> Uses the FFT algorithm: MSD(m) = S1(m) - 2 * S2(m), where S2 is the position autocorrelation (one FFT per
+        coordinate) and S1 follows from cumulative sums of |r(t)|^2, so the cost is O(N log N) per atom
+    -> Positions are unwrapped: dump xu/yu/zu are used as is, x/y/z are shifted by image flags when present, and
+        otherwise displacements between consecutive frames are taken at minimum image (needs a cell in the file)
+    -> Unwrapped positions are streamed to a scratch file that is memory-mapped, and atoms are processed in chunks
+        sized to a memory budget, so memory stays bounded for long trajectories (e.g. 2,049 atoms x 10^5 frames)
+
+'''
+
+import os
+import tempfile
+
+import numpy as np
+
+from trajectory import iterFrames
+
+def writeUnwrappedPositions(filename, scratch):
+    species = None
+    n_frame = 0
+
+    with open(scratch, "wb") as out:
+        for frame in iterFrames(filename):
+            positions = frame['positions']
+
+            if frame['unwrapped']:
+                unwrapped = positions
+            elif frame['image'] is not None:
+                unwrapped = positions + frame['image'] @ frame['cell']
+            elif species is not None and frame['cell'] is not None:
+                # minimum image displacement since the previous frame, valid while atoms move less than half a box
+                frac = (positions - previous) @ np.linalg.inv(frame['cell'])
+                unwrapped = unwrapped + (frac - np.round(frac)) @ frame['cell']
+            else:
+                if species is not None and n_frame == 1:
+                    print(f"Warning: {filename} has no cell or image flags, positions are used as written")
+                unwrapped = positions
+
+            if species is None:
+                species = frame['species']
+            elif len(frame['species']) != len(species):
+                raise ValueError(f"{filename}: atom count changes from {len(species)} to {len(frame['species'])} at frame {n_frame}")
+
+            previous = positions
+            out.write(np.ascontiguousarray(unwrapped, dtype=np.float64).tobytes())
+            n_frame += 1
+
+    return species, n_frame
+
+def getAtomMSD(r):
+    # r: (n_frame, n_atom, 3) unwrapped positions -> (n_frame, n_atom) MSD for lags 0 .. n_frame-1
+    n = r.shape[0]
+    n_origin = (n - np.arange(n))[:, None]
+
+    # S2(m) = sum_t r(t) . r(t+m) / (n - m)
+    spectrum = np.fft.rfft(r, n=2 * n, axis=0)
+    s2 = np.sum(np.fft.irfft(spectrum * spectrum.conj(), n=2 * n, axis=0)[:n], axis=-1) / n_origin
+    del spectrum
+
+    # S1(m) = sum_t (|r(t)|^2 + |r(t+m)|^2) / (n - m)
+    d = np.sum(r**2, axis=-1)
+    removed = np.zeros_like(d)
+    removed[1:] = d[:-1] + d[:0:-1]
+    s1 = (2 * np.sum(d, axis=0) - np.cumsum(removed, axis=0)) / n_origin
+
+    return s1 - 2 * s2
+
+def getChunkSize(n_frame, n_atom, memory_mb):
+    # positions, their complex spectrum and the per-atom products, about 20 doubles per frame, atom and coordinate
+    per_atom = n_frame * 3 * 8 * 20
+    return int(np.clip(memory_mb * 1024 * 1024 // per_atom, 1, n_atom))
+
+def getElementMSD(filename, memory_mb=512, scratch_dir=None):
+    fd, scratch = tempfile.mkstemp(suffix=".bin", dir=scratch_dir)
+    os.close(fd)
+
+    try:
+        species, n_frame = writeUnwrappedPositions(filename, scratch)
+        n_atom = len(species)
+        positions = np.memmap(scratch, dtype=np.float64, mode='r', shape=(n_frame, n_atom, 3))
+
+        elements = list(dict.fromkeys(species))
+        msd_sum = {elem: np.zeros(n_frame) for elem in elements}
+
+        chunk = getChunkSize(n_frame, n_atom, memory_mb)
+        for a0 in range(0, n_atom, chunk):
+            msd = getAtomMSD(np.array(positions[:, a0:a0 + chunk]))
+            chunk_species = species[a0:a0 + chunk]
+
+            for elem in elements:
+                msd_sum[elem] += np.sum(msd[:, chunk_species == elem], axis=1)
+
+        del positions
+    finally:
+        os.remove(scratch)
+
+    return {elem: msd_sum[elem] / np.count_nonzero(species == elem) for elem in elements}
+
+def writeMSDFile(filename, msd):
+    # same layout as the fix print output read by msd_loader.py: one header line, then one value per line
+    with open(filename, "w") as f:
+        f.write("# Time-origin averaged MSD (FFT), one value per frame lag\n")
+        np.savetxt(f, msd, fmt="%.10g")
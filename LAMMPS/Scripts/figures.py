@@ -0,0 +1,153 @@
+'''
+
+figures.py
+
+Rendering stage for the plots of the LAMMPS analysis scripts
+
+Input parameters:
+    -> --redraw (command line): render every figure even if it is up to date
+
+Output:
+    -> The PNG files of the queued figures
+    -> ".figure-hashes.json" in every plot folder: data and style hash of each PNG written there
+
+Notes:
+    -> The analyses queue figures (output file, plot function, its arguments) instead of drawing them on the spot;
+        renderFigures() draws the queue with the Agg backend, in a process pool when --jobs N > 1
+    -> A figure is skipped when its PNG exists and both hashes match the ones stored when it was last written:
+        the data hash covers the arguments (array contents, not just shapes), the style hash covers the source of the
+        script that defines the plot function, the rcParams set with setStyle() and the matplotlib version
+    -> Figures are hashed when queued and only the ones to draw keep a copy of their data, so a mostly up to date
+        campaign does not hold on to its arrays
+
+'''
+
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+
+from parallel_jobs import getPool
+
+index_name = ".figure-hashes.json"
+
+style = {}
+queue = []
+indexes = {}
+source_hashes = {}
+redraw = False
+
+def addFigureArgs(parser):
+    parser.add_argument("--redraw", action="store_true", help="render every figure, even if it is up to date")
+
+def setRedraw(value):
+    global redraw
+    redraw = value
+
+def setStyle(params):
+    # rcParams used for every figure; part of the style hash
+    style.update(params)
+    plt.rcParams.update(params)
+
+def copyArgs(args):
+    if isinstance(args, np.ndarray):
+        return np.array(args)
+    if isinstance(args, (list, tuple)):
+        return type(args)(copyArgs(a) for a in args)
+
+    return args
+
+def updateDataHash(h, args):
+    if isinstance(args, np.ndarray):
+        a = np.ascontiguousarray(args)
+        h.update(f"array:{a.dtype.str}:{a.shape}:".encode())
+        h.update(a.tobytes())
+    elif isinstance(args, (list, tuple)):
+        h.update(f"{type(args).__name__}:{len(args)}:".encode())
+        for a in args:
+            updateDataHash(h, a)
+    elif isinstance(args, dict):
+        h.update(f"dict:{len(args)}:".encode())
+        for key in sorted(args):
+            updateDataHash(h, key)
+            updateDataHash(h, args[key])
+    else:
+        h.update(f"{type(args).__name__}:{args!r};".encode())
+
+def getDataHash(args):
+    h = hashlib.sha1()
+    updateDataHash(h, args)
+
+    return h.hexdigest()
+
+def getStyleHash(func):
+    module = inspect.getmodule(func)
+    if module.__name__ not in source_hashes:
+        source_hashes[module.__name__] = hashlib.sha1(inspect.getsource(module).encode()).hexdigest()
+
+    h = hashlib.sha1()
+    h.update(source_hashes[module.__name__].encode())
+    h.update(func.__qualname__.encode())
+    h.update(json.dumps(style, sort_keys=True, default=str).encode())
+    h.update(matplotlib.__version__.encode())
+
+    return h.hexdigest()
+
+def getIndex(folder):
+    if folder not in indexes:
+        try:
+            with open(os.path.join(folder, index_name), "r") as f:
+                indexes[folder] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            indexes[folder] = {}
+
+    return indexes[folder]
+
+def writeIndex(folder):
+    path = os.path.join(folder, index_name)
+    with open(path + ".tmp", "w") as f:
+        json.dump(indexes[folder], f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def queueFigure(of, func, *args):
+    # func(*args) must write the figure to of
+    hashes = {'data': getDataHash(args), 'style': getStyleHash(func)}
+    folder, name = os.path.split(of)
+
+    if not redraw and os.path.exists(of) and getIndex(folder).get(name) == hashes:
+        return
+
+    queue.append((of, func, copyArgs(args), hashes))
+
+def renderFigure(func, args, params):
+    plt.switch_backend("Agg")
+    plt.rcParams.update(params)
+    func(*args)
+    plt.close('all')
+
+def renderFigures(jobs=1):
+    print(f"Rendering {len(queue)} figures...")
+
+    if jobs <= 1 or len(queue) < 2:
+        for of, func, args, hashes in queue:
+            renderFigure(func, args, style)
+    else:
+        pool = getPool(jobs)
+        futures = [pool.submit(renderFigure, func, args, style) for of, func, args, hashes in queue]
+        for future in futures:
+            future.result()
+
+    folders = set()
+    for of, func, args, hashes in queue:
+        folder, name = os.path.split(of)
+        getIndex(folder)[name] = hashes
+        folders.add(folder)
+
+    for folder in folders:
+        writeIndex(folder)
+
+    queue.clear()
@@ -0,0 +1,170 @@
+'''
+
+lammps_runner.py
+
+Runs the LAMMPS trajectories of a campaign as concurrent jobs packed into one allocation
+
+Input parameters:
+    -> campaign: manifest read by campaign.py; every system also takes
+        input: the LAMMPS deck of the system (defaults to "<name>.in")
+        sizes: box sizes in lattice units passed as "-var size" (defaults to [8])
+        (the folder read by the analysis is the system "folder" of campaign.py; see the notes for several sizes)
+    -> ranks: MPI ranks of every job; the allocation runs total_ranks // ranks jobs at once
+    -> launcher: command put in front of the executable, with {ranks} replaced (e.g. "mpirun -np {ranks}",
+        "srun --exact -n {ranks}"); an empty launcher runs the executable directly
+
+Output:
+    -> The files written by the decks, in the working folder of the runs (the parent folder, see directory-formatting.md):
+        "<system>/" for a system with one size, "<system>_<size>/" per size for a system with several
+    -> One LAMMPS log per job in "<log_dir>/<system>_<size>_<runtime>ps_<temperature>_<index>.log"
+    -> A journal with one JSON line per finished attempt: job name, status, exit code, attempt and duration
+
+Notes:
+    -> A job is (system, size, runtime, temperature, index), run as
+        "<launcher> <lmp> -in <input> -var size <size> -var runtime <runtime> -var temp <temperature> -var index <index>
+        -var out <folder> -log <log> -screen none"; the per-job log keeps concurrent jobs from writing the same log.lammps
+    -> The output folder is passed as "-var out" (see decks.py): runs of different sizes of one system would otherwise
+        write the same "<index>_md_<runtime>ps_<temperature>.txt"; each "<system>_<size>" folder can be analysed as
+        its own manifest system with that folder
+    -> Every runtime of a system is its own run, so each "<index>_md_<runtime>ps_<temperature>.txt" read by the
+        analysis scripts is written (the decks would otherwise only run their default, longest runtime)
+    -> The journal is appended and flushed after every attempt, so a run killed at the wall time loses only the jobs
+        that were running; starting again with the same journal skips the finished jobs and retries the rest
+    -> Failed jobs are queued again until they have failed max_retries + 1 times
+    -> Larger boxes and longer runtimes are started first, so the long jobs do not end up alone at the end of the
+        allocation
+    -> On SIGTERM or SIGINT (Slurm signals before the wall time) running jobs are terminated and nothing is recorded
+        for them
+
+'''
+
+import json
+import os
+import shlex
+import signal
+import subprocess
+import time
+
+def getJobs(campaign):
+    jobs = []
+    for system in campaign["systems"]:
+        deck = system.get("input", f"{system['name']}.in")
+        sizes = system.get("sizes", [8])
+        for size in sizes:
+            folder = system['name'] if len(sizes) == 1 else f"{system['name']}_{size}"
+            for runtime in system["runtimes"]:
+                for temperature in campaign["temperatures"]:
+                    for index in system["indices"]:
+                        jobs.append({
+                            'name': f"{system['name']}_{size}_{runtime}ps_{temperature}_{index}",
+                            'system': system['name'],
+                            'folder': folder,
+                            'input': deck,
+                            'size': int(size),
+                            'runtime': runtime,
+                            'temperature': int(temperature),
+                            'index': int(index),
+                        })
+
+    # stable, so the manifest order is kept within a size and runtime
+    return sorted(jobs, key=lambda job: (-job['size'], -job['runtime']))
+
+def readJournal(filename):
+    # -> {job name: (finished, number of failed attempts)}
+    state = {}
+    if not os.path.exists(filename):
+        return state
+
+    with open(filename, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue    # last line cut by a kill
+
+            done, failures = state.get(entry["job"], (False, 0))
+            if entry["status"] == "done":
+                done = True
+            else:
+                failures += 1
+            state[entry["job"]] = (done, failures)
+
+    return state
+
+def getCommand(job, lmp, ranks, launcher, log_dir):
+    command = shlex.split(launcher.format(ranks=ranks)) + shlex.split(lmp)
+    command += ["-in", job['input'], "-var", "size", str(job['size']), "-var", "runtime", str(job['runtime']),
+        "-var", "temp", str(job['temperature']), "-var", "index", str(job['index']), "-var", "out", job['folder']]
+    command += ["-log", os.path.join(log_dir, f"{job['name']}.log"), "-screen", "none"]
+
+    return command
+
+def runCampaign(jobs, journal, lmp="./lmp_mpi", ranks=1, total_ranks=1, launcher="mpirun -np {ranks}",
+        workdir=".", log_dir="logs", max_retries=1, poll=1.0):
+    # -> (number of jobs finished now, number of jobs left unfinished)
+    slots = max(total_ranks // ranks, 1)
+
+    # the decks write into "./<folder>" and LAMMPS does not create folders
+    for folder in {log_dir} | {job['folder'] for job in jobs}:
+        os.makedirs(os.path.join(workdir, folder), exist_ok=True)
+
+    state = readJournal(journal)
+    queue = [job for job in jobs if not state.get(job['name'], (False, 0))[0]]
+    failures = {job['name']: state.get(job['name'], (False, 0))[1] for job in queue}
+    queue = [job for job in queue if failures[job['name']] <= max_retries]
+
+    print(f"{len(jobs)} jobs, {len(jobs) - len(failures)} already done, {len(queue)} to run, {slots} at a time of {ranks} rank(s)")
+
+    running = {}
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+
+    previous = {sig: signal.signal(sig, stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+    n_done = 0
+
+    try:
+        with open(journal, "a") as log:
+            while (queue or running) and not stopping:
+                while queue and len(running) < slots:
+                    job = queue.pop(0)
+                    command = getCommand(job, lmp, ranks, launcher, log_dir)
+                    running[job['name']] = (job, subprocess.Popen(command, cwd=workdir, stdout=subprocess.DEVNULL, start_new_session=True), time.time())
+
+                time.sleep(poll)
+
+                for name, (job, process, start) in list(running.items()):
+                    code = process.poll()
+                    if code is None:
+                        continue
+
+                    del running[name]
+                    entry = {
+                        'job': name, 'status': "done" if code == 0 else "failed", 'code': code,
+                        'attempt': failures[name] + 1, 'seconds': round(time.time() - start, 1),
+                    }
+                    failures[name] += code != 0
+                    log.write(json.dumps(entry) + "\n")
+                    log.flush()
+
+                    if code == 0:
+                        n_done += 1
+                    elif failures[name] <= max_retries:
+                        print(f"{name} failed with code {code}, retrying ({failures[name]}/{max_retries})")
+                        queue.append(job)
+                    else:
+                        print(f"{name} failed with code {code}, giving up")
+    finally:
+        # each job is its own process group, so the launcher and everything it started get the signal
+        for job, process, start in running.values():
+            os.killpg(process.pid, signal.SIGTERM)
+        for job, process, start in running.values():
+            process.wait()
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+
+    if stopping:
+        print(f"Stopped by signal {stopping[0]}, {len(running)} running job(s) will run again on resume")
+
+    return n_done, sum(1 for job in jobs if not state.get(job['name'], (False, 0))[0]) - n_done
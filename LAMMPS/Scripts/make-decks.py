@@ -0,0 +1,44 @@
+'''
+
+make-decks.py
+
+Input parameters:
+    -> --manifest FILE (command line): campaign manifest with the deck settings and system specs (see decks.py)
+    -> --systems NAME... (command line): only render these systems
+    -> --out-dir DIR (command line): folder the decks are written to (default "..", where run-campaign.py runs them)
+
+Output:
+    -> "<name>.in" for every system, writing one "<index>_md_<runtime>ps_<temperature>.txt" file per run
+
+'''
+
+import argparse
+import os
+
+from campaign import addCampaignArgs, getCampaign
+from decks import getDeckSettings, renderDeck
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    addCampaignArgs(parser)
+    parser.add_argument("--systems", nargs="+", default=None, help="systems to render")
+    parser.add_argument("--out-dir", default="..", help="folder for the decks")
+    args = parser.parse_args()
+
+    campaign = getCampaign(args)
+    settings = getDeckSettings(campaign)
+
+    for system in campaign["systems"]:
+        if args.systems is not None and system["name"] not in args.systems:
+            continue
+
+        of = os.path.join(args.out_dir, f"{system['name']}.in")
+        print(f"Writing {of}...")
+        with open(of, "w") as f:
+            f.write(renderDeck(system, settings))
+
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+'''
+
+msd-follow.py
+
+Input parameters:
+    -> --manifest FILE (command line): campaign manifest with the systems, folders, elements, n_atom and dim
+        (see campaign.py; defaults to campaign.json)
+    -> --interval S (command line): seconds between reports
+    -> --tol X (command line): relative tolerance on D used for the convergence indicator
+    -> --window N (command line): number of points over which the change of D is measured
+    -> --once (command line): read what has been written so far, report once and exit
+
+Input files:
+    -> Run files that LAMMPS is still writing, as named by the decks of decks.py: "<index>_md_<runtime>ps_<temperature>.txt",
+        a "# step msd_<element>... pe" title line and one row per output interval; used whenever a run has one
+    -> Otherwise, Mean Squared Displacement files, either as named by the old input decks
+        "<index>_msd_<element>_<temperature>.txt" or as "<index>_msd_<element>_<runtime>ps_<temperature>.txt"
+
+Other Output:
+    -> A table per report, one row per (system, index, runtime, temperature) with the number of points read, D, ln(D),
+        the relative SE of D, the relative change of D over the last --window points and whether D has converged;
+        a run with no new points since the previous report is shown as "no new data" and never as converged
+
+Notes:
+    -> Only the bytes appended since the previous report are read; a partially written last line is kept for the next pass
+    -> Running OLS sums are updated in O(1) per new line (see RunningFit in ols_fit.py), nothing is ever refit
+    -> Element series are summed line by line, so the total only advances as far as the slowest element file
+    -> In a run file the element columns are found by name from the title line (getTableColumns in msd_loader.py), and
+        a row is only used once it is complete
+    -> D is recorded every --window points of the series, so the change of D is measured over a fixed number of points
+        and does not depend on --interval or on how much a run wrote between two reports
+    -> D is converged when both its relative SE and its relative change over the last window are below --tol; the OLS SE
+        of a cumulative SD series treats correlated points as independent and is far too small, so it is never used alone
+
+'''
+
+import argparse
+import glob
+import os
+import re
+import time
+
+import numpy as np
+
+from campaign import addCampaignArgs, getCampaign
+from msd_loader import getTableColumns
+from ols_fit import RunningFit
+
+msd_pattern = re.compile(r"(\d+)_msd_([A-Za-z]+)_(?:(\d+)ps_)?(\d+)\.txt$")
+run_pattern = re.compile(r"(\d+)_md_(\d+)ps_(\d+)\.txt$")
+
+def newTail(filename, n_atom, dim, table=False):
+    # n_atom: {column name: number of atoms}; a single-element file has one unnamed column
+    return {'filename': filename, 'n_atom': n_atom, 'dim': dim, 'table': table, 'columns': None, 'offset': 0, 'partial': b'', 'header': True, 'head': [], 'pending': np.empty(0)}
+
+def getTailColumns(tail):
+    # -> (column number, number of atoms) per element, read from the title line of a run file
+    if not tail['table']:
+        return 1, [(0, n) for n in tail['n_atom'].values()]
+
+    header = getTableColumns(tail['filename'])
+    missing = [name for name in tail['n_atom'] if name not in header]
+    if missing:
+        raise ValueError(f"{tail['filename']} has no column {missing}")
+
+    return len(header), [(header.index(name), n) for name, n in tail['n_atom'].items()]
+
+def readTail(tail):
+    with open(tail['filename'], "rb") as f:
+        f.seek(tail['offset'])
+        chunk = f.read()
+    tail['offset'] += len(chunk)
+
+    data = tail['partial'] + chunk
+    cut = data.rfind(b'\n') + 1
+    tail['partial'] = data[cut:]    # incomplete last line, finished on a later pass
+    data = data[:cut]
+
+    if tail['header'] and cut > 0:
+        data = data[data.find(b'\n') + 1:]  # skip header line
+        tail['header'] = False
+        tail['columns'] = getTailColumns(tail)
+
+    if tail['columns'] is None:
+        return
+
+    n_column, columns = tail['columns']
+    values = np.array(data.split(), dtype=np.float64).reshape(-1, n_column)
+
+    # the first row is tiny and the second one is used to normalize each reading
+    n_head = min(2 - len(tail['head']), len(values))
+    tail['head'].extend(values[:n_head])
+    values = values[n_head:]
+
+    if len(values) > 0:
+        sd = sum((values[:, c] - tail['head'][1][c]) / (2 * tail['dim']) * n for c, n in columns)
+        tail['pending'] = np.concatenate((tail['pending'], sd))
+
+def newSeries(expected):
+    # d_prev, d_last: D at the last two multiples of the window; n_report: points read at the previous report
+    return {'tails': {}, 'expected': expected, 'fit': RunningFit(), 'd_prev': np.nan, 'd_last': np.nan, 'n_report': 0}
+
+def updateSeries(series, window):
+    for tail in series['tails'].values():
+        readTail(tail)
+
+    # only the lines every element file has reached can be summed
+    n_common = min(len(tail['pending']) for tail in series['tails'].values())
+    if n_common == 0:
+        return
+
+    sd_total = np.zeros(n_common)
+    for tail in series['tails'].values():
+        sd_total += tail['pending'][:n_common]
+        tail['pending'] = tail['pending'][n_common:]
+
+    # split at multiples of the window, so D is recorded at the same points whatever was read per pass
+    fit = series['fit']
+    while len(sd_total) > 0:
+        k = window - fit.n % window
+        fit.add(sd_total[:k])
+        sd_total = sd_total[k:]
+
+        if fit.n % window == 0 and fit.n >= 3:
+            series['d_prev'], series['d_last'] = series['d_last'], fit.getFit()[0][1]
+
+def findSeries(campaign, states):
+    for system in campaign["systems"]:
+        system_name = system["name"]
+        elements = system["elements"]
+
+        # a run file holds every element of its run in one table
+        for f in glob.glob(f"{system['folder']}/*_md_*ps_*.txt"):
+            match = run_pattern.search(os.path.basename(f))
+            if match is None:
+                continue
+
+            idx, rtime, temp = match.groups()
+            key = (system_name, int(idx), int(rtime), int(temp))
+
+            if key not in states:
+                n_atom = {f"msd_{elem}": system["n_atom"][elem] for elem in elements}
+                states[key] = newSeries(1)
+                states[key]['tails']['run'] = newTail(f, n_atom, campaign["dim"], table=True)
+
+        for f in glob.glob(f"{system['folder']}/*_msd_*.txt"):
+            match = msd_pattern.search(os.path.basename(f))
+            if match is None or match.group(2) not in elements:
+                continue
+
+            idx, elem, rtime, temp = match.groups()
+            key = (system_name, int(idx), int(rtime) if rtime else 0, int(temp))
+
+            if key not in states:
+                states[key] = newSeries(len(elements))
+            if 'run' not in states[key]['tails'] and elem not in states[key]['tails']:
+                states[key]['tails'][elem] = newTail(f, {elem: system["n_atom"][elem]}, campaign["dim"])
+
+def reportSeries(states, tol):
+    print(f"{'system':<8} {'index':>5} {'runtime':>8} {'T':>6} {'points':>9} {'D':>12} {'ln(D)':>9} {'rel SE':>9} {'rel dD':>9}  converged")
+
+    for key in sorted(states):
+        series = states[key]
+        fit = series['fit']
+        system_name, idx, rtime, temp = key
+
+        if len(series['tails']) < series['expected'] or fit.n < 3:
+            print(f"{system_name:<8} {idx:>5} {rtime:>8} {temp:>6} {fit.n:>9}   waiting for data")
+            continue
+
+        # a stalled or killed run keeps its last D, which must not read as converged
+        if fit.n == series['n_report']:
+            print(f"{system_name:<8} {idx:>5} {rtime:>8} {temp:>6} {fit.n:>9}   no new data")
+            continue
+        series['n_report'] = fit.n
+
+        params, se = fit.getFit()
+        d = params[1]
+        rel_se = se[1] / abs(d)
+        rel_change = abs(series['d_last'] - series['d_prev']) / abs(series['d_last'])
+        converged = rel_se < tol and rel_change < tol
+
+        lnd = np.log(d) if d > 0 else np.nan
+        print(f"{system_name:<8} {idx:>5} {rtime:>8} {temp:>6} {fit.n:>9} {d:>12.5e} {lnd:>9.4f} {rel_se:>9.2e} {rel_change:>9.2e}  {'yes' if converged else 'no'}")
+
+    print(flush=True)
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    addCampaignArgs(parser)
+    parser.add_argument("--interval", type=float, default=60, help="seconds between reports")
+    parser.add_argument("--tol", type=float, default=1e-2, help="relative tolerance on D for convergence")
+    parser.add_argument("--window", type=int, default=500, help="points over which the change of D is measured")
+    parser.add_argument("--once", action="store_true", help="report once and exit")
+    args = parser.parse_args()
+
+    campaign = getCampaign(args)
+    states = {}
+
+    while True:
+        findSeries(campaign, states)
+
+        for series in states.values():
+            if len(series['tails']) == series['expected']:
+                updateSeries(series, args.window)
+
+        reportSeries(states, args.tol)
+
+        if args.once:
+            break
+
+        time.sleep(args.interval)
+
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+'''
+
+msd-from-dump.py
+
+Input parameters:
+    -> trajectory (command line): dump or xyz trajectory with one frame per output interval (e.g. 1 ps)
+    -> --index, --runtime, --temperature (command line): used to name the output files like the fix print output
+    -> --out-dir (command line): folder the MSD files are written to, usually the system folder "../<system>"
+    -> --max-lag F (command line): fraction of the trajectory length written out; long lags have few time origins
+    -> --memory-mb M (command line): memory budget for the per-chunk FFTs
+    -> --scratch-dir (command line): where the unwrapped positions are staged (defaults to the system temp folder)
+
+Input files:
+    -> Any trajectory readable by trajectory.py, e.g. "dump.alloy", "out.xyz" or "interm.xyz"
+
+Output:
+    -> One "<index>_msd_<element>_<runtime>ps_<temperature>.txt" file per element, readable by msd_loader.py and the
+        analysis scripts in place of the single-origin "compute msd" output
+
+Notes:
+    -> The MSD is averaged over every time origin, with the FFT algorithm in fft_msd.py
+    -> Like the fix print output, the first two values (lags 0 and 1) are dropped by the loaders, which also
+        subtract the lag 1 value from every reading
+
+'''
+
+import argparse
+import os
+
+from fft_msd import getElementMSD, writeMSDFile
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("trajectory", help="dump or xyz trajectory")
+    parser.add_argument("--index", type=int, required=True, help="trajectory index used in the output names")
+    parser.add_argument("--runtime", type=int, required=True, help="runtime in ps used in the output names")
+    parser.add_argument("--temperature", type=int, required=True, help="temperature used in the output names")
+    parser.add_argument("--out-dir", default=".", help="folder for the MSD files")
+    parser.add_argument("--max-lag", type=float, default=0.5, help="fraction of the trajectory length written out")
+    parser.add_argument("--memory-mb", type=float, default=512, help="memory budget for the FFTs")
+    parser.add_argument("--scratch-dir", default=None, help="folder for the unwrapped positions")
+    args = parser.parse_args()
+
+    msd = getElementMSD(args.trajectory, args.memory_mb, args.scratch_dir)
+
+    for elem, elem_msd in msd.items():
+        n_lag = max(int(len(elem_msd) * args.max_lag), 3)
+        of = os.path.join(args.out_dir, f"{args.index}_msd_{elem}_{args.runtime}ps_{args.temperature}.txt")
+
+        print(f"Writing {of} ({n_lag} lags)...")
+        writeMSDFile(of, elem_msd[:n_lag])
+
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+'''
+
+msd_cache.py
+
+Persistent binary cache for parsed "fix print" series used by msd_loader.py
+
+Input parameters:
+    -> Cache directory: set with the MSD_CACHE_DIR environment variable; an empty value disables the cache
+    -> Cache budget: set with the MSD_CACHE_SIZE_MB environment variable; least recently used entries are evicted past it
+
+Output:
+    -> One "<key>.npy" blob per parsed text file, where the key is a hash of the file's absolute path, size and mtime
+
+Notes:
+    -> Entries are opened memory-mapped, so a cache hit does no text parsing and only touches the pages that are read
+    -> A changed source file gets a new key, the stale entry is never read again and ages out through LRU eviction
+    -> Safe to share between processes (e.g. several analysis jobs on a cluster filesystem):
+        entries are written to a private temporary file and renamed into place, readers never see a partial
+        entry, and entries that disappear under a reader (eviction by another process) fall back to parsing
+
+'''
+
+import hashlib
+import os
+import time
+import uuid
+
+import numpy as np
+
+cache_dir = os.environ.get("MSD_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "msd-cache"))
+cache_size_mb = float(os.environ.get("MSD_CACHE_SIZE_MB", 2048))
+stale_tmp_age = 3600   # seconds
+
+def getCacheKey(filename):
+    st = os.stat(filename)
+    fingerprint = f"{os.path.abspath(filename)}:{st.st_size}:{st.st_mtime_ns}"
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+def getCachePath(key):
+    return os.path.join(cache_dir, f"{key}.npy")
+
+def loadEntry(key):
+    path = getCachePath(key)
+    try:
+        arr = np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None # missing, evicted by another process, or unreadable
+
+    try:
+        os.utime(path)  # mark as recently used for LRU eviction
+    except OSError:
+        pass
+
+    return arr
+
+def storeEntry(key, arr):
+    os.makedirs(cache_dir, exist_ok=True)
+
+    path = getCachePath(key)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp, path)   # atomic, readers see either no entry or a complete one
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return
+
+    evictEntries()
+
+def evictEntries():
+    budget = cache_size_mb * 1024 * 1024
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        try:
+            st = os.stat(os.path.join(cache_dir, name))
+        except OSError:
+            continue
+
+        if name.endswith(".tmp") and time.time() - st.st_mtime > stale_tmp_age:
+            try:
+                os.remove(os.path.join(cache_dir, name))   # left behind by a killed writer
+            except OSError:
+                pass
+        elif name.endswith(".npy"):
+            entries.append((st.st_mtime, st.st_size, name))
+
+    total = sum(e[1] for e in entries)
+    entries.sort()  # oldest use first
+
+    for mtime, size, name in entries:
+        if total <= budget:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except OSError:
+            pass    # already evicted by another process
+        total -= size
+
+def cached(parse, filename, *args):
+    if not cache_dir:
+        return parse(filename, *args)
+
+    key = getCacheKey(filename)
+    if args:
+        key = hashlib.sha1(f"{key}:{args}".encode()).hexdigest()
+
+    arr = loadEntry(key)
+    if arr is None:
+        arr = parse(filename, *args)
+        storeEntry(key, arr)
+
+    return arr
@@ -0,0 +1,168 @@
+'''
+
+msd_loader.py
+
+Shared loaders for the "fix print" output files read by the analysis scripts
+
+Input files:
+    -> Run files written by the decks of decks.py: "<index>_md_<runtime>ps_<temperature>.txt", a "# step msd_<element>...
+        pe" title line and one row per output interval; used whenever a run has one
+    -> Otherwise, Mean Squared Displacement files are expected to have format "<index>_msd_<element>_<runtime>ps_<temperature>.txt"
+    -> and Potential Energy files are expected to have format "<index>_pe_<runtime>ps_<temperature>.txt"
+
+Notes:
+    -> Each file is parsed in one bulk pass straight into a float64 array instead of line by line
+    -> The values are converted with the same string -> float conversion as float(line), so the
+        returned arrays are bit-for-bit identical to the old per-line getParameterFromFile copies
+    -> MSD series are returned as squared displacements: (msd - initial_jump) / (2 * dim) * n_atom
+    -> Parsed columns go through the binary cache in msd_cache.py, so unchanged files are only parsed once
+    -> A run file is parsed once into a (row, column) table and every element and the PE are columns of it, so a run
+        costs one open and one parse instead of one per element plus one for the PE
+    -> getSDArray/getPEArray return a whole system as one dense float array:
+        SD: (index, runtime, temperature, element, time), PE: (index, runtime, temperature, time)
+        Series shorter than the longest one are padded with NaN; n_time[index, runtime, temperature] is the valid length
+        of that run, so a run that was cut short does not shorten the others (only the series of one run are cut to
+        their shortest, with a warning)
+    -> With jobs > 1 the files of a system are parsed over a process pool (see parallel_jobs.py)
+
+'''
+
+import os
+
+import numpy as np
+
+from msd_cache import cached
+from parallel_jobs import mapToShared, releaseShared
+
+def parseColumn(filename, n_header=1):
+    with open(filename, "r") as f:
+        for h in range(n_header):
+            next(f) # skip header lines
+        values = f.read().split()
+
+    return np.array(values, dtype=np.float64)
+
+def readColumn(filename, n_header=1):
+    return cached(parseColumn, filename, n_header)
+
+def parseTable(filename):
+    with open(filename, "r") as f:
+        n_column = len(next(f).split()) - 1    # "# step ..." title line
+        values = f.read().split()
+
+    n_row = len(values) // n_column    # a run killed mid-line leaves a partial last row
+    return np.array(values[:n_row * n_column], dtype=np.float64).reshape(n_row, n_column)
+
+def readTable(filename):
+    return cached(parseTable, filename)
+
+def getTableColumns(filename):
+    with open(filename, "r") as f:
+        return f.readline().split()[1:]
+
+def getSDFromMSD(msd, n_atom_constituent, dim=3):
+    initial_jump = msd[1]  # first value is tiny, the second one is used to normalize each reading
+    return (msd[2:] - initial_jump) / (2 * dim) * n_atom_constituent
+
+def getSDFromFile(filename, n_atom_constituent, dim=3):
+    return getSDFromMSD(readColumn(filename), n_atom_constituent, dim)
+
+def getPEFromFile(filename):
+    return readColumn(filename)
+
+def getMSDFilename(system_folder, idx, elem, rtime, temp):
+    return f"{system_folder}/{idx}_msd_{elem}_{rtime}ps_{temp}.txt"
+
+def getPEFilename(system_folder, idx, rtime, temp):
+    return f"{system_folder}/{idx}_pe_{rtime}ps_{temp}.txt"
+
+def getRunFilename(system_folder, idx, rtime, temp):
+    return f"{system_folder}/{idx}_md_{rtime}ps_{temp}.txt"
+
+def getDenseArray(columns, shape, convert, n_skip=0):
+    # keys start with (index, runtime, temperature); every run keeps its own length
+    unset = np.iinfo(int).max
+
+    n_time = np.full(shape[:3], unset, dtype=int)
+    for key, column in columns.items():
+        run = key[:3]
+        n = len(column) - n_skip
+        if n_time[run] != unset and n != n_time[run]:
+            print(f"Warning: run {run} (index, runtime, temperature) has series of unequal length, truncating to the shortest")
+        n_time[run] = min(n_time[run], n)
+
+    dense = np.full(shape + (np.max(n_time),), np.nan, dtype=np.float64)
+    for key, column in columns.items():
+        n = n_time[key[:3]]
+        dense[key][:n] = convert(key, column)[:n]
+
+    return dense, n_time
+
+def readColumns(filenames, jobs=1, read=readColumn):
+    if jobs <= 1:
+        return {key: read(f) for key, f in filenames.items()}, []
+
+    arrays, blocks = mapToShared(read, [(f,) for f in filenames.values()], jobs)
+    return dict(zip(filenames.keys(), arrays)), blocks
+
+def readRunColumns(system_folder, indices, runtimes, temperatures, names, getFilename, jobs=1):
+    # -> {(i, r, t, n): series of names[n]} from the run files, or from getFilename(idx, rtime, temp, n) for runs without one
+    run_files = {}
+    filenames = {}
+    for i, idx in enumerate(indices):
+        for r, rtime in enumerate(runtimes):
+            for t, temp in enumerate(temperatures):
+                run_file = getRunFilename(system_folder, idx, rtime, temp)
+                if os.path.exists(run_file):
+                    run_files[i, r, t] = run_file
+                else:
+                    for n in range(len(names)):
+                        filenames[i, r, t, n] = getFilename(idx, rtime, temp, n)
+
+    tables, table_blocks = readColumns(run_files, jobs, readTable)
+    columns, blocks = readColumns(filenames, jobs)
+
+    for key, table in tables.items():
+        header = getTableColumns(run_files[key])
+        missing = [name for name in names if name not in header]
+        if missing:
+            raise ValueError(f"{run_files[key]} has no column {missing}")
+
+        for n, name in enumerate(names):
+            columns[key + (n,)] = table[:, header.index(name)]
+
+    tables.clear()
+
+    return columns, table_blocks + blocks
+
+def getSDArray(system_folder, indices, runtimes, temperatures, elements, n_atom, dim=3, jobs=1):
+    def getFilename(idx, rtime, temp, e):
+        return getMSDFilename(system_folder, idx, elements[e], rtime, temp)
+
+    def convert(key, msd):
+        return getSDFromMSD(msd, n_atom[elements[key[3]]], dim)
+
+    names = [f"msd_{elem}" for elem in elements]
+    columns, blocks = readRunColumns(system_folder, indices, runtimes, temperatures, names, getFilename, jobs)
+    shape = (len(indices), len(runtimes), len(temperatures), len(elements))
+    try:
+        return getDenseArray(columns, shape, convert, n_skip=2)
+    finally:
+        columns.clear()
+        releaseShared(blocks)
+
+def getPEArray(system_folder, indices, runtimes, temperatures, jobs=1):
+    def getFilename(idx, rtime, temp, n):
+        return getPEFilename(system_folder, idx, rtime, temp)
+
+    def convert(key, pe):
+        return pe
+
+    columns, blocks = readRunColumns(system_folder, indices, runtimes, temperatures, ["pe"], getFilename, jobs)
+    columns = {key[:3]: column for key, column in columns.items()}
+    shape = (len(indices), len(runtimes), len(temperatures))
+    try:
+        return getDenseArray(columns, shape, convert)
+    finally:
+        columns.clear()
+        releaseShared(blocks)
@@ -0,0 +1,150 @@
+'''
+
+ols_fit.py
+
+Batched closed-form ordinary least squares fits of y = b + m * x
+
+Input parameters:
+    -> x: 1D array of the independent variable, shared by every series in the stack
+    -> y: array of shape (..., n); every leading index is an independent series of length n
+
+Output:
+    -> params: array of shape (..., 2) holding (intercept, slope), same order as statsmodels' fit.params
+    -> se: array of shape (..., 2) holding the standard errors of (intercept, slope), same as statsmodels' fit.bse
+
+Notes:
+    -> Replaces one sm.OLS model per series; a whole stack of equal-length series is fit in one vectorized pass
+    -> Sums over x are taken about the mean of x so that long series (250,000 points) do not lose precision
+    -> For the time axis x = np.arange(n) the x sums are known in closed form and are not recomputed per series
+    -> getRuntimeFits fits the NaN padded series of a system (see msd_loader.py), each over its own length
+    -> Agrees with statsmodels to within floating point tolerance
+    -> getPrefixFits fits every truncation y[..., :L] of a series at once from cumulative sums, in O(n)
+    -> RunningFit keeps the same time-axis fit up to date while points are appended (e.g. files still being written)
+
+'''
+
+import numpy as np
+
+def getSE(n, x_mean, sxx, ss_res):
+    sigma2 = ss_res / (n - 2)
+
+    se_m = np.sqrt(sigma2 / sxx)
+    se_b = np.sqrt(sigma2 * (1 / n + x_mean**2 / sxx))
+
+    return se_b, se_m
+
+def getFitFromSums(x, x_mean, sxx, y):
+    n = x.shape[0]
+
+    y_mean = np.mean(y, axis=-1)
+    # row by row (not BLAS, which blocks rows together), so a row's result does not depend on its neighbours
+    sxy = np.einsum('...i,i->...', y, x - x_mean)
+
+    m = sxy / sxx
+    b = y_mean - m * x_mean
+
+    residuals = y - (b[..., None] + m[..., None] * x)
+    ss_res = np.einsum('...i,...i->...', residuals, residuals)
+    se_b, se_m = getSE(n, x_mean, sxx, ss_res)
+
+    return np.stack((b, m), axis=-1), np.stack((se_b, se_m), axis=-1)
+
+def getLinearFit(x, y):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    x_mean = np.mean(x)
+    sxx = np.sum((x - x_mean)**2)
+
+    return getFitFromSums(x, x_mean, sxx, y)
+
+def getTimeFit(y):
+    y = np.asarray(y, dtype=float)
+    n = y.shape[-1]
+
+    # closed form sums over the shared time axis x = 0, 1, ..., n-1
+    x_mean = (n - 1) / 2
+    sxx = n * (n**2 - 1) / 12
+
+    return getFitFromSums(np.arange(n, dtype=float), x_mean, sxx, y)
+
+def getRuntimeFits(y, n_time):
+    # y: (index, runtime, temperature, time), NaN padded past n_time[index, runtime, temperature] -> fit params (..., 2)
+    # (any leading axes work, e.g. (run, temperature) in ea_results.py);
+    # runs of equal length are fit together, every run over its own length
+    params = np.empty(y.shape[:-1] + (2,), dtype=float)
+    for n in np.unique(n_time):
+        rows = n_time == n
+        params[rows], _ = getTimeFit(y[rows, :n])
+
+    return params
+
+def getPrefixFits(y):
+    y = np.asarray(y, dtype=float)
+    n = y.shape[-1]
+
+    # removing the first value keeps the cumulative sums small; it is added back to the intercepts
+    y0 = y[..., :1]
+    y = y - y0
+
+    length = np.arange(1, n + 1, dtype=float)
+    x_mean = (length - 1) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sxx = length * (length**2 - 1) / 12
+
+        s_y = np.cumsum(y, axis=-1)
+        s_xy = np.cumsum(y * np.arange(n, dtype=float), axis=-1)
+        sxy = s_xy - x_mean * s_y
+
+        m = sxy / sxx
+        b = s_y / length - m * x_mean + y0
+
+    m[..., 0] = np.nan
+    b[..., 0] = np.nan
+
+    return np.stack((b, m), axis=-1)
+
+class RunningFit:
+    # running sums of a time-axis fit (x = 0, 1, 2, ...) kept about the running means, updated in O(1) per point
+
+    def __init__(self):
+        self.n = 0
+        self.x_mean = 0.0
+        self.y_mean = 0.0
+        self.sxx = 0.0
+        self.sxy = 0.0
+        self.syy = 0.0
+
+    def add(self, y):
+        y = np.asarray(y, dtype=float)
+        k = len(y)
+        if k == 0:
+            return
+
+        # centered sums of the new block, merged into the running ones (Chan et al. pairwise update)
+        x = np.arange(self.n, self.n + k, dtype=float)
+        x_mean_b = np.mean(x)
+        y_mean_b = np.mean(y)
+        dx_b = x - x_mean_b
+        dy_b = y - y_mean_b
+
+        n = self.n + k
+        dx = x_mean_b - self.x_mean
+        dy = y_mean_b - self.y_mean
+        weight = self.n * k / n
+
+        self.sxx += np.dot(dx_b, dx_b) + dx * dx * weight
+        self.sxy += np.dot(dx_b, dy_b) + dx * dy * weight
+        self.syy += np.dot(dy_b, dy_b) + dy * dy * weight
+        self.x_mean += dx * k / n
+        self.y_mean += dy * k / n
+        self.n = n
+
+    def getFit(self):
+        m = self.sxy / self.sxx
+        b = self.y_mean - m * self.x_mean
+
+        ss_res = max(self.syy - self.sxy * m, 0.0)
+        se_b, se_m = getSE(self.n, self.x_mean, self.sxx, ss_res)
+
+        return np.array([b, m]), np.array([se_b, se_m])
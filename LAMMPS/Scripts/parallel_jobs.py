@@ -0,0 +1,80 @@
+'''
+
+parallel_jobs.py
+
+Process-pool execution mode for the LAMMPS analysis scripts
+
+Input parameters:
+    -> --jobs N: number of worker processes; the default of 1 keeps the serial path
+
+Notes:
+    -> Results are always returned in task order, so the output does not depend on N
+    -> Arrays produced by the workers (parsed series) come back through shared memory blocks instead of being pickled
+    -> Only the parse and the plots go to the workers; the fits are one vectorized pass (ols_fit.py) that takes
+        milliseconds, less than handing the series to a worker
+    -> One pool is started per run and reused by every parse and render, so --jobs N costs the start-up once
+    -> Scales until the filesystem is the bottleneck; with a warm msd_cache the parse stage is mostly page copies
+
+'''
+
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+def addJobsArgs(parser):
+    parser.add_argument("--jobs", type=int, default=1, help="number of worker processes")
+
+def getJobs(args):
+    return max(args.jobs, 1)
+
+pools = {}
+
+def getPool(jobs):
+    # one pool per run, shut down when the interpreter exits; workers must share the parent's resource tracker,
+    # otherwise blocks they create are reported as leaked
+    if jobs not in pools:
+        resource_tracker.ensure_running()
+        pools[jobs] = ProcessPoolExecutor(jobs)
+
+    return pools[jobs]
+
+def toShared(arr):
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    shm.close()
+
+    return shm.name, arr.shape, arr.dtype.str
+
+def fromShared(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf), shm
+
+def releaseShared(blocks):
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+def runToShared(func, args):
+    return toShared(np.ascontiguousarray(func(*args)))
+
+def mapToShared(func, arg_list, jobs):
+    # result arrays are views of the returned blocks; drop every reference to them before releaseShared(blocks)
+    pool = getPool(jobs)
+    futures = [pool.submit(runToShared, func, args) for args in arg_list]
+
+    # wait for every task, so no block can be created after a failure is cleaned up
+    wait(futures)
+    handles = [future.result() for future in futures if future.exception() is None]
+    if len(handles) != len(futures):
+        releaseShared([shared_memory.SharedMemory(name=handle[0]) for handle in handles])
+        raise next(future.exception() for future in futures if future.exception() is not None)
+
+    arrays = []
+    blocks = []
+    for handle in handles:
+        arr, shm = fromShared(*handle)
+        arrays.append(arr)
+        blocks.append(shm)
+
+    return arrays, blocks
@@ -3,10 +3,10 @@
 pe-fit-plot.py
 
 Input parameters:
-    -> System folders: The folder name where files are stored per system
-    -> Indices: Per-system list of indices for each system trajectory
-    -> Temperatures: Assumes that the same temperatures were tested for each system
-    -> Runtimes: Per-system list of runtimes in ps
+    -> --manifest FILE (command line): campaign manifest with the systems, indices, runtimes and temperatures
+        (see campaign.py; defaults to campaign.json)
+    -> --jobs N (command line): number of worker processes used to parse files and render plots
+    -> --redraw (command line): render every plot, including the ones whose data and style have not changed (see figures.py)
 
 Input files:
     -> Potential Energy files are expected to have format "<index>_pe_<runtime>ps_<temperature>.txt"
@@ -17,33 +17,15 @@ Plots generated:
 
 '''
 
-import statsmodels.api as sm
+import argparse
+
 import numpy as np
 import matplotlib.pyplot as plt
 
-system_folders = ["Ni", "NiFe", "NiFeCr"]
-
-temperatures = [700, 800, 900, 1000, 1100]
-
-def getParameterFromFile(filename, n_atom_consituent):
-    with open(filename, "r") as f:
-        next(f) # skip header line
-        parameter = []
-        for line in f:
-            line = line.strip()
-            if line != '':
-                pe = float(line)
-                parameter.append(pe)
-
-    return parameter
-
-def getFitParams(x, y):
-    x = sm.add_constant(x)
-    fit = sm.OLS(y, x).fit()
-    return fit.params
-
-def getFitFromArray(arr):
-    return getFitParams(np.arange(len(arr)), arr)
+from campaign import addCampaignArgs, getCampaign, getSystemPE
+from figures import addFigureArgs, queueFigure, renderFigures, setRedraw, setStyle
+from ols_fit import getRuntimeFits
+from parallel_jobs import addJobsArgs, getJobs
 
 def plotPE(pe_slice, of):
     fig, ax = plt.subplots(figsize=(9,6))
@@ -61,11 +43,11 @@ def plotPE(pe_slice, of):
 
     return
 
-def plotPEEnsemble(system_name, pe, runtimes):
+def plotPEEnsemble(system_name, temperatures, pe, n_time, runtimes):
     for r, rtime in enumerate(runtimes):
         for t, temp in enumerate(temperatures):
             of = f"../Plots/{system_name}/1_pe_{rtime}ps_{temp}.png"
-            plotPE(pe[1, r, t], of)
+            queueFigure(of, plotPE, pe[1, r, t, :n_time[1, r, t]], of)
 
     return
 
@@ -86,52 +68,49 @@ def plotPEFits(pe_fit_avg_per_rtime_slice, of, runtimes):
     fig.savefig(of)
     plt.close()
 
-def plotPEFitEnsemble(system_name, pe_fit_avg_per_rtime, runtimes):
+def plotPEFitEnsemble(system_name, temperatures, pe_fit_avg_per_rtime, runtimes):
     for t, temp in enumerate(temperatures):
         of = f"../Plots/{system_name}/pe_fit_{temp}.png"
-        plotPEFits(pe_fit_avg_per_rtime[:, t], of, runtimes)
+        queueFigure(of, plotPEFits, pe_fit_avg_per_rtime[:, t], of, runtimes)
 
-def main():
+def analyzePE(system_name, temperatures, runtimes, pe, n_time):
+    # pe: (index, runtime, temperature, time), NaN padded past n_time[index, runtime, temperature]
+    pe_fit = getRuntimeFits(pe, n_time)
+    pe_fit_avg_per_rtime = np.mean(pe_fit, axis=0)
+
+    print(f"Plotting {system_name} PE ensemble...")
+
+    plotPEEnsemble(system_name, temperatures, pe, n_time, runtimes)
 
-    plt.rcParams.update({'font.size': 14})
+    print(f"Plotting {system_name} PE fits per runtime...")
 
-    for system_idx, system_name in enumerate(system_folders):
-        if system_name == "Ni":
-            indices = np.arange(1, 6)
-            runtimes = [5000]
-        elif system_name == "NiFe":
-            indices = np.arange(1, 6)
-            runtimes = [100000]
-        elif system_name == "NiFeCr":
-            indices = np.arange(1, 6)
-            runtimes = [250000]
+    plotPEFitEnsemble(system_name, temperatures, pe_fit_avg_per_rtime, runtimes)
 
-        pe                      = np.empty((len(indices), len(runtimes), len(temperatures))                    , dtype=object)
-        pe_fit                  = np.empty((len(indices), len(runtimes), len(temperatures), 2)                 , dtype=float)
-        pe_fit_avg_per_rtime    = np.empty((len(runtimes), len(temperatures), 2)                               , dtype=float)
+    return
 
-        for i, idx in enumerate(indices):
-            for r, rtime in enumerate(runtimes):
-                for t, temp in enumerate(temperatures):
+def main():
 
-                    f = f"../{system_name}/{idx}_pe_{rtime}ps_{temp}.txt"
-                    pe[i, r, t] = getParameterFromFile(f, None)
+    parser = argparse.ArgumentParser()
+    addCampaignArgs(parser)
+    addJobsArgs(parser)
+    addFigureArgs(parser)
+    args = parser.parse_args()
 
-                    pe_fit[i, r, t] = getFitFromArray(pe[i, r, t])
+    jobs = getJobs(args)
+    setRedraw(args.redraw)
+    campaign = getCampaign(args)
 
-        for r, rtime in enumerate(runtimes):
-            for t, temp in enumerate(temperatures):
-                pe_fit_avg_per_rtime[r, t] = np.mean(pe_fit[:, r, t, :], axis=0)
+    setStyle({'font.size': 14})
 
-        print(f"Plotting {system_name} PE ensemble...")
+    for system in campaign["systems"]:
 
-        plotPEEnsemble(system_name, pe, runtimes)
+        pe, n_time = getSystemPE(campaign, system, jobs)
 
-        print(f"Plotting {system_name} PE fits per runtime...")
+        analyzePE(system["name"], campaign["temperatures"], system["runtimes"], pe, n_time)
 
-        plotPEFitEnsemble(system_name, pe_fit_avg_per_rtime, runtimes)
+    renderFigures(jobs)
 
     return
 
-main()
-
+if __name__ == "__main__":
+    main()
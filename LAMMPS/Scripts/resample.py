@@ -0,0 +1,91 @@
+'''
+
+resample.py
+
+Bootstrap and jackknife uncertainties of the Arrhenius parameters over trajectories
+
+Input parameters:
+    -> x: 1/kT for each temperature
+    -> lnd: ln(D) per trajectory and temperature, shape (trajectory, temperature)
+    -> --resample bootstrap|jackknife (command line): resampling scheme, bootstrap by default
+    -> --n-resample N (command line): number of bootstrap resamples
+
+Output:
+    -> The estimate, standard error and confidence interval of Ea and ln(D0), shared by Method 1 and Method 2
+
+Notes:
+    -> Method 1: per-trajectory Arrhenius fits are averaged; ln(D0) is averaged in log space, matching its SE
+    -> Method 2: ln(D) is averaged over trajectories per temperature, then a single Arrhenius fit is done
+    -> Every resample is a row of trajectory weights, so all resamples are one matrix product and one batched
+        fit, with no Python loop per resample
+    -> Bootstrap intervals are percentile intervals; jackknife intervals are estimate +/- z * SE
+    -> OLS is linear in ln(D), so for the same weights both methods give the same Ea and ln(D0), and one set of
+        resamples covers both; they only differ from the script's Method 1 D0, which averages exp(ln(D0)) instead
+        of ln(D0)
+    -> The jackknife needs at least 2 trajectories
+
+'''
+
+from statistics import NormalDist
+
+import numpy as np
+
+from ols_fit import getLinearFit
+
+def addResampleArgs(parser):
+    parser.add_argument("--resample", choices=["bootstrap", "jackknife"], default="bootstrap", help="resampling scheme for the Arrhenius uncertainties")
+    parser.add_argument("--n-resample", type=int, default=5000, help="number of bootstrap resamples")
+
+def getBootstrapWeights(n, n_resample, rng):
+    counts = rng.multinomial(n, np.full(n, 1 / n), size=n_resample)
+    return counts / n
+
+def getJackknifeWeights(n):
+    if n < 2:
+        raise ValueError(f"The jackknife needs at least 2 trajectories, got {n}")
+
+    weights = np.full((n, n), 1 / (n - 1))
+    np.fill_diagonal(weights, 0)
+    return weights
+
+def getArrheniusEstimates(x, lnd, weights):
+    # weights: (resample, trajectory), each row sums to 1; the weighted mean of the per-trajectory fits (Method 1)
+    # is the fit of the weighted mean ln(D) (Method 2)
+    per_trajectory, _ = getLinearFit(x, lnd)
+    fit = weights @ per_trajectory
+
+    return {
+        "Ea": -fit[..., 1],
+        "ln(D0)": fit[..., 0],
+    }
+
+def getArrheniusUncertainty(x, lnd, method="bootstrap", n_resample=5000, level=0.95, seed=None):
+    lnd = np.asarray(lnd, dtype=float)
+    n = lnd.shape[0]
+
+    full = getArrheniusEstimates(x, lnd, np.full((1, n), 1 / n))
+
+    if method == "bootstrap":
+        samples = getArrheniusEstimates(x, lnd, getBootstrapWeights(n, n_resample, np.random.default_rng(seed)))
+    elif method == "jackknife":
+        samples = getArrheniusEstimates(x, lnd, getJackknifeWeights(n))
+    else:
+        raise ValueError(f"Unknown resampling method '{method}'")
+
+    alpha = 1 - level
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+
+    uncertainty = {}
+    for name, values in samples.items():
+        estimate = full[name][0]
+
+        if method == "bootstrap":
+            se = np.std(values, ddof=1)
+            lo, hi = np.quantile(values, [alpha / 2, 1 - alpha / 2])
+        else:
+            se = np.sqrt((n - 1) / n * np.sum((values - np.mean(values))**2))
+            lo, hi = estimate - z * se, estimate + z * se
+
+        uncertainty[name] = (estimate, se, lo, hi)
+
+    return uncertainty
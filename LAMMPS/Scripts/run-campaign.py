@@ -0,0 +1,66 @@
+'''
+
+run-campaign.py
+
+Input parameters:
+    -> --manifest FILE (command line): campaign manifest (see campaign.py), with the optional "input" and "sizes" of
+        every system (see lammps_runner.py)
+    -> --systems NAME... (command line): only run these systems
+    -> --lmp PATH (command line): LAMMPS executable, relative to the working folder (default ./lmp_mpi); any stand-in
+        executable taking the same arguments can be used to test a campaign locally, such as fake-lmp.py
+    -> --ranks N (command line): MPI ranks per job; a 2,049 atom box runs well on a handful of ranks
+    -> --total-ranks N (command line): ranks of the allocation (defaults to $SLURM_NTASKS, or the number of cores)
+    -> --launcher CMD (command line): MPI launcher with {ranks} in it (default "mpirun -np {ranks}", "" for none)
+    -> --workdir DIR (command line): folder the decks are run from (default "..", the parent folder)
+    -> --journal FILE (command line): completion journal, relative to the working folder (default campaign-runs.jsonl)
+    -> --max-retries N (command line): number of times a failed job is run again
+
+Output:
+    -> The deck outputs, per-job logs in "<workdir>/logs" and the journal (see lammps_runner.py)
+
+Notes:
+    -> Replaces the serial loops of mpi_system_md.sh, e.g. with "#SBATCH --ntasks=64" in the job script:
+        python run-campaign.py --ranks 4 --launcher "srun --exact -n {ranks}"
+    -> Submitting the same job again after a wall-time kill resumes the campaign from the journal
+    -> To test a campaign without LAMMPS, render the decks and run them with the stand-in fake-lmp.py, from Scripts:
+        python make-decks.py
+        python run-campaign.py --lmp "python Scripts/fake-lmp.py --delay 2" --launcher "" --total-ranks 4
+        add --fail-once (every job fails once, then passes on the retry) or --exit-code N to the stand-in to test the
+        retries, and stop the run with Ctrl-C while jobs are running, then run it again, to test the resume
+
+'''
+
+import argparse
+import os
+
+from campaign import addCampaignArgs, getCampaign
+from lammps_runner import getJobs, runCampaign
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    addCampaignArgs(parser)
+    parser.add_argument("--systems", nargs="+", default=None, help="systems to run")
+    parser.add_argument("--lmp", default="./lmp_mpi", help="LAMMPS executable")
+    parser.add_argument("--ranks", type=int, default=1, help="MPI ranks per job")
+    parser.add_argument("--total-ranks", type=int, default=int(os.environ.get("SLURM_NTASKS", os.cpu_count())), help="ranks of the allocation")
+    parser.add_argument("--launcher", default="mpirun -np {ranks}", help="MPI launcher, {ranks} is replaced")
+    parser.add_argument("--workdir", default="..", help="folder the decks are run from")
+    parser.add_argument("--journal", default="campaign-runs.jsonl", help="completion journal")
+    parser.add_argument("--max-retries", type=int, default=1, help="retries of a failed job")
+    args = parser.parse_args()
+
+    campaign = getCampaign(args)
+    if args.systems is not None:
+        campaign["systems"] = [system for system in campaign["systems"] if system["name"] in args.systems]
+
+    jobs = getJobs(campaign)
+    n_done, n_left = runCampaign(jobs, os.path.join(args.workdir, args.journal), args.lmp, args.ranks, args.total_ranks,
+        args.launcher, args.workdir, max_retries=args.max_retries)
+
+    print(f"{n_done} jobs finished, {n_left} left")
+
+    return
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,10 @@
 sd-contribution-plot.py
 
 Input parameters:
-    -> System folders: The folder name where files are stored per system
-    -> Indices: Per-system list of indices for each system trajectory
-    -> Temperatures: Assumes that the same temperatures were tested for each system
-    -> Runtimes: Per-system list of runtimes in ps
-    -> Elements: The individual elements included in each system; do not have to reflect system folder names
-    -> n_atoms: Number of atoms for each constituent element in a system; stored as a dictionary
-    -> dim: The number of dimensions of the system
+    -> --manifest FILE (command line): campaign manifest with the systems, indices, runtimes, elements, n_atom,
+        temperatures and dim (see campaign.py; defaults to campaign.json)
+    -> --jobs N (command line): number of worker processes used to parse files and render plots
+    -> --redraw (command line): render every plot, including the ones whose data and style have not changed (see figures.py)
 
 Input files:
     -> Mean Squared Displacement files are expected to have format "<index>_msd_<element>_<runtime>ps_<temperature>.txt"
@@ -24,28 +21,14 @@ Notes:
 
 '''
 
+import argparse
+
 import numpy as np
 import matplotlib.pyplot as plt
 
-system_folders = ["Ni", "NiFe", "NiFeCr"]
-
-temperatures = [700, 800, 900, 1000, 1100]
-
-dim = 3
-
-def getParameterFromFile(filename, n_atom_consituent):
-    with open(filename, "r") as f:
-        next(f) # skip header line
-        next(f) # skip tiny first value
-        initial_jump = float(f.readline())  # normalize each reading
-        parameter = []
-        for line in f:
-            line = line.strip()
-            if line != '':
-                msd = float(line)
-                sd = (msd - initial_jump) / (2 * dim) * n_atom_consituent
-                parameter.append(sd)
-    return parameter
+from campaign import addCampaignArgs, getCampaign, getSystemSD
+from figures import addFigureArgs, queueFigure, renderFigures, setRedraw, setStyle
+from parallel_jobs import addJobsArgs, getJobs
 
 def getPlotStyle(elem):
     if elem == "Ni":
@@ -77,16 +60,17 @@ def plotElementSD(sd_slice, of, elements):
 
     return
 
-def plotSDEnsemble(system_name, sd, runtimes, elements):
+def plotSDEnsemble(system_name, temperatures, sd_index, n_time_index, runtimes, elements):
+    # sd_index: (runtime, temperature, element, time) of the plotted trajectory, n_time_index: (runtime, temperature)
 
     for r, rtime in enumerate(runtimes):
         for t, temp in enumerate(temperatures):
             of = f"../Plots/{system_name}/1_msd_{rtime}ps_{temp}.png"
-            plotElementSD(sd[1, r, t], of, elements)
+            queueFigure(of, plotElementSD, sd_index[r, t, :, :n_time_index[r, t]], of, elements)
 
     return
 
-def plotSDElementContribution(system_name, sd_percent_contributions_avg, elements):
+def plotSDElementContribution(temperatures, sd_percent_contributions_avg, elements, of):
     fig, ax = plt.subplots()
 
     x = temperatures
@@ -104,65 +88,57 @@ def plotSDElementContribution(system_name, sd_percent_contributions_avg, element
     ax.legend()
     ax.grid()
 
-    of = f"../Plots/{system_name}/sd-element-contributions.png"
     fig.savefig(of)
     plt.close()
 
     return
 
+def analyzeSDContribution(system_name, temperatures, runtimes, elements, sd, n_time):
+    # sd: (index, runtime, temperature, element, time), NaN padded past n_time[index, runtime, temperature]
+    sd_final = np.take_along_axis(sd, (n_time - 1)[..., None, None], axis=4)[..., 0]
+    sd_percent_contributions = sd_final / np.sum(sd_final, axis=3, keepdims=True) * 100
+
+    sd_percent_contributions_avg = np.mean(sd_percent_contributions[:, -1], axis=0)
+
+    print(f"Plotting {system_name} SD ensemble...")
+
+    plotSDEnsemble(system_name, temperatures, sd[1], n_time[1], runtimes, elements)
+
+    plotContributions(system_name, temperatures, sd_percent_contributions_avg, elements)
+
+    return
+
+def plotContributions(system_name, temperatures, sd_percent_contributions_avg, elements):
+    print(f"Plotting {system_name} element contributions...")
+
+    of = f"../Plots/{system_name}/sd-element-contributions.png"
+    queueFigure(of, plotSDElementContribution, temperatures, sd_percent_contributions_avg, elements, of)
+
+    return
+
 def main():
 
-    plt.rcParams.update({'font.size': 14})
-
-    for system_idx, system_name in enumerate(system_folders):
-
-        if system_name == "Ni":
-            elements = ["Ni"]
-            n_atom = {'Ni': 2049}
-            indices = np.arange(1, 6)
-            runtimes = [5000]
-        elif system_name == "NiFe":
-            elements = ["Ni", "Fe"]
-            n_atom = {'Ni': 756, 'Fe': 1293}
-            indices = np.arange(1, 6)
-            runtimes = [100000]
-        elif system_name == "NiFeCr":
-            elements = ["Ni", "Fe", "Cr"]
-            n_atom = {'Ni': 1511, 'Fe': 218, 'Cr': 320}
-            indices = np.arange(1, 6)
-            runtimes = [250000]
-
-        sd                              = np.empty((len(indices), len(runtimes), len(temperatures), len(elements))     , dtype=object)
-        sd_total                        = np.empty((len(indices), len(runtimes), len(temperatures))                    , dtype=object)
-        sd_percent_contributions        = np.empty((len(indices), len(runtimes), len(temperatures), len(elements))     , dtype=object)
-        sd_percent_contributions_avg    = np.empty((len(temperatures), len(elements))                                  , dtype=object)
-
-        for i, idx in enumerate(indices):
-            for r, rtime in enumerate(runtimes):
-                for t, temp in enumerate(temperatures):
-                    for e, elem in enumerate(elements):
-                        f = f"../{system_name}/{idx}_msd_{elements[e]}_{rtime}ps_{temp}.txt"
-                        sd[i, r, t, e] = getParameterFromFile(f, n_atom[elem])
-
-                    sd_total[i, r, t] = np.sum(np.stack(sd[i, r, t, :]), axis=0)
-
-                    for e, elem in enumerate(elements):
-                        sd_slice = sd[i, r, t, e]
-                        sd_slice_total = sd_total[i, r, t]
-
-                        sd_percent_contributions[i, r, t, e] = sd_slice[-1] / sd_slice_total[-1] * 100
+    parser = argparse.ArgumentParser()
+    addCampaignArgs(parser)
+    addJobsArgs(parser)
+    addFigureArgs(parser)
+    args = parser.parse_args()
 
-        for t, temp in enumerate(temperatures):
-            sd_percent_contributions_avg[t] = np.mean(sd_percent_contributions[:, -1, t, :], axis=0)
+    jobs = getJobs(args)
+    setRedraw(args.redraw)
+    campaign = getCampaign(args)
+
+    setStyle({'font.size': 14})
 
-        print(f"Plotting {system_name} SD ensemble...")
+    for system in campaign["systems"]:
 
-        plotSDEnsemble(system_name, sd, runtimes, elements)
+        sd, n_time = getSystemSD(campaign, system, jobs)
 
-        print(f"Plotting {system_name} element contributions...")
+        analyzeSDContribution(system["name"], campaign["temperatures"], system["runtimes"], system["elements"], sd, n_time)
 
-        plotSDElementContribution(system_name, sd_percent_contributions_avg, elements)
+    renderFigures(jobs)
 
     return
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+'''
+
+streaming.py
+
+Streaming aggregation of a system, one trajectory index at a time
+
+Input parameters:
+    -> campaign, system: manifest entries (see campaign.py)
+    -> --stream (command line, analysis-pipeline.py): use this path for the Arrhenius and element contribution analyses
+
+Output:
+    -> Running mean and variance of ln(D) per runtime and temperature, of the per-trajectory Arrhenius parameters
+        (ln(D0), D0 and Ea) and of the element contributions to the final SD
+    -> With a d_se method (see block_average.py), the running mean of the squared relative error of every D
+    -> The per-trajectory Arrhenius fits and longest-runtime ln(D) rows (a few floats per index), for the histogram
+        and the resampled uncertainties
+
+Notes:
+    -> Only the SD series of one index are in memory at a time, so memory does not grow with the number of indices
+    -> Accumulators use Welford's update, which stays accurate for long campaigns where a plain sum of squares would
+        cancel; results agree with the all-in-memory numpy path to rounding (about 1e-15 relative), not to the last bit
+    -> Every run is fit over its own length, as in the all-in-memory path, so one pass over the indices is enough
+    -> Fits go through getRuntimeFits row by row, so the per-index D values are bit-identical to the all-in-memory ones
+
+'''
+
+import numpy as np
+
+from block_average import getRuntimeSlopeSE
+from msd_loader import getSDArray
+from ols_fit import getLinearFit, getRuntimeFits
+
+class RunningStats:
+    # Welford mean and variance of equally shaped samples
+
+    def __init__(self):
+        self.n = 0
+        self.mean = None
+        self.m2 = None
+
+    def update(self, x):
+        x = np.asarray(x, dtype=float)
+        if self.n == 0:
+            self.mean = np.zeros_like(x)
+            self.m2 = np.zeros_like(x)
+
+        self.n += 1
+        delta = x - self.mean
+        self.mean = self.mean + delta / self.n
+        self.m2 = self.m2 + delta * (x - self.mean)
+
+    def getVar(self, ddof=1):
+        return self.m2 / (self.n - ddof)
+
+    def getStd(self, ddof=1):
+        return np.sqrt(self.getVar(ddof))
+
+    def getSE(self):
+        return self.getStd(1) / np.sqrt(self.n)
+
+def addStreamArgs(parser):
+    parser.add_argument("--stream", action="store_true", help="aggregate one trajectory index at a time")
+
+def getIndexSD(campaign, system, idx, jobs=1):
+    # -> (runtime, temperature, element, time) for one index, with its n_time (runtime, temperature)
+    sd, n_time = getSDArray(system["folder"], [idx], system["runtimes"], campaign["temperatures"], system["elements"], system["n_atom"], campaign["dim"], jobs)
+    return sd[0], n_time[0]
+
+def streamSystem(campaign, system, arrhenius_dependant, jobs=1, onIndex=None, d_se_method=None):
+    # onIndex(i, sd, n_time) is called with every index's SD before it is dropped (e.g. to queue its plots)
+    names = ("lnd", "ln_d0", "d0", "ea", "contributions") + (("lnd_rel2",) if d_se_method is not None else ())
+    stats = {name: RunningStats() for name in names}
+    arrhenius = []
+    lnd_last = []
+
+    for i, idx in enumerate(system["indices"]):
+        sd, n_time = getIndexSD(campaign, system, idx, jobs)
+
+        sd_total = np.sum(sd, axis=2)
+        d_total = getRuntimeFits(sd_total[None], n_time[None])[0]
+        lnd = np.log(np.where(d_total[..., 1] < 0, 1e-6, d_total[..., 1]))
+
+        fit, _ = getLinearFit(arrhenius_dependant, lnd[-1])
+        fit[1] *= -1   # activation energy is always > 0
+
+        sd_final = np.take_along_axis(sd, (n_time - 1)[..., None, None], axis=3)[..., 0]
+        contributions = sd_final / np.sum(sd_final, axis=2, keepdims=True) * 100
+
+        stats["lnd"].update(lnd)
+        stats["ln_d0"].update(fit[0])
+        stats["d0"].update(np.exp(fit[0]))
+        stats["ea"].update(fit[1])
+        stats["contributions"].update(contributions)
+        if d_se_method is not None:
+            d_se = getRuntimeSlopeSE(sd_total[None], n_time[None], d_se_method)[0]
+            stats["lnd_rel2"].update((d_se / np.maximum(np.abs(d_total[..., 1]), 1e-6))**2)
+        arrhenius.append(fit)
+        lnd_last.append(lnd[-1])
+
+        if onIndex is not None:
+            onIndex(i, sd, n_time)
+
+        del sd, sd_total
+
+    return stats, np.array(arrhenius), np.array(lnd_last)
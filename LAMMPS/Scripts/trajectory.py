@@ -0,0 +1,254 @@
+'''
+
+trajectory.py
+
+Frame readers for the trajectory files written by LAMMPS and ASE
+
+Input files:
+    -> LAMMPS text dumps ("ITEM: TIMESTEP" blocks), with any of the columns id, type, element, x y z, xu yu zu, xs ys zs, ix iy iz
+    -> xyz and extended xyz files (e.g. out.xyz, interm.xyz); the first column is the species (element or type),
+        followed by the positions; an extended xyz Lattice="..." entry is read as the cell
+    -> Both kinds of frames may be mixed in one file (e.g. dump.alloy)
+
+Output:
+    -> One dict per frame: timestep, species (n_atom,) str, positions (n_atom, 3) float, cell (3, 3) float or None,
+        origin (3,) float, image (n_atom, 3) int or None, unwrapped (True if positions are already unwrapped)
+
+    -> Random access: getFrameIndex() gives the byte offset of every frame, readFrames() reads one frame, a slice or
+        a list of frames by seeking straight to them, toAtoms() converts a frame to an ASE Atoms object
+
+Notes:
+    -> Dump frames are sorted by atom id when an id column is present, so atoms keep their row between frames
+    -> The atom block of a frame is parsed in one pass over its lines, not one float() call per value
+    -> The frame index is built in one scan that only reads the count line of each frame and jumps over its atom
+        lines by searching for line ends in binary chunks; it is cached as "<trajectory>.frames.npy" and rebuilt when
+        the size or modification time of the trajectory changes
+    -> A last frame that is still being written is left out of the index
+
+'''
+
+import os
+import re
+
+import numpy as np
+
+lattice_pattern = re.compile(r'Lattice="([^"]*)"')
+timestep_pattern = re.compile(r'Timestep:\s*(\d+)')
+
+def readBlock(f, n):
+    lines = [f.readline() for a in range(n)]
+    if n > 0 and lines[-1] == '':
+        raise EOFError("Trajectory ends in the middle of a frame")
+
+    return np.array("".join(lines).split()).reshape(n, -1)
+
+def readXYZFrame(f, first_line):
+    n = int(first_line)
+    comment = f.readline()
+
+    cell = None
+    match = lattice_pattern.search(comment)
+    if match is not None:
+        cell = np.array(match.group(1).split(), dtype=float).reshape(3, 3)
+
+    match = timestep_pattern.search(comment)
+    timestep = int(match.group(1)) if match is not None else None
+
+    block = readBlock(f, n)
+
+    return {
+        'timestep': timestep,
+        'species': block[:, 0],
+        'positions': block[:, 1:4].astype(float),
+        'cell': cell,
+        'origin': np.zeros(3),
+        'image': None,
+        'unwrapped': False,
+    }
+
+def readDumpFrame(f):
+    timestep = int(f.readline())
+
+    f.readline() # ITEM: NUMBER OF ATOMS
+    n = int(f.readline())
+
+    bounds_header = f.readline()    # ITEM: BOX BOUNDS ...
+    bounds = np.array([f.readline().split() for d in range(3)], dtype=float)
+
+    if "xy" in bounds_header:
+        # triclinic: bounds are the bounding box, tilt factors in the third column
+        xy, xz, yz = bounds[:, 2]
+        lo = bounds[:, 0] - np.array([min(0, xy, xz, xy + xz), min(0, yz), 0])
+        hi = bounds[:, 1] - np.array([max(0, xy, xz, xy + xz), max(0, yz), 0])
+        cell = np.array([[hi[0] - lo[0], 0, 0], [xy, hi[1] - lo[1], 0], [xz, yz, hi[2] - lo[2]]])
+    else:
+        lo, hi = bounds[:, 0], bounds[:, 1]
+        cell = np.diag(hi - lo)
+
+    columns = f.readline().split()[2:]  # ITEM: ATOMS <columns>
+    block = readBlock(f, n)
+
+    if "id" in columns:
+        block = block[np.argsort(block[:, columns.index("id")].astype(int), kind='stable')]
+
+    if "element" in columns:
+        species = block[:, columns.index("element")]
+    elif "type" in columns:
+        species = block[:, columns.index("type")]
+    else:
+        species = np.full(n, "1")
+
+    def getColumns(names):
+        return block[:, [columns.index(c) for c in names]].astype(float)
+
+    image = None
+    unwrapped = False
+    if all(c in columns for c in ("xu", "yu", "zu")):
+        positions = getColumns(("xu", "yu", "zu"))
+        unwrapped = True
+    elif all(c in columns for c in ("x", "y", "z")):
+        positions = getColumns(("x", "y", "z"))
+    else:
+        positions = getColumns(("xs", "ys", "zs")) @ cell + lo
+
+    if not unwrapped and all(c in columns for c in ("ix", "iy", "iz")):
+        image = getColumns(("ix", "iy", "iz")).astype(int)
+
+    return {
+        'timestep': timestep,
+        'species': species,
+        'positions': positions,
+        'cell': cell,
+        'origin': lo,
+        'image': image,
+        'unwrapped': unwrapped,
+    }
+
+def readFrame(f):
+    line = f.readline()
+    while line != '' and line.strip() == '':
+        line = f.readline()
+
+    if line == '':
+        return None
+    if line.startswith("ITEM: TIMESTEP"):
+        return readDumpFrame(f)
+
+    return readXYZFrame(f, line)
+
+def iterFrames(filename):
+    with open(filename, "r") as f:
+        while True:
+            frame = readFrame(f)
+            if frame is None:
+                return
+            yield frame
+
+def skipLines(f, n, line_bytes=64):
+    # moves f past the next n line ends, reading about as many bytes as the lines hold
+    while n > 0:
+        start = f.tell()
+        chunk = f.read(n * line_bytes + 4096)
+        if not chunk:
+            raise EOFError("Trajectory ends in the middle of a frame")
+
+        ends = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == ord('\n'))
+        if len(ends) >= n:
+            f.seek(start + int(ends[n - 1]) + 1)
+            return
+
+        n -= len(ends)
+
+def scanFrames(filename):
+    offsets = []
+    with open(filename, "rb") as f:
+        while True:
+            start = f.tell()
+            line = f.readline()
+            if line == b'':
+                break
+            if line.strip() == b'':
+                continue
+
+            try:
+                if line.startswith(b"ITEM: TIMESTEP"):
+                    f.readline()            # timestep
+                    f.readline()            # ITEM: NUMBER OF ATOMS
+                    n = int(f.readline())
+                    skipLines(f, 5 + n)     # box bounds, ITEM: ATOMS and the atom lines
+                else:
+                    skipLines(f, int(line) + 1)
+            except (EOFError, ValueError):
+                break   # incomplete last frame
+
+            offsets.append(start)
+
+    return np.array(offsets, dtype=np.int64)
+
+def getIndexPath(filename):
+    return filename + ".frames.npy"
+
+def getFrameIndex(filename, cache=True):
+    # byte offset of the first line of every frame
+    stat = os.stat(filename)
+    stamp = np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+    index_file = getIndexPath(filename)
+
+    if cache:
+        try:
+            stored = np.load(index_file)
+            if np.array_equal(stored[:2], stamp):
+                return stored[2:]
+        except (OSError, ValueError):
+            pass
+
+    offsets = scanFrames(filename)
+
+    if cache:
+        try:
+            with open(index_file + ".tmp", "wb") as f:
+                np.save(f, np.concatenate((stamp, offsets)))
+            os.replace(index_file + ".tmp", index_file)
+        except OSError:
+            pass    # read-only folder, the index is rebuilt next time
+
+    return offsets
+
+def readFrames(filename, key=-1, index=None):
+    # key: frame number (negative from the end), slice or list of frame numbers; a single frame for an int key
+    if index is None:
+        index = getFrameIndex(filename)
+
+    if isinstance(key, (int, np.integer)):
+        frames = [np.arange(len(index))[key]]
+    elif isinstance(key, slice):
+        frames = np.arange(len(index))[key]
+    else:
+        frames = np.arange(len(index))[np.asarray(key)]
+
+    result = []
+    with open(filename, "r") as f:
+        for i in frames:
+            f.seek(index[i])
+            result.append(readFrame(f))
+
+    return result[0] if isinstance(key, (int, np.integer)) else result
+
+def toAtoms(frame, type_map=None, pbc=True):
+    # type_map: element of each dump atom type, e.g. {"1": "Ni", "2": "Fe"}, when the dump has no element column
+    from ase import Atoms
+
+    species = frame['species']
+    if type_map is not None:
+        species = [type_map.get(s, s) for s in species]
+
+    positions = frame['positions']
+    if frame['image'] is not None:
+        positions = positions + frame['image'] @ frame['cell']
+
+    atoms = Atoms(symbols=list(species), positions=positions)
+    if frame['cell'] is not None:
+        atoms.set_cell(frame['cell'])
+        atoms.set_pbc(pbc)
+
+    return atoms
@@ -0,0 +1,173 @@
+'''
+
+Benchmark of the sdv2.py post-processing on synthetic pykmc runs (see synthetic_pykmc.py)
+
+Input Parameters:
+
+    -> --n-atom N..., --n-step N... (command line): run sizes; every combination is one benchmark configuration
+    -> --k-tot X, --n-hop N, --restarts N (command line): hop rate (ps^-1), atoms moved per event and restarts
+    -> --work-dir DIR (command line): where the synthetic runs are written (a temporary folder per configuration)
+    -> --out FILE (command line): results file, one JSON record appended per configuration
+
+Output:
+
+    -> Per configuration and stage: time, steps/s, MB/s of the file read and peak RSS, to stdout and to the results file
+    -> D from the fit against the D the run was generated with
+
+Notes:
+
+    -> Stages: displacements (getNAtom, getNStep and getSD of kmc_displacements.py), times (sdv2.py getTimes with no
+        step table cache, so pykmc.out is parsed), times_cached (the same call reading the cache it wrote), fit
+        (getSDFit and getDiffusion of sdv2.py)
+    -> Each stage runs in a fresh process forked from a server started before any run is generated, so its peak RSS
+        (ru_maxrss) is its own and not the largest of the ones before it; the interpreter and imports alone are
+        reported as the baseline
+    -> Each record keeps the git commit, Python and numpy versions
+
+August 2025
+Jake Boudreau
+
+'''
+
+import argparse
+import contextlib
+import datetime
+import importlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+scripts_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../Scripts")
+sys.path.append(scripts_dir)
+
+from kmc_displacements import getNAtom, getNStep, getSD
+from kmc_output import getCachePath
+from synthetic_pykmc import writeRun
+
+sdv2 = importlib.import_module("sdv2")
+
+def getGitCommit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=scripts_dir, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def runBaseline():
+    return None
+
+def runDisplacements(in_file):
+    n_atom = getNAtom(in_file)
+    n_step = getNStep(in_file, n_atom)
+    return getSD(in_file, n_atom, n_step)
+
+def runTimes(in_file, n_step):
+    return np.array(sdv2.getTimes(in_file, n_step))
+
+def runFit(times, sd):
+    m, b = sdv2.getSDFit(times, sd)
+    return sdv2.getDiffusion(m)
+
+def runStage(func, args):
+    # child side: time the stage and report this process's peak RSS in MB
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - start
+
+    return result, seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def timeStage(func, *args):
+    with multiprocessing.get_context("forkserver").Pool(1) as pool:
+        return pool.apply(runStage, (func, args))
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-atom", type=int, nargs="+", default=[4001], help="atoms per run")
+    parser.add_argument("--n-step", type=int, nargs="+", default=[500, 5000], help="steps per run")
+    parser.add_argument("--k-tot", type=float, default=1.5e-2, help="total rate [ps^-1]")
+    parser.add_argument("--n-hop", type=int, default=2, help="atoms moved by every event")
+    parser.add_argument("--restarts", type=int, default=1, help="restarts in pykmc.out")
+    parser.add_argument("--work-dir", default=None, help="folder for the synthetic runs")
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark-results.jsonl"), help="results file")
+    args = parser.parse_args()
+
+    out = os.path.abspath(args.out)
+
+    # also starts the fork server while this process is still small
+    _, _, baseline_rss = timeStage(runBaseline)
+
+    for n_atom, n_step in itertools.product(args.n_atom, args.n_step):
+        config = {"n_atom": n_atom, "n_step": n_step, "k_tot": args.k_tot, "n_hop": args.n_hop, "restarts": args.restarts}
+
+        with tempfile.TemporaryDirectory(dir=args.work_dir) as folder:
+            start = time.perf_counter()
+            truth = writeRun(folder, n_atom, n_step, args.k_tot, args.n_hop, n_restart=args.restarts)
+            generate = time.perf_counter() - start
+
+            displacements_file = os.path.join(folder, "displacements.txt")
+            out_file = os.path.join(folder, "pykmc.out")
+            sizes = {"displacements": os.path.getsize(displacements_file), "pykmc.out": os.path.getsize(out_file)}
+
+            stages = {"baseline": {"seconds": 0.0, "peak_rss_mb": baseline_rss}}
+
+            sd, seconds, rss = timeStage(runDisplacements, displacements_file)
+            stages["displacements"] = {"seconds": seconds, "peak_rss_mb": rss, "bytes": sizes["displacements"]}
+
+            times, seconds, rss = timeStage(runTimes, out_file, len(sd))
+            stages["times"] = {"seconds": seconds, "peak_rss_mb": rss, "bytes": sizes["pykmc.out"]}
+            if not os.path.exists(getCachePath(out_file)):
+                raise RuntimeError(f"{out_file} was not cached by the times stage")
+
+            times, seconds, rss = timeStage(runTimes, out_file, len(sd))
+            stages["times_cached"] = {"seconds": seconds, "peak_rss_mb": rss, "bytes": os.path.getsize(getCachePath(out_file))}
+
+            d, seconds, rss = timeStage(runFit, times, sd)
+            stages["fit"] = {"seconds": seconds, "peak_rss_mb": rss}
+
+        for stage in stages.values():
+            stage["steps_per_s"] = n_step / stage["seconds"] if stage["seconds"] > 0 else None
+            if "bytes" in stage:
+                stage["mb_per_s"] = stage["bytes"] / 1e6 / stage["seconds"]
+        stages["baseline"]["steps_per_s"] = None
+
+        record = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git": getGitCommit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "config": config,
+            "generate_seconds": generate,
+            "bytes": sizes,
+            "stages": stages,
+            "d_true": truth['d'],
+            "d_fit": d,
+            "d_error": d / truth['d'] - 1,
+        }
+
+        with open(out, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+
+        print(f"n_atom={n_atom} n_step={n_step}: displacements {sizes['displacements'] / 1e6:.1f} MB, pykmc.out {sizes['pykmc.out'] / 1e6:.1f} MB (generated in {generate:.1f} s)")
+        for name, stage in stages.items():
+            rate = f"{stage['steps_per_s']:12.4g} steps/s" if stage["steps_per_s"] else f"{'':20}"
+            mb = f"{stage['mb_per_s']:9.1f} MB/s" if "mb_per_s" in stage else f"{'':14}"
+            print(f"    {name:<13} {stage['seconds']:9.4f} s {rate} {mb}   peak RSS {stage['peak_rss_mb']:8.1f} MB")
+        print(f"    D = {d:.6g} Å^2/ps, generated with {truth['d']:.6g} ({record['d_error'] * 100:+.2f}%)")
+
+    print(f"Results appended to {out}")
+
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+'''
+
+Synthetic pykmc output with a known diffusion coefficient, in the formats read by sdv2.py
+
+Output Files:
+
+    -> displacements.txt: 3 header lines (the second one the atom count), then one "dx dy dz" line per atom for every
+        step, as read by kmc_displacements.py
+    -> pykmc.out: one section per start or restart (comment block, column header, dashed line, steps from 0 with the
+        time reset to 0), as read by kmc_output.py
+
+Notes:
+
+    -> Every step is one event drawn at the rate k_tot (ps^-1): the residence time is exponential with mean 1 / k_tot,
+        and n_hop atoms each move one nearest neighbour jump of the fcc lattice (a / sqrt(2)) in a random <110>
+        direction; all the other atoms get a small normal relaxation displacement
+    -> The expected SD per step is n_hop * (a / sqrt(2))^2 + 3 * n_atom * relax^2, so the truth returned is
+        D = k_tot * (SD per step) / (2 * 3), in the units of sdv2.py (Å^2/ps, SD summed over the atoms)
+    -> Restarts split the steps evenly; the displacements file runs on across them with one block per stitched step
+        (the step 0 row of a restart is the state it restarted from and has no block of its own). An aborted restart
+        adds a section with only its step 0 row, as seen in Testing-cube_1_SIA_Ni_V3
+    -> Steps are written in blocks, so the generator's memory does not grow with n_step
+
+August 2025
+Jake Boudreau
+
+'''
+
+import os
+
+import numpy as np
+
+comment_block = """# Simulation Progress Tracking File
+
+# Column Details:
+	# Step          : Simulation step number.
+	# dT(s)         : Time elapsed for this specific step.
+	# T(s)          : Total time since simulation start.
+	# Ref event     : Index in the reference talbe of the selected event.
+	# Ea(eV)        : Event activation energy barrier.
+	# k_evt(ps-1)   : Rate constant of the selected event.
+	# k_tot(ps-1)   : Total rate constant of all possible events at this step
+	# E(eV)         : Energy of the system.
+
+Step       dT(s)          T(s)           Ref event      Ea(eV)         k_evt(ps-1)    k_tot(ps-1)    E(eV)
+--------------------------------------------------------------------------------------------------------------
+"""
+
+def getJumpVectors(a):
+    # the 12 nearest neighbour jumps of the fcc lattice, a / 2 <110>
+    jumps = []
+    for i, j in ((0, 1), (0, 2), (1, 2)):
+        for si in (1, -1):
+            for sj in (1, -1):
+                v = np.zeros(3)
+                v[i] = si * a / 2
+                v[j] = sj * a / 2
+                jumps.append(v)
+
+    return np.array(jumps)
+
+def getTrueDiffusion(k_tot, n_atom, n_hop, a, relax, dim=3):
+    sd_step = n_hop * a**2 / 2 + dim * n_atom * relax**2
+
+    return k_tot * sd_step / (2 * dim)
+
+def formatStep(step, dt, t, ref_event, ea, k_evt, k_tot, e):
+    return f"{step:<11d}{dt:<15.6e}{t:<15.6e}{ref_event:<15d}{ea:<15.6e}{k_evt:<15.6e}{k_tot:<15.6e}{e:<14.6e}\n"
+
+def formatFirstStep(e):
+    return f"{0:<11d}{0.0:<15.6e}{0.0:<15.6e}{'':<60}{e:<14.6e}\n"
+
+def getSectionSteps(n_step, n_restart):
+    # stitched steps 1 .. n_step - 1 split evenly over the sections
+    bounds = np.linspace(1, n_step, n_restart + 2).astype(int)
+    return [bounds[i + 1] - bounds[i] for i in range(n_restart + 1)]
+
+def writeOutput(out_file, n_step, k_tot, n_atom, n_restart, n_aborted, rng, steps_per_block=100000):
+    e = -4.4491 * n_atom
+    sections = getSectionSteps(n_step, n_restart)
+
+    with open(out_file, 'w') as f:
+        for s, n_section in enumerate(sections):
+            f.write(comment_block)
+            f.write(formatFirstStep(e))
+            if s > 0 and s <= n_aborted:
+                # restart killed before its first step
+                f.write(comment_block)
+                f.write(formatFirstStep(e))
+
+            t = 0.0
+            for start in range(0, n_section, steps_per_block):
+                k = min(steps_per_block, n_section - start)
+                rate = k_tot * (1 + rng.normal(0, 1e-3, k))
+                dt = rng.exponential(1 / rate) * 1e-12
+                times = t + np.cumsum(dt)
+                ea = 0.2985 + rng.normal(0, 1e-5, k)
+                ref_event = rng.integers(0, 4, k)
+
+                f.write("".join(formatStep(start + j + 1, dt[j], times[j], ref_event[j], ea[j], rate[j] / 8, rate[j], e) for j in range(k)))
+                t = times[-1]
+
+def writeDisplacements(out_file, n_atom, n_step, n_hop, a, relax, rng, steps_per_block=100):
+    jumps = getJumpVectors(a)
+    line = "%.8f %.8f %.8f\n"
+
+    with open(out_file, 'w') as f:
+        f.write("# pykmc displacements (synthetic)\n")
+        f.write(f"{n_atom}\n")
+        f.write("dx dy dz\n")
+
+        for start in range(0, n_step, steps_per_block):
+            k = min(steps_per_block, n_step - start)
+            dr = rng.normal(0, relax, (k, n_atom, 3))
+            for j in range(k):
+                if start + j == 0:
+                    continue # step 0 has no event
+                movers = rng.choice(n_atom, n_hop, replace=False)
+                dr[j, movers] = jumps[rng.integers(0, len(jumps), n_hop)]
+
+            f.write((line * (k * n_atom)) % tuple(dr.ravel()))
+
+def writeRun(folder, n_atom=4001, n_step=500, k_tot=1.5e-2, n_hop=2, a=3.52, relax=1e-4, n_restart=1, n_aborted=0, seed=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+
+    writeDisplacements(os.path.join(folder, "displacements.txt"), n_atom, n_step, n_hop, a, relax, rng)
+    writeOutput(os.path.join(folder, "pykmc.out"), n_step, k_tot, n_atom, n_restart, n_aborted, rng)
+
+    return {'d': getTrueDiffusion(k_tot, n_atom, n_hop, a, relax)}
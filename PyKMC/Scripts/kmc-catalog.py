@@ -0,0 +1,71 @@
+'''
+
+Convert the event catalog of a pykmc run to the memory-mapped format of kmc_catalog.py, or compare two catalogs
+
+Usage:
+
+    -> python kmc-catalog.py convert <run folder> [--out <catalog folder>]
+    -> python kmc-catalog.py compare <catalog folder> <catalog folder>
+    -> python kmc-catalog.py info <catalog folder> [--ea-min X --ea-max Y]
+
+Input Files:
+
+    -> reference_table.pickle and visited_environments.pickle in the run folder (convert only)
+
+August 2025
+Jake Boudreau
+
+'''
+
+import argparse
+
+import numpy as np
+
+from kmc_catalog import Catalog, convertCatalog, compareCatalogs
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="write a catalog folder from the pickles of a run")
+    convert.add_argument("run_dir")
+    convert.add_argument("--out", default=None, help="catalog folder (default <run folder>/catalog)")
+
+    compare = commands.add_parser("compare", help="compare two catalog folders")
+    compare.add_argument("a")
+    compare.add_argument("b")
+
+    info = commands.add_parser("info", help="summary of a catalog folder")
+    info.add_argument("catalog_dir")
+    info.add_argument("--ea-min", type=float, default=-np.inf, help="lowest barrier listed [eV]")
+    info.add_argument("--ea-max", type=float, default=np.inf, help="highest barrier listed [eV]")
+
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        out_dir = convertCatalog(args.run_dir, args.out)
+        catalog = Catalog(out_dir)
+        print(f"Wrote {catalog.n_event} events and {catalog.n_environment} environments to {out_dir} (digest {catalog.digest})")
+
+    elif args.command == "compare":
+        result = compareCatalogs(Catalog(args.a), Catalog(args.b))
+        if result['identical']:
+            print("Catalogs are identical")
+        else:
+            print(f"Events only in {args.a}: {result['events_only_a']}")
+            print(f"Events only in {args.b}: {result['events_only_b']}")
+            print(f"Environments only in {args.a}: {result['environments_only_a']}")
+            print(f"Environments only in {args.b}: {result['environments_only_b']}")
+
+    elif args.command == "info":
+        catalog = Catalog(args.catalog_dir)
+        print(f"{catalog.n_event} events, {catalog.n_environment} environments, digest {catalog.digest}")
+
+        ea = catalog.getColumn("energy_barrier")
+        for row in catalog.getEventsWithBarrier(args.ea_min, args.ea_max):
+            print(f"Event {row}: Ea = {ea[row]:.6f} eV, k = {catalog.getValue('k', row):.6e} ps^-1, moving atom {catalog.getValue('move_atom_idx', row)}")
+
+    return
+
+main()
@@ -0,0 +1,120 @@
+'''
+
+Statistics of a pykmc run: residence times, reference event frequencies, barrier spectrum and energy drift
+
+Input Files:
+
+    -> pykmc.out (simulation output file); restarted sections are stitched (see kmc_output.py)
+
+Plots:
+
+    -> Residence time histogram with the counts expected from k_tot
+    -> Selection frequency per reference event
+    -> Ea spectrum (kernel density estimate)
+    -> E vs. time
+
+August 2025
+Jake Boudreau
+
+'''
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from kmc_output import readStepTable
+from kmc_stats import getResidenceTimes, getEventFrequencies, getBarrierSpectrum, getEnergyDrift
+
+def plotResidenceTimes(residence, out_file):
+
+    plt.figure()
+
+    edges = residence['edges']
+    centers = 0.5 * (edges[:-1] + edges[1:])
+
+    plt.stairs(residence['counts'], edges, color='b', label="KMC")
+    plt.plot(centers, residence['expected'], 'r', label="Exponential from $k_{tot}$")
+
+    plt.yscale('log')
+    plt.xlabel("Residence time [ps]")
+    plt.ylabel("Steps")
+    plt.legend()
+
+    plt.savefig(out_file)
+    plt.close()
+
+    return
+
+def plotEventFrequencies(frequencies, out_file):
+
+    plt.figure()
+
+    plt.bar(np.arange(len(frequencies)), frequencies, color='b')
+
+    plt.xlabel("Reference event")
+    plt.ylabel("Selection frequency")
+
+    plt.savefig(out_file)
+    plt.close()
+
+    return
+
+def plotBarrierSpectrum(grid, density, out_file):
+
+    plt.figure()
+
+    plt.plot(grid, density, 'b')
+
+    plt.xlabel("Ea [eV]")
+    plt.ylabel("Density $[eV^{-1}]$")
+
+    plt.savefig(out_file)
+    plt.close()
+
+    return
+
+def plotEnergy(table, drift, out_file):
+
+    plt.figure()
+
+    x = table['T'] * 1.0e+12    # convert to ps
+    y = table['E']
+
+    plt.plot(x, y, 'b')
+    plt.plot(x, y[0] + drift['per_ps'] * x, 'r', label=f"drift = {drift['per_ps']:.3e} $[eV/ps]$")
+
+    plt.xlabel("time [ps]")
+    plt.ylabel("E [eV]")
+    plt.legend()
+
+    plt.savefig(out_file)
+    plt.close()
+
+    return
+
+def main():
+
+    in_file = "pykmc.out"
+    table = readStepTable(in_file)
+
+    print(f"{len(table)} steps over {table['T'][-1] * 1.0e+12:.4e} ps")
+
+    residence = getResidenceTimes(table)
+    print(f"Mean of dT * k_tot was {residence['mean_scaled']:.4f} (1 expected), KS distance {residence['ks']:.4f}")
+    plotResidenceTimes(residence, "residence-times.png")
+
+    frequencies = getEventFrequencies(table)
+    for event in np.flatnonzero(frequencies):
+        print(f"Reference event {event} selected in {frequencies[event] * 100:.2f}% of steps")
+    plotEventFrequencies(frequencies, "event-frequencies.png")
+
+    grid, density, bandwidth = getBarrierSpectrum(table)
+    print(f"Ea spectrum peaks at {grid[np.argmax(density)]:.4f} eV (bandwidth {bandwidth:.2e} eV)")
+    plotBarrierSpectrum(grid, density, "ea-spectrum.png")
+
+    drift = getEnergyDrift(table)
+    print(f"Energy drift was {drift['per_ps']:.4e} eV/ps ({drift['per_step']:.4e} eV/step), total {drift['total']:.4e} eV, largest {drift['max_abs']:.4e} eV")
+    plotEnergy(table, drift, "energy.png")
+
+    return
+
+main()
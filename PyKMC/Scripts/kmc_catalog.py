@@ -0,0 +1,281 @@
+'''
+
+Columnar, memory-mapped store for the event catalog of a pykmc run
+
+Input Files:
+
+    -> reference_table.pickle: pandas DataFrame with one row per reference event (event_id, initial_positions,
+        saddle_positions, final_positions, energy_barrier, k, id_saddle, id_final, move_atom_idx, sym_matrix, sym_perm)
+    -> visited_environments.pickle: set of environment keys (bytes, or str such as 'crystal')
+
+Output:
+
+    -> A catalog folder with one .npy file per column, a hash index on the environment keys and a meta.json file:
+        -> scalar columns (energy_barrier, k, move_atom_idx): one value per event
+        -> array columns (initial_positions, saddle_positions, final_positions, sym_matrix, sym_perm): values of all
+            events flattened into one array, with <column>.offsets.npy (start of each event) and <column>.shapes.npy
+            (shape of each event's array)
+        -> bytes columns (event_id, id_saddle, id_final): concatenated uint8 data with <column>.offsets.npy
+        -> env_*.npy: the visited environment keys and their kind (bytes or str)
+        -> event_index_*.npy, env_index_*.npy: open addressing hash tables (64 bit key hash, row) on event_id and on
+            the visited environment keys
+        -> event_digest.npy: sha1 of every event, so two catalogs can be compared event by event
+
+Notes:
+
+    -> Opening a catalog maps the files without reading them, so it takes the same time for any catalog size;
+        a lookup reads a few hash slots and the rows it returns, nothing else
+    -> Only the converter needs pandas (to unpickle the reference table)
+    -> The catalog digest in meta.json does not depend on the order of events or environments
+
+August 2025
+Jake Boudreau
+
+'''
+
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+
+format_version = 1
+empty_slot = np.uint64(0)
+
+def getKeyBytes(key):
+    # str keys are tagged so that 'crystal' and b'crystal' stay different
+    if isinstance(key, str):
+        return 1, key.encode()
+
+    return 0, bytes(key)
+
+def getKeyHash(kind, data):
+    h = int.from_bytes(hashlib.blake2b(bytes([kind]) + data, digest_size=8).digest(), 'little')
+    return np.uint64(h | 1)  # 0 marks an empty slot
+
+def buildHashIndex(hashes):
+    # linear probing, at most half full; equal hashes end up in one run of slots
+    n_slot = 1 << max(int(np.ceil(np.log2(2 * len(hashes) + 1))), 3)
+    index_hash = np.zeros((n_slot), dtype=np.uint64)
+    index_row = np.full((n_slot), -1, dtype=np.int64)
+
+    mask = n_slot - 1
+    for row, h in enumerate(hashes):
+        slot = int(h) & mask
+        while index_hash[slot] != empty_slot:
+            slot = (slot + 1) & mask
+        index_hash[slot] = h
+        index_row[slot] = row
+
+    return index_hash, index_row
+
+def probeHashIndex(index_hash, index_row, h):
+    mask = len(index_hash) - 1
+    slot = int(h) & mask
+    rows = []
+    while index_hash[slot] != empty_slot:
+        if index_hash[slot] == h:
+            rows.append(int(index_row[slot]))
+        slot = (slot + 1) & mask
+
+    return rows
+
+def getColumnKind(value):
+    if isinstance(value, (bytes, bytearray, str)):
+        return 'bytes'
+    if isinstance(value, np.ndarray) and value.ndim > 0:
+        return 'array'
+
+    return 'scalar'
+
+def getEventDigests(table, columns):
+    digests = np.empty((len(table), 20), dtype=np.uint8)
+    for row in range(len(table)):
+        h = hashlib.sha1()
+        for c in columns:
+            value = table[c].iloc[row]
+            kind, data = getKeyBytes(value) if getColumnKind(value) == 'bytes' else (2, np.ascontiguousarray(value).tobytes())
+            h.update(c.encode() + bytes([kind]) + data)
+        digests[row] = np.frombuffer(h.digest(), dtype=np.uint8)
+
+    return digests
+
+def writeBytesColumn(out_dir, name, values):
+    data = [getKeyBytes(v)[1] for v in values]
+    offsets = np.zeros((len(data) + 1), dtype=np.int64)
+    offsets[1:] = np.cumsum([len(d) for d in data])
+
+    np.save(os.path.join(out_dir, f"{name}.npy"), np.frombuffer(b"".join(data), dtype=np.uint8))
+    np.save(os.path.join(out_dir, f"{name}.offsets.npy"), offsets)
+
+def writeArrayColumn(out_dir, name, values):
+    arrays = [np.asarray(v) for v in values]
+    offsets = np.zeros((len(arrays) + 1), dtype=np.int64)
+    offsets[1:] = np.cumsum([a.size for a in arrays])
+    shapes = np.array([a.shape for a in arrays], dtype=np.int64)
+
+    data = np.concatenate([a.ravel() for a in arrays]) if arrays else np.empty(0)
+    np.save(os.path.join(out_dir, f"{name}.npy"), data)
+    np.save(os.path.join(out_dir, f"{name}.offsets.npy"), offsets)
+    np.save(os.path.join(out_dir, f"{name}.shapes.npy"), shapes)
+
+def convertCatalog(run_dir, out_dir=None):
+    import pandas # only needed to unpickle the reference table
+
+    if out_dir is None:
+        out_dir = os.path.join(run_dir, "catalog")
+    os.makedirs(out_dir, exist_ok=True)
+
+    table = pandas.read_pickle(os.path.join(run_dir, "reference_table.pickle"))
+    with open(os.path.join(run_dir, "visited_environments.pickle"), 'rb') as f:
+        environments = pickle.load(f)
+
+    columns = {}
+    for c in table.columns:
+        kind = getColumnKind(table[c].iloc[0]) if len(table) > 0 else 'scalar'
+        columns[c] = kind
+
+        if kind == 'bytes':
+            writeBytesColumn(out_dir, c, table[c])
+        elif kind == 'array':
+            writeArrayColumn(out_dir, c, table[c])
+        else:
+            np.save(os.path.join(out_dir, f"{c}.npy"), np.array(list(table[c])))
+
+    event_digest = getEventDigests(table, list(table.columns))
+    np.save(os.path.join(out_dir, "event_digest.npy"), event_digest)
+
+    if 'event_id' in columns:
+        event_hashes = [getKeyHash(*getKeyBytes(v)) for v in table['event_id']]
+        index_hash, index_row = buildHashIndex(event_hashes)
+        np.save(os.path.join(out_dir, "event_index_hash.npy"), index_hash)
+        np.save(os.path.join(out_dir, "event_index_row.npy"), index_row)
+
+    env_keys = sorted(environments, key=lambda key: getKeyBytes(key))
+    env_kind = np.array([getKeyBytes(key)[0] for key in env_keys], dtype=np.uint8)
+    writeBytesColumn(out_dir, "env_key", env_keys)
+    np.save(os.path.join(out_dir, "env_kind.npy"), env_kind)
+
+    env_hashes = [getKeyHash(*getKeyBytes(key)) for key in env_keys]
+    index_hash, index_row = buildHashIndex(env_hashes)
+    np.save(os.path.join(out_dir, "env_index_hash.npy"), index_hash)
+    np.save(os.path.join(out_dir, "env_index_row.npy"), index_row)
+
+    digest = hashlib.sha1()
+    for d in sorted(bytes(d) for d in event_digest):
+        digest.update(d)
+    for h in sorted(env_hashes):
+        digest.update(int(h).to_bytes(8, 'little'))
+
+    meta = {
+        'format': format_version,
+        'n_event': len(table),
+        'n_environment': len(env_keys),
+        'columns': columns,
+        'digest': digest.hexdigest(),
+    }
+    with open(os.path.join(out_dir, "meta.json"), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    return out_dir
+
+class Catalog:
+
+    def __init__(self, catalog_dir):
+        self.dir = catalog_dir
+        with open(os.path.join(catalog_dir, "meta.json"), 'r') as f:
+            self.meta = json.load(f)
+
+        if self.meta['format'] != format_version:
+            raise ValueError(f"{catalog_dir}: catalog format {self.meta['format']}, expected {format_version}")
+
+        self.n_event = self.meta['n_event']
+        self.n_environment = self.meta['n_environment']
+        self.columns = self.meta['columns']
+        self.digest = self.meta['digest']
+        self.arrays = {}
+
+    def load(self, name):
+        # files are mapped on first use only
+        if name not in self.arrays:
+            self.arrays[name] = np.load(os.path.join(self.dir, f"{name}.npy"), mmap_mode='r')
+
+        return self.arrays[name]
+
+    def getBytes(self, name, row):
+        offsets = self.load(f"{name}.offsets")
+        return self.load(name)[offsets[row]:offsets[row + 1]].tobytes()
+
+    def getArray(self, name, row):
+        offsets = self.load(f"{name}.offsets")
+        shape = tuple(self.load(f"{name}.shapes")[row])
+        return np.array(self.load(name)[offsets[row]:offsets[row + 1]]).reshape(shape)
+
+    def getValue(self, name, row):
+        kind = self.columns[name]
+        if kind == 'bytes':
+            return self.getBytes(name, row)
+        if kind == 'array':
+            return self.getArray(name, row)
+
+        return self.load(name)[row]
+
+    def getEvent(self, row):
+        return {name: self.getValue(name, row) for name in self.columns}
+
+    def getColumn(self, name):
+        # whole scalar column, e.g. energy_barrier for barrier queries
+        if self.columns[name] != 'scalar':
+            raise ValueError(f"{name} is a {self.columns[name]} column")
+
+        return self.load(name)
+
+    def findEvents(self, event_id):
+        kind, data = getKeyBytes(event_id)
+        rows = probeHashIndex(self.load("event_index_hash"), self.load("event_index_row"), getKeyHash(kind, data))
+
+        return [row for row in rows if self.getBytes("event_id", row) == data]
+
+    def getEnvironmentKey(self, row):
+        data = self.getBytes("env_key", row)
+        return data.decode() if self.load("env_kind")[row] == 1 else data
+
+    def hasEnvironment(self, key):
+        kind, data = getKeyBytes(key)
+        rows = probeHashIndex(self.load("env_index_hash"), self.load("env_index_row"), getKeyHash(kind, data))
+
+        return any(self.load("env_kind")[row] == kind and self.getBytes("env_key", row) == data for row in rows)
+
+    def getEventsWithBarrier(self, ea_min, ea_max):
+        ea = self.getColumn("energy_barrier")
+        return np.flatnonzero((ea >= ea_min) & (ea <= ea_max))
+
+    def toReferenceTable(self, rows=None):
+        # DataFrame in the layout of reference_table.pickle, e.g. to restart pykmc from the catalog
+        import pandas
+
+        rows = range(self.n_event) if rows is None else rows
+        return pandas.DataFrame({name: [self.getValue(name, row) for row in rows] for name in self.columns})
+
+    def getVisitedEnvironments(self):
+        return {self.getEnvironmentKey(row) for row in range(self.n_environment)}
+
+def compareCatalogs(a, b):
+    # events are matched by digest, environments by key hash; nothing is unpickled
+    if a.digest == b.digest:
+        return {'identical': True, 'events_only_a': [], 'events_only_b': [], 'environments_only_a': 0, 'environments_only_b': 0}
+
+    digests_a = {bytes(d): row for row, d in enumerate(a.load("event_digest"))}
+    digests_b = {bytes(d): row for row, d in enumerate(b.load("event_digest"))}
+
+    env_a = set(a.load("env_index_hash")[a.load("env_index_row") >= 0].tolist())
+    env_b = set(b.load("env_index_hash")[b.load("env_index_row") >= 0].tolist())
+
+    return {
+        'identical': False,
+        'events_only_a': sorted(row for d, row in digests_a.items() if d not in digests_b),
+        'events_only_b': sorted(row for d, row in digests_b.items() if d not in digests_a),
+        'environments_only_a': len(env_a - env_b),
+        'environments_only_b': len(env_b - env_a),
+    }
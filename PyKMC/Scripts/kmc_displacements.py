@@ -0,0 +1,126 @@
+'''
+
+Block reader for the displacements output of a pykmc run
+
+Input Files:
+
+    -> Displacements file (displacements_output in the pykmc config): 3 header lines, then one "dx dy dz" line per
+        atom for every step, with no separator between steps
+
+Notes:
+
+    -> n_atom comes from the header when it holds the atom count, otherwise from the initial configuration (xyz)
+    -> n_step follows from the number of lines in the file, so neither has to be hard-coded
+    -> Whole groups of steps are parsed in one bulk pass into (n_step_block, n_atom, 3) arrays and streamed, so
+        memory depends on the block size and not on the run length
+    -> The cumulative SD is one vectorized cumulative sum over the per-step sums of dx^2 + dy^2 + dz^2
+
+August 2025
+Jake Boudreau
+
+'''
+
+import numpy as np
+
+n_header = 3
+
+def countLines(in_file, chunk_bytes=1 << 24):
+    n_line = 0
+    last = b'\n'
+    with open(in_file, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+            n_line += chunk.count(b'\n')
+            last = chunk[-1:]
+
+    if last != b'\n':
+        n_line += 1 # last line without a newline
+
+    return n_line
+
+def getNAtomFromXYZ(xyz_file):
+    with open(xyz_file, 'r') as f:
+        return int(f.readline())
+
+def getNAtom(in_file, config_file=None):
+    with open(in_file, 'r') as f:
+        header = [f.readline() for i in range(n_header)]
+
+    for line in header:
+        tokens = line.split()
+        if len(tokens) == 1 and tokens[0].isdigit():
+            return int(tokens[0])
+
+    if config_file is None:
+        raise ValueError(f"{in_file} does not give the number of atoms; pass the initial configuration file")
+
+    return getNAtomFromXYZ(config_file)
+
+def getNStep(in_file, n_atom):
+    n_data = countLines(in_file) - n_header
+    n_step = n_data // n_atom
+    if n_data % n_atom != 0:
+        print(f"Warning: {in_file} ends with a partial step, {n_data % n_atom} lines ignored")
+
+    return n_step
+
+def iterDisplacementBlocks(in_file, n_atom, n_step, steps_per_block=100, chunk_bytes=1 << 24):
+    # yields (k, n_atom, 3) arrays of consecutive steps; raw chunks are cut at line ends and parsed in one call
+    n_value = 3 * n_atom
+    carry = np.empty(0)
+    s = 0
+
+    with open(in_file, 'rb') as f:
+        for i in range(n_header):
+            f.readline()
+
+        partial = b''
+        while s < n_step:
+            chunk = f.read(chunk_bytes)
+            data = partial + chunk
+            if chunk:
+                cut = data.rfind(b'\n') + 1
+                partial = data[cut:]
+                data = data[:cut]
+            else:
+                partial = b''
+
+            carry = np.concatenate((carry, np.array(data.split(), dtype=np.float64)))
+
+            while len(carry) >= n_value and s < n_step:
+                k = min(steps_per_block, len(carry) // n_value, n_step - s)
+                yield carry[:k * n_value].reshape(k, n_atom, 3)
+                carry = carry[k * n_value:]
+                s += k
+
+            if not chunk:
+                break
+
+def getDisplacementArray(in_file, n_atom, n_step, out_file=None, steps_per_block=100):
+    # whole (n_step, n_atom, 3) array; with out_file it is written to a memory-mapped .npy file instead of memory
+    if out_file is None:
+        dr = np.empty((n_step, n_atom, 3), dtype=np.float64)
+    else:
+        dr = np.lib.format.open_memmap(out_file, mode='w+', dtype=np.float64, shape=(n_step, n_atom, 3))
+
+    s0 = 0
+    for block in iterDisplacementBlocks(in_file, n_atom, n_step, steps_per_block):
+        dr[s0:s0 + len(block)] = block
+        s0 += len(block)
+
+    return dr
+
+def getSD(in_file, n_atom, n_step, steps_per_block=100):
+    dr2 = np.empty((n_step), dtype=float)
+
+    s0 = 0
+    for block in iterDisplacementBlocks(in_file, n_atom, n_step, steps_per_block):
+        dr2[s0:s0 + len(block)] = np.einsum('sai,sai->s', block, block)
+        s0 += len(block)
+
+    # the SD starts from 0; the displacements of step 0 are not counted
+    dr2[0] = 0
+
+    return np.cumsum(dr2)
@@ -0,0 +1,151 @@
+'''
+
+Streaming parser for the progress file of a pykmc run (pykmc.out)
+
+Input Files:
+
+    -> pykmc.out: one section per start or restart of the run, each with its own comment block, column header,
+        dashed line and step numbering from 0
+
+Output:
+
+    -> Structured array with one row per step and the fields section, step, dT, T, ref_event, Ea, k_evt, k_tot, E;
+        times in s, energies in eV, rates in ps^-1
+    -> Binary cache of the array next to the input ("pykmc.out.steps.npy"), reused while it is newer than the input
+
+Notes:
+
+    -> Restarts are stitched into one timeline: the steps and times of a section are offset by the last step and time
+        of the one before, and the step 0 row of a restart (the state the run restarted from) is dropped
+    -> Step 0 has no event, so ref_event is -1 and Ea, k_evt and k_tot are NaN there
+    -> Rows are parsed in chunks of lines and appended to the cache file, so memory does not grow with the run length
+
+August 2025
+Jake Boudreau
+
+'''
+
+import os
+import shutil
+
+import numpy as np
+
+step_dtype = np.dtype([
+    ('section', np.int32),
+    ('step', np.int64),
+    ('dT', np.float64),
+    ('T', np.float64),
+    ('ref_event', np.int64),
+    ('Ea', np.float64),
+    ('k_evt', np.float64),
+    ('k_tot', np.float64),
+    ('E', np.float64),
+])
+
+def parseRows(lines, section):
+    rows = np.zeros((len(lines)), dtype=step_dtype)
+    rows['section'] = section
+
+    tokens = "".join(lines).split()
+    if len(tokens) == 8 * len(lines):
+        values = np.array(tokens, dtype=np.float64).reshape(-1, 8)
+        rows['ref_event'] = values[:, 3]
+        for i, name in ((4, 'Ea'), (5, 'k_evt'), (6, 'k_tot')):
+            rows[name] = values[:, i]
+    else:
+        # some rows without an event (step 0); only these need the slow path
+        values = np.full((len(lines), 8), np.nan)
+        for j, line in enumerate(lines):
+            line_tokens = line.split()
+            if len(line_tokens) == 8:
+                values[j] = line_tokens
+            else:
+                values[j, [0, 1, 2, 7]] = line_tokens
+        rows['ref_event'] = np.where(np.isnan(values[:, 3]), -1, values[:, 3])
+        for i, name in ((4, 'Ea'), (5, 'k_evt'), (6, 'k_tot')):
+            rows[name] = values[:, i]
+
+    rows['step'] = values[:, 0]
+    rows['dT'] = values[:, 1]
+    rows['T'] = values[:, 2]
+    rows['E'] = values[:, 7]
+
+    return rows
+
+def iterSections(in_file, chunk_lines=100000):
+    # yields (section, rows) chunks in file order; a section starts at every dashed line under a column header
+    section = -1
+    lines = []
+
+    with open(in_file, 'r') as f:
+        for line in f:
+            if line[:1].isdigit():
+                lines.append(line)
+                if len(lines) == chunk_lines:
+                    yield section, parseRows(lines, section)
+                    lines = []
+            elif line.startswith('-'):
+                if lines:
+                    yield section, parseRows(lines, section)
+                    lines = []
+                section += 1
+
+    if lines:
+        yield section, parseRows(lines, section)
+
+def iterStitchedRows(in_file, chunk_lines=100000):
+    step_offset = 0
+    time_offset = 0.0
+    last_step = 0
+    last_time = 0.0
+    current = 0
+
+    for section, rows in iterSections(in_file, chunk_lines):
+        if section != current:
+            step_offset = last_step
+            time_offset = last_time
+            current = section
+
+        if section > 0:
+            rows = rows[rows['step'] != 0]
+        if len(rows) == 0:
+            continue
+
+        rows['step'] += step_offset
+        rows['T'] += time_offset
+        last_step = rows['step'][-1]
+        last_time = rows['T'][-1]
+
+        yield rows
+
+def getCachePath(in_file):
+    return in_file + ".steps.npy"
+
+def writeStepTable(in_file, out_file, chunk_lines=100000):
+    raw_file = out_file + ".raw"
+    n_row = 0
+
+    with open(raw_file, 'wb') as raw:
+        for rows in iterStitchedRows(in_file, chunk_lines):
+            raw.write(rows.tobytes())
+            n_row += len(rows)
+
+    header = {'descr': np.lib.format.dtype_to_descr(step_dtype), 'fortran_order': False, 'shape': (n_row,)}
+    with open(out_file + ".tmp", 'wb') as out, open(raw_file, 'rb') as raw:
+        np.lib.format.write_array_header_1_0(out, header)
+        shutil.copyfileobj(raw, out)
+
+    os.replace(out_file + ".tmp", out_file)
+    os.remove(raw_file)
+
+    return n_row
+
+def readStepTable(in_file, cache=True, chunk_lines=100000):
+    if not cache:
+        return np.concatenate(list(iterStitchedRows(in_file, chunk_lines)) or [np.empty(0, dtype=step_dtype)])
+
+    cache_file = getCachePath(in_file)
+    if not os.path.exists(cache_file) or os.path.getmtime(cache_file) < os.path.getmtime(in_file):
+        writeStepTable(in_file, cache_file, chunk_lines)
+
+    return np.load(cache_file, mmap_mode='r')
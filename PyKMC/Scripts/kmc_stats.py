@@ -0,0 +1,101 @@
+'''
+
+Statistics of a pykmc run from the step table of pykmc.out (see kmc_output.py)
+
+Output:
+
+    -> Residence times (dT) histogram with the counts expected if each dT is exponential with rate k_tot, the mean
+        of dT * k_tot (1 for a correct run) and the Kolmogorov-Smirnov distance to the unit exponential
+    -> Selection frequency of each reference event
+    -> Barrier (Ea) spectrum as a Gaussian kernel density estimate on a grid
+    -> Energy drift: linear rate of change of E against simulated time and against steps, total and largest change
+
+Notes:
+
+    -> Everything works on whole columns; only steps with an event (ref_event >= 0) enter the event statistics
+    -> Expected residence-time counts mix exponentials over a histogram of log(k_tot), so the cost does not grow with
+        the number of steps times the number of bins
+    -> The KDE bins Ea linearly onto the grid and convolves with the kernel by FFT (zero padded, not periodic)
+
+August 2025
+Jake Boudreau
+
+'''
+
+import numpy as np
+
+def getEventRows(table):
+    return table[table['ref_event'] >= 0]
+
+def getResidenceTimes(table, n_bin=100, n_rate_bin=512):
+    events = getEventRows(table)
+    dt = events['dT'] * 1.0e+12   # convert to ps
+    k_tot = events['k_tot']         # ps^-1
+
+    edges = np.linspace(0, np.quantile(dt, 0.999), n_bin + 1)
+    counts, _ = np.histogram(dt, edges)
+
+    # P(a < dT < b) = exp(-k a) - exp(-k b), averaged over the rates that occurred
+    rate_counts, rate_edges = np.histogram(np.log(k_tot), n_rate_bin)
+    rates = np.exp(0.5 * (rate_edges[:-1] + rate_edges[1:]))
+    survival = np.exp(-np.outer(edges, rates[rate_counts > 0]))
+    expected = (survival[:-1] - survival[1:]) @ rate_counts[rate_counts > 0]
+
+    # dT * k_tot is a unit exponential
+    u = np.sort(dt * k_tot)
+    cdf = 1 - np.exp(-u)
+    n = len(u)
+    ks = max(np.max(np.arange(1, n + 1) / n - cdf), np.max(cdf - np.arange(n) / n))
+
+    return {'edges': edges, 'counts': counts, 'expected': expected, 'mean_scaled': np.mean(u), 'ks': ks}
+
+def getEventFrequencies(table):
+    ref_event = getEventRows(table)['ref_event']
+    counts = np.bincount(ref_event)
+
+    return counts / len(ref_event)
+
+def getKDE(values, n_grid=1024, bandwidth=None):
+    # Gaussian KDE of values on a regular grid, by linear binning and FFT convolution
+    n = len(values)
+    if bandwidth is None:
+        iqr = np.subtract(*np.quantile(values, [0.75, 0.25]))
+        spread = min(np.std(values), iqr / 1.34) if iqr > 0 else np.std(values)
+        bandwidth = 0.9 * spread * n**(-0.2) if spread > 0 else 1e-3
+
+    lo = np.min(values) - 4 * bandwidth
+    hi = np.max(values) + 4 * bandwidth
+    grid = np.linspace(lo, hi, n_grid)
+    delta = grid[1] - grid[0]
+
+    # linear binning: each value is shared between its two neighbouring grid points
+    pos = (values - lo) / delta
+    left = np.minimum(np.floor(pos).astype(int), n_grid - 2)
+    frac = pos - left
+    weights = np.bincount(left, 1 - frac, n_grid) + np.bincount(left + 1, frac, n_grid)
+
+    half = min(int(np.ceil(4 * bandwidth / delta)), n_grid - 1)
+    offsets = np.arange(-half, half + 1) * delta
+    kernel = np.exp(-0.5 * (offsets / bandwidth)**2) / (bandwidth * np.sqrt(2 * np.pi))
+
+    n_fft = 1 << int(np.ceil(np.log2(n_grid + len(kernel))))
+    density = np.fft.irfft(np.fft.rfft(weights, n_fft) * np.fft.rfft(kernel, n_fft), n_fft)[half:half + n_grid] / n
+
+    return grid, np.maximum(density, 0), bandwidth
+
+def getBarrierSpectrum(table, n_grid=1024, bandwidth=None):
+    return getKDE(getEventRows(table)['Ea'], n_grid, bandwidth)
+
+def getEnergyDrift(table):
+    times = table['T'] * 1.0e+12    # convert to ps
+    energy = table['E']
+
+    per_ps = np.polyfit(times, energy, 1)[0]
+    per_step = np.polyfit(table['step'].astype(float), energy, 1)[0]
+
+    return {
+        'per_ps': per_ps,
+        'per_step': per_step,
+        'total': energy[-1] - energy[0],
+        'max_abs': np.max(np.abs(energy - energy[0])),
+    }
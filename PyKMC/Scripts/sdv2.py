@@ -6,12 +6,19 @@ Generate a plot of SD from the displacement output of a pykmc run;
 Input Files:
 
     -> Displacements file (specified in config option)
-    -> pykmc.out (simulation output file) to read step times
+    -> pykmc.out (simulation output file) to read step times; restarted sections are stitched (see kmc_output.py)
+    -> Initial configuration (xyz) for the number of atoms, if the displacements header does not give it
 
 Plots:
 
     -> SD plot vs. time with linear fit
 
+Notes:
+
+    -> n_atom and n_step are taken from the files; the displacements are parsed in blocks of steps (see
+        kmc_displacements.py)
+    -> If pykmc.out has fewer steps than the displacements file, both are cut to the steps it has
+
 August 2025
 Jake Boudreau
 
@@ -20,49 +27,21 @@ Jake Boudreau
 import numpy as np
 import scipy as sp
 import matplotlib.pyplot as plt
-from ase.io import read
-
-n_step = 500
-n_atom = 4001
-
-def getSD(in_file, n_atom, n_step):
-    sd = np.empty((n_step), dtype=float)
-    dr = np.empty((n_atom), dtype=float)
-    with open(in_file, 'r') as f:
-        for i in range(3):
-            next(f)
-        for s in range(n_step):
-            print(f"reading step {s}")
-            for a in range(n_atom):
-                dx, dy, dz = [float(x) for x in f.readline().strip().split()]
-                dr[a] = dx**2 + dy**2 + dz**2
-            if s != 0:
-                sd[s] = np.sum(dr[:]) + sd[s-1]
-    f.close()
-
-    return sd
-
-def getTimes(inFile):
-
-    with open(inFile, 'r') as f:
-
-        for line in f:
-            if line.startswith('-'):
-                break
-
-        times = np.empty((n_step))
-        t_diff = np.empty((n_step))
-        ea = np.empty((n_step))
-        for s in range(n_step):
-            newline = f.readline().strip().split()
-            t_diff[s] = float(newline[1])
-            t = float(newline[2])  # only take the cumulative time
-            times[s] = t * 1.0e+12 # convert to ps
-            if s != 0:
-                ea[s] = float(newline[4])
-
-    t_diff_avg = np.mean(t_diff)
-    ea_avg = np.mean(ea)
+
+from kmc_displacements import getNAtom, getNStep, getSD
+from kmc_output import readStepTable
+
+def getTimes(inFile, n_step):
+
+    table = readStepTable(inFile)
+    if len(table) < n_step:
+        print(f"Warning: {inFile} has {len(table)} steps, {n_step} were expected; only the first {len(table)} are used")
+    table = table[:n_step]
+
+    times = table['T'] * 1.0e+12 # convert to ps
+
+    t_diff_avg = np.mean(table['dT'])
+    ea_avg = np.mean(table['Ea'][1:])
 
     print(f"Average time step was {t_diff_avg}")
     print(f"Average activation energy was {ea_avg}")
@@ -109,10 +88,17 @@ def getDiffusion(m):
 def main():
 
     in_file = "displacements.txt"
+    config_file = "initconfig.xyz"
+    n_atom = getNAtom(in_file, config_file)
+    n_step = getNStep(in_file, n_atom)
     sd = getSD(in_file, n_atom, n_step)
 
     in_file = "pykmc.out"
-    times = getTimes(in_file)
+    times = getTimes(in_file, n_step)
+
+    # a pykmc.out cut short leaves fewer times than displacement steps
+    n_step = min(len(times), n_step)
+    times, sd = times[:n_step], sd[:n_step]
 
     m, b = getSDFit(times, sd)
 
@@ -123,4 +109,5 @@ def main():
 
     return
 
-main()
+if __name__ == "__main__":
+    main()